@@ -16,8 +16,11 @@ from app.core.config import settings
 from app.core.database import Base
 from app.models import (
     SagaConfiguration,
+    SagaCorrelationId,
     SagaExecution,
-    SagaExecutionStep
+    SagaExecutionStep,
+    SagaIdempotencyKey,
+    SagaStepPayload
 )
 
 # this is the Alembic Config object, which provides
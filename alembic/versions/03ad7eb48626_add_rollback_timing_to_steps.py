@@ -0,0 +1,32 @@
+"""Add rollback timing to saga execution steps
+
+Revision ID: 03ad7eb48626
+Revises: 536598dab20b
+Create Date: 2026-10-17 02:38:12.880123
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '03ad7eb48626'
+down_revision: Union[str, Sequence[str], None] = '536598dab20b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('saga_execution_steps', sa.Column('rollback_started_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('saga_execution_steps', sa.Column('rollback_completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('saga_execution_steps', sa.Column('rollback_error', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('saga_execution_steps', 'rollback_error')
+    op.drop_column('saga_execution_steps', 'rollback_completed_at')
+    op.drop_column('saga_execution_steps', 'rollback_started_at')
@@ -0,0 +1,56 @@
+"""Add compressed step payloads
+
+Revision ID: 15c78b5d53c7
+Revises: 2e78e8a69f25
+Create Date: 2026-10-17 03:14:47.332107
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '15c78b5d53c7'
+down_revision: Union[str, Sequence[str], None] = '2e78e8a69f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE TABLE saga_step_payloads ("
+        "step_id INTEGER NOT NULL, "
+        "kind VARCHAR(16) NOT NULL, "
+        "execution_started_at TIMESTAMP WITH TIME ZONE NOT NULL, "
+        "saga_execution_id INTEGER NOT NULL, "
+        "encoding VARCHAR(16) NOT NULL, "
+        "size INTEGER NOT NULL, "
+        "data BYTEA NOT NULL, "
+        "PRIMARY KEY (step_id, kind, execution_started_at)"
+        ") PARTITION BY RANGE (execution_started_at)"
+    )
+    op.create_index(
+        'ix_saga_step_payloads_saga_execution_id',
+        'saga_step_payloads',
+        ['saga_execution_id']
+    )
+
+    # Same partitions as the steps, so that the retention job purges them together
+    partitions = op.get_bind().execute(sa.text(
+        "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+        "FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = 'saga_execution_steps'::regclass"
+    )).all()
+    for name, bound in partitions:
+        suffix = name[len('saga_execution_steps'):]
+        op.execute(f'CREATE TABLE saga_step_payloads{suffix} PARTITION OF saga_step_payloads {bound}')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Payloads stored aside are lost: their steps keep an empty request/response
+    op.drop_index('ix_saga_step_payloads_saga_execution_id', table_name='saga_step_payloads')
+    op.execute('DROP TABLE saga_step_payloads')
@@ -0,0 +1,51 @@
+"""Add correlation ids
+
+Revision ID: 277ec14ede5f
+Revises: 699042c65dc4
+Create Date: 2026-10-17 03:43:21.462027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '277ec14ede5f'
+down_revision: Union[str, Sequence[str], None] = '699042c65dc4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'saga_correlation_ids',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('correlation_id', sa.String(length=255), nullable=False),
+        sa.Column('execution_id', sa.Integer(), nullable=False),
+        sa.Column('execution_started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('correlation_id')
+    )
+    op.create_index('ix_saga_correlation_ids_id', 'saga_correlation_ids', ['id'])
+    op.create_index(
+        'ix_saga_correlation_ids_execution_started_at',
+        'saga_correlation_ids',
+        ['execution_started_at']
+    )
+    # Executions stored before this revision may have been started by the Kafka trigger
+    op.execute(
+        "INSERT INTO saga_correlation_ids (correlation_id, execution_id, execution_started_at) "
+        "SELECT DISTINCT ON (correlation_id) correlation_id, id, started_at FROM saga_executions "
+        "ORDER BY correlation_id, started_at, id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_saga_correlation_ids_execution_started_at', table_name='saga_correlation_ids')
+    op.drop_index('ix_saga_correlation_ids_id', table_name='saga_correlation_ids')
+    op.drop_table('saga_correlation_ids')
@@ -0,0 +1,209 @@
+"""Partition executions and steps by month
+
+Revision ID: 2e78e8a69f25
+Revises: 5dff5d2cae1b
+Create Date: 2026-10-17 03:10:01.103571
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e78e8a69f25'
+down_revision: Union[str, Sequence[str], None] = '5dff5d2cae1b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Parent tables and their partition keys
+PARTITIONED_TABLES = (
+    ('saga_executions', 'started_at'),
+    ('saga_execution_steps', 'execution_started_at'),
+)
+# Indexes of the tables as of the previous revision
+INDEXES = {
+    'saga_executions': (
+        'ix_saga_executions_id',
+        'ix_saga_executions_correlation_id',
+        'ix_saga_executions_pending',
+        'ix_saga_executions_unfinished_lease',
+        'ix_saga_executions_started_at_id',
+        'ix_saga_executions_status_started_at_id',
+        'ix_saga_executions_configuration_started_at_id',
+    ),
+    'saga_execution_steps': (
+        'ix_saga_execution_steps_id',
+        'ix_saga_execution_steps_saga_execution_id',
+    ),
+}
+# Monthly partitions created after the current one; later ones are created by the retention job
+MONTHS_AHEAD = 3
+
+
+def _month_start(value: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month `months` after the month of `value`"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    boundary = _month_start(datetime.now(timezone.utc), 1)
+
+    # Steps are partitioned like their execution, on a copy of its started_at
+    op.add_column(
+        'saga_execution_steps',
+        sa.Column('execution_started_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.execute("UPDATE saga_executions SET started_at = now() WHERE started_at IS NULL")
+    op.execute(
+        "UPDATE saga_execution_steps SET execution_started_at = saga_executions.started_at "
+        "FROM saga_executions WHERE saga_executions.id = saga_execution_steps.saga_execution_id"
+    )
+    op.alter_column('saga_executions', 'started_at', nullable=False)
+    op.alter_column('saga_execution_steps', 'execution_started_at', nullable=False)
+
+    # Partitions of both tables are dropped together, which a foreign key would prevent
+    op.drop_constraint(
+        'saga_execution_steps_saga_execution_id_fkey', 'saga_execution_steps', type_='foreignkey'
+    )
+    # The primary keys must include the partition key; correlation ids can no longer be unique
+    op.drop_constraint('saga_execution_steps_pkey', 'saga_execution_steps', type_='primary')
+    op.drop_constraint('saga_executions_pkey', 'saga_executions', type_='primary')
+    op.drop_index('ix_saga_executions_correlation_id', table_name='saga_executions')
+
+    # The existing tables become the first partition; their indexes are renamed and
+    # reused when attached, so that only the changed ones are built
+    for table, _ in PARTITIONED_TABLES:
+        for index in INDEXES[table]:
+            if index != 'ix_saga_executions_correlation_id':
+                op.execute(f'ALTER INDEX {index} RENAME TO {index}_legacy')
+        op.rename_table(table, f'{table}_legacy')
+
+    for table, key in PARTITIONED_TABLES:
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {table}_legacy INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({key})'
+        )
+        # Otherwise the id sequence would be dropped with the legacy partition
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.create_primary_key(f'{table}_pkey', table, ['id', key])
+
+    op.create_foreign_key(
+        'saga_executions_saga_configuration_id_fkey',
+        'saga_executions', 'saga_configurations',
+        ['saga_configuration_id'], ['id']
+    )
+    op.create_index('ix_saga_executions_id', 'saga_executions', ['id'])
+    op.create_index('ix_saga_executions_correlation_id', 'saga_executions', ['correlation_id'])
+    op.create_index(
+        'ix_saga_executions_pending',
+        'saga_executions',
+        ['id'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+    op.create_index(
+        'ix_saga_executions_unfinished_lease',
+        'saga_executions',
+        ['lease_expires_at'],
+        postgresql_where=sa.text("completed_at IS NULL AND status IN ('RUNNING', 'FAILED')")
+    )
+    op.create_index('ix_saga_executions_started_at_id', 'saga_executions', ['started_at', 'id'])
+    op.create_index(
+        'ix_saga_executions_status_started_at_id',
+        'saga_executions',
+        ['status', 'started_at', 'id']
+    )
+    op.create_index(
+        'ix_saga_executions_configuration_started_at_id',
+        'saga_executions',
+        ['saga_configuration_id', 'started_at', 'id']
+    )
+    op.create_index('ix_saga_execution_steps_id', 'saga_execution_steps', ['id'])
+    op.create_index(
+        'ix_saga_execution_steps_saga_execution_id',
+        'saga_execution_steps',
+        ['saga_execution_id']
+    )
+
+    for table, _ in PARTITIONED_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {table}_legacy "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+        )
+        for offset in range(MONTHS_AHEAD + 1):
+            start = _month_start(boundary, offset)
+            end = _month_start(boundary, offset + 1)
+            op.execute(
+                f"CREATE TABLE {table}_p{start:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        # Catches rows beyond the last partition until the retention job creates more
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Back to plain tables: the rows of every remaining partition are copied
+    for table, _ in PARTITIONED_TABLES:
+        op.rename_table(table, f'{table}_partitioned')
+        op.execute(f'CREATE TABLE {table} (LIKE {table}_partitioned INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {table} SELECT * FROM {table}_partitioned')
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f'DROP TABLE {table}_partitioned')
+
+    op.execute(
+        "DELETE FROM saga_execution_steps WHERE NOT EXISTS ("
+        "SELECT 1 FROM saga_executions WHERE saga_executions.id = saga_execution_steps.saga_execution_id)"
+    )
+    op.drop_column('saga_execution_steps', 'execution_started_at')
+    op.alter_column('saga_executions', 'started_at', nullable=True)
+
+    op.create_primary_key('saga_executions_pkey', 'saga_executions', ['id'])
+    op.create_primary_key('saga_execution_steps_pkey', 'saga_execution_steps', ['id'])
+    op.create_foreign_key(
+        'saga_executions_saga_configuration_id_fkey',
+        'saga_executions', 'saga_configurations',
+        ['saga_configuration_id'], ['id']
+    )
+    op.create_foreign_key(
+        'saga_execution_steps_saga_execution_id_fkey',
+        'saga_execution_steps', 'saga_executions',
+        ['saga_execution_id'], ['id']
+    )
+    op.create_index('ix_saga_executions_id', 'saga_executions', ['id'])
+    op.create_index(
+        'ix_saga_executions_correlation_id', 'saga_executions', ['correlation_id'], unique=True
+    )
+    op.create_index(
+        'ix_saga_executions_pending',
+        'saga_executions',
+        ['id'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+    op.create_index(
+        'ix_saga_executions_unfinished_lease',
+        'saga_executions',
+        ['lease_expires_at'],
+        postgresql_where=sa.text("completed_at IS NULL AND status IN ('RUNNING', 'FAILED')")
+    )
+    op.create_index('ix_saga_executions_started_at_id', 'saga_executions', ['started_at', 'id'])
+    op.create_index(
+        'ix_saga_executions_status_started_at_id',
+        'saga_executions',
+        ['status', 'started_at', 'id']
+    )
+    op.create_index(
+        'ix_saga_executions_configuration_started_at_id',
+        'saga_executions',
+        ['saga_configuration_id', 'started_at', 'id']
+    )
+    op.create_index('ix_saga_execution_steps_id', 'saga_execution_steps', ['id'])
+    op.create_index(
+        'ix_saga_execution_steps_saga_execution_id',
+        'saga_execution_steps',
+        ['saga_execution_id']
+    )
@@ -0,0 +1,72 @@
+"""Add execution listing and step foreign key indexes
+
+Revision ID: 5dff5d2cae1b
+Revises: ac57ac31976c
+Create Date: 2026-10-17 03:05:49.282672
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5dff5d2cae1b'
+down_revision: Union[str, Sequence[str], None] = 'ac57ac31976c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so that large tables stay writable meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_saga_executions_started_at_id',
+            'saga_executions',
+            ['started_at', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_saga_executions_status_started_at_id',
+            'saga_executions',
+            ['status', 'started_at', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_saga_executions_configuration_started_at_id',
+            'saga_executions',
+            ['saga_configuration_id', 'started_at', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_saga_execution_steps_saga_execution_id',
+            'saga_execution_steps',
+            ['saga_execution_id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_saga_execution_steps_saga_execution_id',
+            table_name='saga_execution_steps',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_saga_executions_configuration_started_at_id',
+            table_name='saga_executions',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_saga_executions_status_started_at_id',
+            table_name='saga_executions',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_saga_executions_started_at_id',
+            table_name='saga_executions',
+            postgresql_concurrently=True
+        )
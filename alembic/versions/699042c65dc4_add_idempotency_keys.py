@@ -0,0 +1,54 @@
+"""Add idempotency keys
+
+Revision ID: 699042c65dc4
+Revises: 15c78b5d53c7
+Create Date: 2026-10-17 03:19:28.025002
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '699042c65dc4'
+down_revision: Union[str, Sequence[str], None] = '15c78b5d53c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'saga_idempotency_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('saga_configuration_id', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=255), nullable=False),
+        sa.Column('request_hash', sa.String(length=64), nullable=False),
+        sa.Column('execution_id', sa.Integer(), nullable=False),
+        sa.Column('execution_started_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['saga_configuration_id'], ['saga_configurations.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_saga_idempotency_keys_id', 'saga_idempotency_keys', ['id'])
+    op.create_index(
+        'ix_saga_idempotency_keys_execution_started_at',
+        'saga_idempotency_keys',
+        ['execution_started_at']
+    )
+    op.create_index(
+        'ux_saga_idempotency_keys_configuration_key',
+        'saga_idempotency_keys',
+        ['saga_configuration_id', 'idempotency_key'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_saga_idempotency_keys_configuration_key', table_name='saga_idempotency_keys')
+    op.drop_index('ix_saga_idempotency_keys_execution_started_at', table_name='saga_idempotency_keys')
+    op.drop_index('ix_saga_idempotency_keys_id', table_name='saga_idempotency_keys')
+    op.drop_table('saga_idempotency_keys')
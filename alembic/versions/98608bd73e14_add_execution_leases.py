@@ -0,0 +1,38 @@
+"""Add lease columns for the execution work queue
+
+Revision ID: 98608bd73e14
+Revises: e0b04b6279a8
+Create Date: 2026-10-17 02:46:43.357793
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '98608bd73e14'
+down_revision: Union[str, Sequence[str], None] = 'e0b04b6279a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('saga_executions', sa.Column('lease_owner', sa.String(length=255), nullable=True))
+    op.add_column('saga_executions', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    # Keeps claiming cheap no matter how many finished executions the table holds
+    op.create_index(
+        'ix_saga_executions_pending',
+        'saga_executions',
+        ['id'],
+        postgresql_where=sa.text("status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_saga_executions_pending', table_name='saga_executions')
+    op.drop_column('saga_executions', 'lease_expires_at')
+    op.drop_column('saga_executions', 'lease_owner')
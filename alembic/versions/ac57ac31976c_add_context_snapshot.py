@@ -0,0 +1,36 @@
+"""Add context snapshot to saga executions
+
+Revision ID: ac57ac31976c
+Revises: 98608bd73e14
+Create Date: 2026-10-17 02:51:15.217979
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac57ac31976c'
+down_revision: Union[str, Sequence[str], None] = '98608bd73e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('saga_executions', sa.Column('context_snapshot', sa.JSON(), nullable=True))
+    # Lets the recovery sweeper find executions whose worker died
+    op.create_index(
+        'ix_saga_executions_unfinished_lease',
+        'saga_executions',
+        ['lease_expires_at'],
+        postgresql_where=sa.text("completed_at IS NULL AND status IN ('RUNNING', 'FAILED')")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_saga_executions_unfinished_lease', table_name='saga_executions')
+    op.drop_column('saga_executions', 'context_snapshot')
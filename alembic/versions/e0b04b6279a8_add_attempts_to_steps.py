@@ -0,0 +1,28 @@
+"""Add attempts to saga execution steps
+
+Revision ID: e0b04b6279a8
+Revises: 03ad7eb48626
+Create Date: 2026-10-17 02:41:29.532112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e0b04b6279a8'
+down_revision: Union[str, Sequence[str], None] = '03ad7eb48626'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('saga_execution_steps', sa.Column('attempts', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('saga_execution_steps', 'attempts')
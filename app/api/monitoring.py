@@ -0,0 +1,72 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any
+
+from app.services.circuit_breaker import circuit_breakers
+from app.services.events import event_bus
+from app.services.http_client import http_client
+from app.services.idempotency import idempotency_guard
+from app.services.kafka_replies import kafka_replies
+from app.services.plan_cache import plan_cache
+from app.services.retry import retry_budgets
+from app.services.worker_pool import worker_pool
+
+router = APIRouter(prefix="/monitoring", tags=["Monitoring"])
+
+
+@router.get("/plan-cache")
+def get_plan_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the compiled saga plan cache"""
+    return plan_cache.stats()
+
+
+@router.get("/idempotency")
+def get_idempotency_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the in-process idempotency key cache"""
+    return idempotency_guard.stats()
+
+
+@router.get("/http-pool")
+def get_http_pool_stats() -> Dict[str, Any]:
+    """Connection pool statistics of the shared HTTP client"""
+    return http_client.stats()
+
+
+@router.get("/retry-budgets")
+def get_retry_budget_stats() -> Dict[str, Any]:
+    """Requests, retries and rejected retries per downstream host"""
+    return retry_budgets.stats()
+
+
+@router.get("/circuit-breakers")
+def get_circuit_breakers() -> Dict[str, Any]:
+    """State and counters of every circuit breaker in this process"""
+    return circuit_breakers.stats()
+
+
+@router.post("/circuit-breakers/{name}/reset", status_code=status.HTTP_204_NO_CONTENT)
+def reset_circuit_breaker(name: str):
+    """Close a circuit breaker by discarding its state"""
+    if not circuit_breakers.reset(name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Circuit breaker {name} not found"
+        )
+    return None
+
+
+@router.get("/workers")
+def get_worker_pool_stats() -> Dict[str, Any]:
+    """Queue depth and activity of the background execution workers"""
+    return worker_pool.stats()
+
+
+@router.get("/kafka-replies")
+def get_kafka_reply_stats() -> Dict[str, Any]:
+    """Reply topics, pending requests and routed replies of kafka-request-reply steps"""
+    return kafka_replies.stats()
+
+
+@router.get("/events")
+def get_event_bus_stats() -> Dict[str, Any]:
+    """Subscribers and published, received and dropped progress events of this process"""
+    return event_bus.stats()
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-import yaml
 
 from app.core.database import get_db
 from app.models import SagaConfiguration, SagaConfigurationStatus
@@ -11,6 +10,8 @@ from app.schemas import (
     SagaConfigurationResponse,
     SagaConfigurationStatusUpdate,
 )
+from app.services.plan_cache import plan_cache
+from app.services.saga_plan import SagaPlanError, compile_plan
 
 router = APIRouter(prefix="/saga-configurations", tags=["Saga Configurations"])
 
@@ -23,11 +24,11 @@ def create_saga_configuration(
     """Create a new saga configuration"""
     # Validate YAML
     try:
-        yaml.safe_load(saga_config.yaml_content)
-    except yaml.YAMLError as e:
+        compile_plan(saga_config.yaml_content)
+    except SagaPlanError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid YAML content: {str(e)}"
+            detail=str(e)
         )
     
     # Check if name already exists
@@ -92,11 +93,11 @@ def update_saga_configuration(
     # Validate YAML if provided
     if "yaml_content" in update_data:
         try:
-            yaml.safe_load(update_data["yaml_content"])
-        except yaml.YAMLError as e:
+            compile_plan(update_data["yaml_content"])
+        except SagaPlanError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid YAML content: {str(e)}"
+                detail=str(e)
             )
     
     # Check name uniqueness if updating name
@@ -115,6 +116,7 @@ def update_saga_configuration(
     
     db.commit()
     db.refresh(saga)
+    plan_cache.invalidate(saga_id)
     return saga
 
 
@@ -133,6 +135,7 @@ def delete_saga_configuration(
     
     db.delete(saga)
     db.commit()
+    plan_cache.invalidate(saga_id)
     return None
 
 
@@ -152,6 +155,7 @@ def enable_saga_configuration(
     saga.status = SagaConfigurationStatus.ACTIVE
     db.commit()
     db.refresh(saga)
+    plan_cache.invalidate(saga_id)
     return saga
 
 
@@ -171,4 +175,5 @@ def disable_saga_configuration(
     saga.status = SagaConfigurationStatus.DISABLED
     db.commit()
     db.refresh(saga)
+    plan_cache.invalidate(saga_id)
     return saga
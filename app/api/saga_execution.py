@@ -1,33 +1,110 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import base64
+import json
+from datetime import datetime
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 
-from app.core.database import get_db
-from app.models import SagaExecution, SagaConfiguration, SagaConfigurationStatus
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.models import (
+    SagaCorrelationId,
+    SagaExecution,
+    SagaExecutionStatus,
+    SagaExecutionStep,
+    SagaIdempotencyKey,
+    SagaStepPayload,
+    SagaConfiguration,
+    SagaConfigurationStatus,
+)
 from app.schemas import (
+    SagaBulkError,
+    SagaBulkExecutionResponse,
     SagaExecutionResponse,
+    SagaExecutionSummaryResponse,
+    SagaSubmitRequest,
+    SagaSubmitResponse,
     SagaTestRequest,
 )
+from app.services.bulk import NDJSONStreamingResponse, iter_json_values, run_bulk
+from app.services.events import event_bus
+from app.services.idempotency import IdempotencyKeyReused, idempotency_guard
+from app.services.plan_cache import plan_cache
 from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import SagaPlanError
+from app.services.work_queue import get_work_queue
+from app.services.worker_pool import QueueFullError
 
 router = APIRouter(prefix="/saga-executions", tags=["Saga Executions"])
 
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+# Set on responses that return the execution of an earlier request with the same key
+REPLAYED_HEADER = "Idempotent-Replayed"
 
-@router.post("/test", response_model=SagaExecutionResponse)
-async def test_saga_configuration(
-    test_request: SagaTestRequest,
-    db: Session = Depends(get_db)
-):
-    """Test a saga configuration with provided input data"""
-    # Get saga configuration
-    saga_config = db.query(SagaConfiguration).filter(
-        SagaConfiguration.id == test_request.saga_configuration_id
-    ).first()
+# Steps as rendered by SagaExecutionResponse, with their payloads stored aside
+STEPS_WITH_PAYLOADS = selectinload(SagaExecution.steps).selectinload(SagaExecutionStep.payloads)
+
+# Columns read for SagaExecutionSummaryResponse and its steps
+EXECUTION_SUMMARY_COLUMNS = (
+    SagaExecution.id,
+    SagaExecution.saga_configuration_id,
+    SagaExecution.correlation_id,
+    SagaExecution.status,
+    SagaExecution.error_message,
+    SagaExecution.started_at,
+    SagaExecution.completed_at,
+)
+STEP_SUMMARY_COLUMNS = (
+    SagaExecutionStep.id,
+    SagaExecutionStep.saga_execution_id,
+    SagaExecutionStep.execution_started_at,
+    SagaExecutionStep.step_name,
+    SagaExecutionStep.step_type,
+    SagaExecutionStep.status,
+    SagaExecutionStep.error_message,
+    SagaExecutionStep.started_at,
+    SagaExecutionStep.completed_at,
+    SagaExecutionStep.rollback_started_at,
+    SagaExecutionStep.rollback_completed_at,
+    SagaExecutionStep.rollback_error,
+)
+
+
+async def _load_execution(db: AsyncSession, execution_id: int) -> Optional[SagaExecution]:
+    """Load an execution together with its steps"""
+    result = await db.execute(
+        select(SagaExecution)
+        .options(STEPS_WITH_PAYLOADS)
+        .where(SagaExecution.id == execution_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _get_active_configuration(db: AsyncSession, config_id: int) -> SagaConfiguration:
+    """Load a saga configuration that can be executed, or raise 404/400"""
+    saga_config = await db.get(SagaConfiguration, config_id)
     
     if not saga_config:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Saga configuration with ID {test_request.saga_configuration_id} not found"
+            detail=f"Saga configuration with ID {config_id} not found"
         )
     
     if saga_config.status != SagaConfigurationStatus.ACTIVE:
@@ -35,32 +112,359 @@ async def test_saga_configuration(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Saga configuration is not active (current status: {saga_config.status})"
         )
+    return saga_config
+
+
+def _idempotency_key(header: Optional[str], field: Optional[str]) -> Optional[str]:
+    """Idempotency key of a submission, from the header or the request body"""
+    if header is not None and field is not None and header != field:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} header and idempotency_key field differ"
+        )
+    key = header if header is not None else field
+    if key is not None and not key.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must not be empty"
+        )
+    return key
+
+
+async def _run_once(
+    db: AsyncSession,
+    response: Response,
+    saga_configuration_id: int,
+    key: str,
+    input_data: Dict[str, Any],
+    submit: Callable[[], Awaitable[int]]
+) -> int:
+    """Run a submission once per idempotency key, flagging replayed responses"""
+    try:
+        execution_id, replayed = await idempotency_guard.run_once(
+            db, saga_configuration_id, key, input_data, submit
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    if replayed:
+        response.headers[REPLAYED_HEADER] = "true"
+    return execution_id
+
+
+@router.post("/test", response_model=SagaExecutionResponse)
+async def test_saga_configuration(
+    test_request: SagaTestRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Test a saga configuration with provided input data
+    
+    With an idempotency key, a retry gets the execution started by the first request
+    (after it finishes, when it still runs in this process) instead of a new run.
+    """
+    saga_config = await _get_active_configuration(db, test_request.saga_configuration_id)
+    key = _idempotency_key(idempotency_key, test_request.idempotency_key)
     
     # Execute saga
     executor = SagaExecutor(db)
-    execution = await executor.execute_saga(saga_config, test_request.input_data)
     
+    async def run() -> int:
+        execution = await executor.execute_saga(
+            saga_config, test_request.input_data, idempotency_key=key
+        )
+        return execution.id
+    
+    try:
+        if key is None:
+            execution_id = await run()
+        else:
+            execution_id = await _run_once(
+                db, response, test_request.saga_configuration_id, key, test_request.input_data, run
+            )
+    except SagaPlanError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    execution = await _load_execution(db, execution_id)
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Saga execution with ID {execution_id} not found"
+        )
     return execution
 
 
-@router.get("/", response_model=List[SagaExecutionResponse])
-def list_saga_executions(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+@router.post(
+    "/submit",
+    response_model=SagaSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_saga_execution(
+    submit_request: SagaSubmitRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER, max_length=255),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue a saga execution for the background workers and return immediately
+    
+    With an idempotency key, a retry gets the execution queued by the first request.
+    """
+    saga_config = await _get_active_configuration(db, submit_request.saga_configuration_id)
+    key = _idempotency_key(idempotency_key, submit_request.idempotency_key)
+    
+    queue = get_work_queue()
+    executor = SagaExecutor(db)
+    
+    async def submit() -> int:
+        if await queue.is_full(db):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Worker queue is full, retry later"
+            )
+        
+        try:
+            execution = await executor.create_execution(
+                saga_config,
+                submit_request.input_data,
+                status=SagaExecutionStatus.PENDING,
+                idempotency_key=key
+            )
+        except SagaPlanError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        
+        try:
+            queue.submit(execution.id)
+        except QueueFullError as e:
+            # The queue filled up while the execution was being stored
+            execution.status = SagaExecutionStatus.FAILED
+            execution.error_message = f"Rejected: {str(e)}"
+            execution.completed_at = datetime.utcnow()
+            if key is not None:
+                # Frees the key, so that the client can retry with it
+                await db.execute(
+                    delete(SagaIdempotencyKey).where(
+                        SagaIdempotencyKey.saga_configuration_id == execution.saga_configuration_id,
+                        SagaIdempotencyKey.idempotency_key == key
+                    )
+                )
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Worker queue is full, retry later"
+            )
+        return execution.id
+    
+    if key is None:
+        execution_id = await submit()
+    else:
+        execution_id = await _run_once(
+            db, response, submit_request.saga_configuration_id, key, submit_request.input_data, submit
+        )
+    
+    execution = await db.get(SagaExecution, execution_id)
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Saga execution with ID {execution_id} not found"
+        )
+    response.headers["Location"] = f"{settings.API_PREFIX}{router.prefix}/{execution.id}"
+    return execution
+
+
+@router.post(
+    "/bulk",
+    response_class=NDJSONStreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def bulk_execute_sagas(
+    request: Request,
+    saga_configuration_id: int,
+    concurrency: int = Query(
+        settings.BULK_CONCURRENCY, ge=1, le=settings.BULK_MAX_CONCURRENCY,
+        description="Sagas executed at once"
+    ),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all saga executions"""
-    executions = db.query(SagaExecution).offset(skip).limit(limit).all()
+    """Execute one saga per input_data of a JSON array or NDJSON body
+    
+    The body is read incrementally and results are streamed back as NDJSON in
+    completion order: a SagaBulkExecutionResponse per execution, or a SagaBulkError
+    for an input that could not be executed. A malformed body ends the stream with
+    a final SagaBulkError.
+    """
+    saga_config = await _get_active_configuration(db, saga_configuration_id)
+    try:
+        plan_cache.get_plan(saga_config)
+    except SagaPlanError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    config_id = saga_config.id
+    
+    async def run(index: int, input_data) -> BaseModel:
+        if not isinstance(input_data, dict):
+            return SagaBulkError(index=index, error="input_data must be a JSON object")
+        try:
+            # Every saga gets its own session, as concurrent sagas cannot share one
+            async with AsyncSessionLocal() as session:
+                config = await session.get(SagaConfiguration, config_id)
+                execution = await SagaExecutor(session).execute_saga(config, input_data)
+                execution = await _load_execution(session, execution.id)
+                return SagaBulkExecutionResponse(
+                    index=index,
+                    **dict(SagaExecutionResponse.model_validate(execution))
+                )
+        except Exception as e:
+            return SagaBulkError(index=index, error=str(e))
+    
+    async def stream():
+        results = run_bulk(iter_json_values(request.stream()), run, concurrency)
+        async for result in results:
+            if isinstance(result, dict):
+                result = SagaBulkError(**result)
+            yield result.model_dump_json() + "\n"
+    
+    return NDJSONStreamingResponse(stream())
+
+
+def _encode_cursor(execution: SagaExecution) -> str:
+    """Opaque cursor pointing right after an execution in the listing order"""
+    raw = json.dumps([execution.started_at.isoformat(), execution.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        started_at, execution_id = json.loads(raw)
+        return datetime.fromisoformat(started_at), int(execution_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _execution_listing(
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=settings.EXECUTION_LIST_MAX_LIMIT),
+    status_filter: Optional[SagaExecutionStatus] = Query(None, alias="status"),
+    saga_configuration_id: Optional[int] = None,
+    started_after: Optional[datetime] = Query(None, description="Inclusive lower bound of started_at"),
+    started_before: Optional[datetime] = Query(None, description="Exclusive upper bound of started_at"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Use cursor instead")
+) -> Tuple[Select, int]:
+    """Filtered and keyset-paginated execution query shared by the listings, and its page size"""
+    query = (
+        select(SagaExecution)
+        .order_by(SagaExecution.started_at.desc(), SagaExecution.id.desc())
+        .limit(limit)
+    )
+    if status_filter is not None:
+        query = query.where(SagaExecution.status == status_filter)
+    if saga_configuration_id is not None:
+        query = query.where(SagaExecution.saga_configuration_id == saga_configuration_id)
+    if started_after is not None:
+        query = query.where(SagaExecution.started_at >= started_after)
+    if started_before is not None:
+        query = query.where(SagaExecution.started_at < started_before)
+    if cursor is not None:
+        query = query.where(
+            tuple_(SagaExecution.started_at, SagaExecution.id) < tuple_(*_decode_cursor(cursor))
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query, limit
+
+
+async def _list_page(db: AsyncSession, response: Response, listing: Tuple[Select, int], *options):
+    """Run a listing query and set X-Next-Cursor when more executions may follow"""
+    query, limit = listing
+    result = await db.execute(query.options(*options))
+    executions = result.scalars().all()
+    if len(executions) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(executions[-1])
     return executions
 
 
+@router.get("/", response_model=List[SagaExecutionResponse])
+async def list_saga_executions(
+    response: Response,
+    listing: Tuple[Select, int] = Depends(_execution_listing),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List saga executions with their steps, newest first
+    
+    Pages are keyset paginated on (started_at, id): when more executions may follow,
+    the X-Next-Cursor header holds the cursor of the next page, so deep pages cost
+    the same as the first one.
+    """
+    return await _list_page(db, response, listing, STEPS_WITH_PAYLOADS)
+
+
+@router.get("/summary", response_model=List[SagaExecutionSummaryResponse])
+async def list_saga_execution_summaries(
+    response: Response,
+    listing: Tuple[Select, int] = Depends(_execution_listing),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List saga executions like `GET /`, without input/output data and step payloads
+    
+    Only the summarized columns are read from the database, so large request and
+    response payloads never leave it.
+    """
+    return await _list_page(
+        db,
+        response,
+        listing,
+        load_only(*EXECUTION_SUMMARY_COLUMNS),
+        selectinload(SagaExecution.steps).load_only(*STEP_SUMMARY_COLUMNS)
+    )
+
+
+@router.get("/correlation/{correlation_id}", response_model=SagaExecutionResponse)
+async def get_saga_execution_by_correlation_id(
+    correlation_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a saga execution by the correlation ID returned on submission
+    
+    The database cannot enforce unique correlation ids across partitions; should
+    several executions share one, the latest is returned.
+    """
+    result = await db.execute(
+        select(SagaExecution)
+        .options(STEPS_WITH_PAYLOADS)
+        .where(SagaExecution.correlation_id == correlation_id)
+        .order_by(SagaExecution.started_at.desc(), SagaExecution.id.desc())
+        .limit(1)
+    )
+    execution = result.scalars().first()
+    if not execution:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Saga execution with correlation ID {correlation_id} not found"
+        )
+    return execution
+
+
 @router.get("/{execution_id}", response_model=SagaExecutionResponse)
-def get_saga_execution(
+async def get_saga_execution(
     execution_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific saga execution by ID"""
-    execution = db.query(SagaExecution).filter(SagaExecution.id == execution_id).first()
+    execution = await _load_execution(db, execution_id)
     if not execution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -69,19 +473,140 @@ def get_saga_execution(
     return execution
 
 
+async def _execution_snapshot(execution_id: int) -> Optional[Dict[str, Any]]:
+    """Current state of an execution, read in a short-lived session"""
+    async with AsyncSessionLocal() as db:
+        execution = await _load_execution(db, execution_id)
+        if execution is None:
+            return None
+        return SagaExecutionResponse.model_validate(execution).model_dump(mode="json")
+
+
+async def _execution_updates(execution_id: int) -> AsyncIterator[Dict[str, Any]]:
+    """Snapshot of an execution followed by its progress events until it finishes
+    
+    The subscription is opened before the snapshot is read, so no transition falls
+    in between. While no event arrives a keepalive is produced, and the execution
+    is checked in the database in case its final event was missed.
+    """
+    async with event_bus.subscribe(execution_id) as queue:
+        snapshot = await _execution_snapshot(execution_id)
+        if snapshot is None:
+            return
+        yield {"event": "snapshot", "execution": snapshot}
+        if snapshot["completed_at"] is not None:
+            return
+        
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.EVENTS_KEEPALIVE_INTERVAL)
+            except TimeoutError:
+                snapshot = await _execution_snapshot(execution_id)
+                if snapshot is None:
+                    # Deleted meanwhile
+                    return
+                if snapshot["completed_at"] is not None:
+                    yield {"event": "snapshot", "execution": snapshot}
+                    return
+                yield {"event": "keepalive"}
+                continue
+            
+            yield event
+            if event["event"] == "execution" and event["finished"]:
+                return
+
+
+@router.get("/{execution_id}/events")
+async def stream_saga_execution_events(
+    execution_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Push the execution and its step transitions as Server-Sent Events until it finishes"""
+    if await db.get(SagaExecution, execution_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Saga execution with ID {execution_id} not found"
+        )
+    
+    async def stream():
+        async for update in _execution_updates(execution_id):
+            if update["event"] == "keepalive":
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {update['event']}\ndata: {json.dumps(update)}\n\n"
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/{execution_id}/ws")
+async def saga_execution_updates_websocket(websocket: WebSocket, execution_id: int):
+    """Push the execution and its step transitions over a WebSocket until it finishes"""
+    await websocket.accept()
+    async with AsyncSessionLocal() as db:
+        found = await db.get(SagaExecution, execution_id) is not None
+    if not found:
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason=f"Saga execution with ID {execution_id} not found"
+        )
+        return
+    
+    try:
+        async for update in _execution_updates(execution_id):
+            await websocket.send_json(update)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.delete("/{execution_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_saga_execution(
+async def delete_saga_execution(
     execution_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Delete a saga execution"""
-    execution = db.query(SagaExecution).filter(SagaExecution.id == execution_id).first()
+    """Delete a saga execution, its steps, their payloads and the keys pointing to it"""
+    execution = await db.get(SagaExecution, execution_id)
     if not execution:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Saga execution with ID {execution_id} not found"
         )
     
-    db.delete(execution)
-    db.commit()
+    # Set-based deletes pruned to the execution's partition, without loading the steps
+    await db.execute(
+        delete(SagaStepPayload).where(
+            SagaStepPayload.saga_execution_id == execution.id,
+            SagaStepPayload.execution_started_at == execution.started_at
+        )
+    )
+    await db.execute(
+        delete(SagaExecutionStep).where(
+            SagaExecutionStep.saga_execution_id == execution.id,
+            SagaExecutionStep.execution_started_at == execution.started_at
+        )
+    )
+    await db.execute(
+        delete(SagaIdempotencyKey).where(
+            SagaIdempotencyKey.execution_id == execution.id,
+            SagaIdempotencyKey.execution_started_at == execution.started_at
+        )
+    )
+    await db.execute(
+        delete(SagaCorrelationId).where(
+            SagaCorrelationId.execution_id == execution.id,
+            SagaCorrelationId.execution_started_at == execution.started_at
+        )
+    )
+    await db.execute(
+        delete(SagaExecution).where(
+            SagaExecution.id == execution.id,
+            SagaExecution.started_at == execution.started_at
+        )
+    )
+    await db.commit()
+    idempotency_guard.forget(execution_id)
     return None
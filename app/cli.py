@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import json
+import logging
+import signal
+from typing import List, Optional
+
+from app.core.config import settings
+
+
+def _run_worker(args: argparse.Namespace):
+    """Claim and run executions from the Postgres work queue until SIGINT/SIGTERM"""
+    from app.services.work_queue import SagaWorker
+
+    worker = SagaWorker(
+        worker_id=args.worker_id,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        lease_duration=args.lease_duration,
+        poll_interval=args.poll_interval,
+    )
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, worker.stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+
+def _run_consumer(args: argparse.Namespace):
+    """Start executions from the Kafka topics of triggered sagas until SIGINT/SIGTERM"""
+    from app.services.kafka_trigger import SagaConsumer
+
+    consumer = SagaConsumer(
+        config_ids=args.config_id,
+        max_in_flight=args.max_in_flight,
+        batch_size=args.batch_size,
+    )
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, consumer.stop)
+        await consumer.run()
+
+    asyncio.run(run())
+
+
+def _run_retention(args: argparse.Namespace):
+    """Create upcoming partitions, then archive and purge the expired ones"""
+    from app.services.partitions import run_retention
+
+    report = run_retention(
+        retention_days=args.retention_days,
+        action=args.action,
+        archive_dir=args.archive_dir,
+        months_ahead=args.months_ahead,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(report, indent=2))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="saga-express", description=settings.APP_NAME)
+    parser.add_argument("--log-level", default="DEBUG" if settings.DEBUG else "INFO")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="Run executions from the Postgres work queue")
+    worker.add_argument("--worker-id", help="Lease owner name (default: host:pid:random)")
+    worker.add_argument("--concurrency", type=int, help="Executions run at once (WORKER_POOL_SIZE)")
+    worker.add_argument(
+        "--batch-size", type=int, help="Executions claimed per query (WORKER_CLAIM_BATCH_SIZE)"
+    )
+    worker.add_argument(
+        "--lease-duration", type=float, help="Lease length in seconds (WORKER_LEASE_DURATION)"
+    )
+    worker.add_argument(
+        "--poll-interval", type=float, help="Seconds between polls of an empty queue"
+    )
+    worker.set_defaults(handler=_run_worker)
+
+    consumer = commands.add_parser(
+        "consumer", help="Start executions from the Kafka topics of triggered sagas"
+    )
+    consumer.add_argument(
+        "--config-id", type=int, action="append",
+        help="Only consume for this saga configuration (repeatable; default: all with a trigger)"
+    )
+    consumer.add_argument(
+        "--max-in-flight", type=int,
+        help="Executions running at once per saga (KAFKA_TRIGGER_MAX_IN_FLIGHT)"
+    )
+    consumer.add_argument(
+        "--batch-size", type=int, help="Records polled at once (KAFKA_TRIGGER_BATCH_SIZE)"
+    )
+    consumer.set_defaults(handler=_run_consumer)
+
+    retention = commands.add_parser(
+        "retention", help="Maintain execution partitions and purge expired ones"
+    )
+    retention.add_argument(
+        "--retention-days", type=int,
+        help="Purge partitions entirely older than this (RETENTION_DAYS)"
+    )
+    retention.add_argument(
+        "--action", choices=("drop", "detach"), help="What to do with them (RETENTION_ACTION)"
+    )
+    retention.add_argument(
+        "--archive-dir", help="Export them as .ndjson.gz here first (RETENTION_ARCHIVE_DIR)"
+    )
+    retention.add_argument(
+        "--months-ahead", type=int, help="Months of partitions to create in advance"
+    )
+    retention.add_argument(
+        "--dry-run", action="store_true", help="Only report the partitions that would be purged"
+    )
+    retention.set_defaults(handler=_run_retention)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point of the `saga-express` command"""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,45 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api import saga_configuration, saga_execution
+from app.api import saga_configuration, saga_execution, monitoring
+from app.services.events import event_bus
+from app.services.http_client import http_client
+from app.services.kafka_producer import kafka_producer
+from app.services.kafka_replies import kafka_replies
+from app.services.leases import lease_keeper
+from app.services.recovery import recovery_sweeper
+from app.services.worker_pool import worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create process-wide resources on startup and release them on shutdown"""
+    await http_client.start()
+    await lease_keeper.start()
+    await event_bus.start()
+    if settings.WORKER_QUEUE_BACKEND == "memory":
+        # With the postgres backend executions are run (and recovered) by `saga-express worker` processes
+        await worker_pool.start()
+        if settings.RECOVERY_ENABLED:
+            await recovery_sweeper.start()
+    try:
+        yield
+    finally:
+        await recovery_sweeper.stop()
+        await worker_pool.stop()
+        await lease_keeper.stop()
+        await event_bus.stop()
+        await http_client.close()
+        await kafka_producer.close()
+        await kafka_replies.close()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="SAGA orchestration engine with FastAPI"
+    description="SAGA orchestration engine with FastAPI",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,6 +54,7 @@ app.add_middleware(
 # Include routers
 app.include_router(saga_configuration.router, prefix=settings.API_PREFIX)
 app.include_router(saga_execution.router, prefix=settings.API_PREFIX)
+app.include_router(monitoring.router, prefix=settings.API_PREFIX)
 
 
 @app.get("/")
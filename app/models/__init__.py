@@ -1,16 +1,22 @@
 from app.models.saga_configuration import SagaConfiguration, SagaConfigurationStatus
 from app.models.saga_execution import (
+    SagaCorrelationId,
     SagaExecution,
     SagaExecutionStatus,
     SagaExecutionStep,
-    SagaExecutionStepStatus
+    SagaExecutionStepStatus,
+    SagaIdempotencyKey,
+    SagaStepPayload
 )
 
 __all__ = [
     "SagaConfiguration",
     "SagaConfigurationStatus",
+    "SagaCorrelationId",
     "SagaExecution",
     "SagaExecutionStatus",
     "SagaExecutionStep",
     "SagaExecutionStepStatus",
+    "SagaIdempotencyKey",
+    "SagaStepPayload",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey, JSON, Index, LargeBinary, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -13,12 +13,23 @@ class SagaExecutionStatus(str, enum.Enum):
     ROLLED_BACK = "rolled_back"
 
 
+# Steps join on the execution's full primary key, so that step lookups are pruned to one partition
+STEPS_JOIN = (
+    "and_(SagaExecution.id == foreign(SagaExecutionStep.saga_execution_id), "
+    "SagaExecution.started_at == foreign(SagaExecutionStep.execution_started_at))"
+)
+
+
 class SagaExecution(Base):
+    """Saga run; the table is range partitioned by month on started_at (see app.services.partitions)"""
     __tablename__ = "saga_executions"
     
-    id = Column(Integer, primary_key=True, index=True)
+    # The primary key includes the partition key; id alone identifies an execution
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     saga_configuration_id = Column(Integer, ForeignKey("saga_configurations.id"), nullable=False)
-    correlation_id = Column(String(255), unique=True, nullable=False, index=True)
+    # Unique by construction (uuid); partitioned tables cannot enforce it across partitions,
+    # so ids that may be submitted twice are claimed in saga_correlation_ids
+    correlation_id = Column(String(255), nullable=False, index=True)
     status = Column(
         SQLEnum(SagaExecutionStatus),
         default=SagaExecutionStatus.PENDING,
@@ -27,11 +38,39 @@ class SagaExecution(Base):
     input_data = Column(JSON, nullable=False)
     output_data = Column(JSON, nullable=True)
     error_message = Column(Text, nullable=True)
-    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # Saga context as of the last journal flush, used to resume after a crash
+    context_snapshot = Column(JSON, nullable=True)
+    # Work queue lease of the worker currently running the execution
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationship
-    steps = relationship("SagaExecutionStep", back_populates="execution", cascade="all, delete-orphan")
+    steps = relationship(
+        "SagaExecutionStep",
+        back_populates="execution",
+        cascade="all, delete-orphan",
+        primaryjoin=STEPS_JOIN
+    )
+    
+    __mapper_args__ = {"primary_key": [id]}
+    
+    __table_args__ = (
+        # Keyset pagination of the listing, unfiltered and per filter
+        Index("ix_saga_executions_started_at_id", "started_at", "id"),
+        Index("ix_saga_executions_status_started_at_id", "status", "started_at", "id"),
+        Index(
+            "ix_saga_executions_configuration_started_at_id",
+            "saga_configuration_id", "started_at", "id"
+        ),
+        Index("ix_saga_executions_pending", "id", postgresql_where=text("status = 'PENDING'")),
+        Index(
+            "ix_saga_executions_unfinished_lease",
+            "lease_expires_at",
+            postgresql_where=text("completed_at IS NULL AND status IN ('RUNNING', 'FAILED')")
+        ),
+    )
 
 
 class SagaExecutionStepStatus(str, enum.Enum):
@@ -44,10 +83,14 @@ class SagaExecutionStepStatus(str, enum.Enum):
 
 
 class SagaExecutionStep(Base):
+    """Step of a saga run, partitioned like its execution on execution_started_at"""
     __tablename__ = "saga_execution_steps"
     
-    id = Column(Integer, primary_key=True, index=True)
-    saga_execution_id = Column(Integer, ForeignKey("saga_executions.id"), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    # No foreign key: partitions of both tables are dropped together by the retention job
+    saga_execution_id = Column(Integer, nullable=False, index=True)
+    # Partition key, copied from the execution so its steps land in the matching partition
+    execution_started_at = Column(DateTime(timezone=True), primary_key=True)
     step_name = Column(String(255), nullable=False)
     step_type = Column(String(50), nullable=False)  # api or kafka
     status = Column(
@@ -60,6 +103,79 @@ class SagaExecutionStep(Base):
     error_message = Column(Text, nullable=True)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    rollback_started_at = Column(DateTime(timezone=True), nullable=True)
+    rollback_completed_at = Column(DateTime(timezone=True), nullable=True)
+    rollback_error = Column(Text, nullable=True)
+    attempts = Column(JSON, nullable=True)  # one entry per forward and rollback attempt
     
     # Relationship
-    execution = relationship("SagaExecution", back_populates="steps")
+    execution = relationship("SagaExecution", back_populates="steps", primaryjoin=STEPS_JOIN)
+    # Payloads stored compressed aside; must be eager loaded to render the step
+    payloads = relationship(
+        "SagaStepPayload",
+        primaryjoin=(
+            "and_(SagaExecutionStep.id == foreign(SagaStepPayload.step_id), "
+            "SagaExecutionStep.execution_started_at == foreign(SagaStepPayload.execution_started_at))"
+        ),
+        viewonly=True,
+        lazy="raise"
+    )
+
+
+class SagaStepPayload(Base):
+    """Compressed request or response payload of a step, too large to keep inline"""
+    __tablename__ = "saga_step_payloads"
+    
+    step_id = Column(Integer, primary_key=True)
+    kind = Column(String(16), primary_key=True)  # request or response
+    # Partition key, the same as the step's
+    execution_started_at = Column(DateTime(timezone=True), primary_key=True)
+    saga_execution_id = Column(Integer, nullable=False, index=True)
+    encoding = Column(String(16), nullable=False)  # zstd or gzip
+    size = Column(Integer, nullable=False)  # uncompressed JSON bytes
+    data = Column(LargeBinary, nullable=False)
+
+
+class SagaIdempotencyKey(Base):
+    """Idempotency-Key of a submission and the execution it started
+    
+    Not partitioned, so that the database enforces one execution per key and
+    configuration; rows are purged with the partition of their execution.
+    """
+    __tablename__ = "saga_idempotency_keys"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    saga_configuration_id = Column(Integer, ForeignKey("saga_configurations.id"), nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+    # SHA-256 of the submitted input_data, to reject a key reused for another input
+    request_hash = Column(String(64), nullable=False)
+    # No foreign key: the execution lives in a partition dropped by the retention job
+    execution_id = Column(Integer, nullable=False)
+    execution_started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index(
+            "ux_saga_idempotency_keys_configuration_key",
+            "saga_configuration_id", "idempotency_key",
+            unique=True
+        ),
+    )
+
+
+class SagaCorrelationId(Base):
+    """Correlation id claimed by an execution whose id is not random
+    
+    The Kafka trigger derives correlation ids from record coordinates, so that a
+    redelivered record maps to the execution already started. Not partitioned, so
+    that the database enforces one execution per id; rows are purged with the
+    partition of their execution.
+    """
+    __tablename__ = "saga_correlation_ids"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    correlation_id = Column(String(255), nullable=False, unique=True)
+    # No foreign key: the execution lives in a partition dropped by the retention job
+    execution_id = Column(Integer, nullable=False)
+    execution_started_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
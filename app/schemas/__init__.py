@@ -8,8 +8,14 @@ from app.schemas.saga_configuration import (
 from app.schemas.saga_execution import (
     SagaExecutionResponse,
     SagaExecutionStepResponse,
+    SagaExecutionSummaryResponse,
+    SagaExecutionStepSummaryResponse,
     SagaExecutionCreate,
     SagaTestRequest,
+    SagaSubmitRequest,
+    SagaSubmitResponse,
+    SagaBulkExecutionResponse,
+    SagaBulkError,
 )
 
 __all__ = [
@@ -20,6 +26,12 @@ __all__ = [
     "SagaConfigurationStatusUpdate",
     "SagaExecutionResponse",
     "SagaExecutionStepResponse",
+    "SagaExecutionSummaryResponse",
+    "SagaExecutionStepSummaryResponse",
     "SagaExecutionCreate",
     "SagaTestRequest",
+    "SagaSubmitRequest",
+    "SagaSubmitResponse",
+    "SagaBulkExecutionResponse",
+    "SagaBulkError",
 ]
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-from app.models.saga_execution import SagaExecutionStatus, SagaExecutionStepStatus
+from app.models.saga_execution import SagaExecutionStatus, SagaExecutionStep, SagaExecutionStepStatus
+from app.services.payloads import PAYLOAD_COLUMNS, decompress
 
 
 class SagaExecutionStepResponse(BaseModel):
@@ -14,6 +15,23 @@ class SagaExecutionStepResponse(BaseModel):
     error_message: Optional[str] = None
     started_at: datetime
     completed_at: Optional[datetime] = None
+    rollback_started_at: Optional[datetime] = None
+    rollback_completed_at: Optional[datetime] = None
+    rollback_error: Optional[str] = None
+    attempts: Optional[List[Dict[str, Any]]] = None
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _inline_payloads(cls, data: Any) -> Any:
+        """Render payloads stored compressed in saga_step_payloads in place of their empty columns"""
+        if not isinstance(data, SagaExecutionStep) or not data.payloads:
+            return data
+        values = {name: getattr(data, name) for name in cls.model_fields}
+        for payload in data.payloads:
+            column = PAYLOAD_COLUMNS.get(payload.kind)
+            if column is not None and values[column] is None:
+                values[column] = decompress(payload.encoding, payload.data)
+        return values
     
     class Config:
         from_attributes = True
@@ -35,6 +53,36 @@ class SagaExecutionResponse(BaseModel):
         from_attributes = True
 
 
+class SagaExecutionStepSummaryResponse(BaseModel):
+    id: int
+    step_name: str
+    step_type: str
+    status: SagaExecutionStepStatus
+    error_message: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    rollback_started_at: Optional[datetime] = None
+    rollback_completed_at: Optional[datetime] = None
+    rollback_error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class SagaExecutionSummaryResponse(BaseModel):
+    id: int
+    saga_configuration_id: int
+    correlation_id: str
+    status: SagaExecutionStatus
+    error_message: Optional[str] = None
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    steps: List[SagaExecutionStepSummaryResponse] = []
+    
+    class Config:
+        from_attributes = True
+
+
 class SagaExecutionCreate(BaseModel):
     input_data: Dict[str, Any] = Field(..., description="Input data for saga execution")
 
@@ -42,3 +90,36 @@ class SagaExecutionCreate(BaseModel):
 class SagaTestRequest(BaseModel):
     saga_configuration_id: int = Field(..., description="ID of the saga configuration to test")
     input_data: Dict[str, Any] = Field(..., description="Test input data")
+    idempotency_key: Optional[str] = Field(
+        None,
+        max_length=255,
+        description="Alternative to the Idempotency-Key header"
+    )
+
+
+class SagaSubmitRequest(BaseModel):
+    saga_configuration_id: int = Field(..., description="ID of the saga configuration to execute")
+    input_data: Dict[str, Any] = Field(..., description="Input data for saga execution")
+    idempotency_key: Optional[str] = Field(
+        None,
+        max_length=255,
+        description="Alternative to the Idempotency-Key header"
+    )
+
+
+class SagaSubmitResponse(BaseModel):
+    id: int
+    correlation_id: str
+    status: SagaExecutionStatus
+    
+    class Config:
+        from_attributes = True
+
+
+class SagaBulkExecutionResponse(SagaExecutionResponse):
+    index: int = Field(..., description="Position of the input_data in the request body")
+
+
+class SagaBulkError(BaseModel):
+    index: int = Field(..., description="Position of the rejected input_data in the request body")
+    error: str
@@ -0,0 +1,168 @@
+import asyncio
+import codecs
+import json
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from starlette.responses import StreamingResponse
+
+from app.core.config import settings
+
+WHITESPACE = re.compile(r"\s*")
+
+
+class BulkInputError(ValueError):
+    """Raised when a bulk request body is not a JSON array or a stream of JSON values"""
+
+
+async def iter_json_values(
+    chunks: AsyncIterator[bytes],
+    max_item_bytes: Optional[int] = None
+) -> AsyncIterator[Any]:
+    """Decode a JSON array or NDJSON (any whitespace-separated JSON values) incrementally
+
+    Only the current item is held in memory: values are yielded as soon as they are
+    complete and the bytes behind them are dropped.
+    """
+    max_item_bytes = max_item_bytes or settings.BULK_MAX_ITEM_BYTES
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    iterator = chunks.__aiter__()
+    buffer = ""
+    pos = 0
+    more = True
+    # None until the first character tells whether the body is an array
+    array: Optional[bool] = None
+    # Inside an array: whether the next token must be a value (after '[' or ',')
+    expect_value = True
+    after_comma = False
+
+    async def fill():
+        nonlocal buffer, pos, more
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            chunk, more = b"", False
+        try:
+            text = utf8.decode(chunk, final=not more)
+        except UnicodeDecodeError as e:
+            raise BulkInputError(f"Request body is not valid UTF-8: {str(e)}")
+        buffer = buffer[pos:] + text
+        pos = 0
+
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if more:
+                await fill()
+                continue
+            if array:
+                raise BulkInputError("Unterminated JSON array")
+            return
+
+        char = buffer[pos]
+        if array is None:
+            array = char == "["
+            if array:
+                pos += 1
+                continue
+        if array:
+            if char == "]":
+                if after_comma:
+                    raise BulkInputError("Trailing ',' in the JSON array")
+                # Anything after the closing bracket is ignored
+                return
+            if not expect_value:
+                if char != ",":
+                    raise BulkInputError(f"Expected ',' or ']' in the JSON array, found {char!r}")
+                pos += 1
+                expect_value = after_comma = True
+                continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if more and len(buffer) - pos <= max_item_bytes:
+                # Most likely an item split across chunks
+                await fill()
+                continue
+            raise BulkInputError(f"Invalid JSON item: {e.msg}")
+        if end == len(buffer) and more and not isinstance(value, (dict, list, str)):
+            # A number or literal cut at the chunk boundary may continue in the next chunk
+            await fill()
+            continue
+        pos = end
+        expect_value = not array
+        after_comma = False
+        yield value
+
+
+async def run_bulk(
+    items: AsyncIterator[Any],
+    run: Callable[[int, Any], Awaitable[Dict[str, Any]]],
+    concurrency: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run `run(index, item)` for every item with at most `concurrency` in flight
+
+    Results are yielded in completion order. The next item is only read once there
+    is a free slot, so a slow consumer of the results throttles the input. An input
+    error stops reading; the items already running finish and the error is yielded
+    last.
+    """
+    iterator = items.__aiter__()
+    running: Set[asyncio.Future] = set()
+    reading: Optional[asyncio.Future] = None
+    exhausted = False
+    input_error: Optional[str] = None
+    index = 0
+
+    try:
+        while True:
+            if reading is None and not exhausted and len(running) < concurrency:
+                reading = asyncio.ensure_future(iterator.__anext__())
+            waiting = running | ({reading} if reading is not None else set())
+            if not waiting:
+                break
+
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if reading in done:
+                task, reading = reading, None
+                try:
+                    item = task.result()
+                except StopAsyncIteration:
+                    exhausted = True
+                except BulkInputError as e:
+                    exhausted = True
+                    input_error = str(e)
+                else:
+                    running.add(asyncio.ensure_future(run(index, item)))
+                    index += 1
+            for task in done & running:
+                running.discard(task)
+                yield task.result()
+
+        if input_error is not None:
+            yield {"index": index, "error": input_error}
+    finally:
+        # Client gone or generator closed early: stop what is still in flight
+        pending = running | ({reading} if reading is not None else set())
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streaming response that can keep reading the request body while it streams
+
+    Below ASGI spec 2.4, StreamingResponse listens for the client disconnect by
+    consuming receive() concurrently, which would swallow the request body chunks
+    that the streamed content is still reading. A disconnect is noticed by the
+    body reader instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,156 @@
+import enum
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a downstream whose circuit breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit breaker '{name}' is open (retry in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """Thresholds of a circuit breaker; without a name the breaker is keyed by host"""
+    name: Optional[str] = None
+    failure_threshold: int = field(
+        default_factory=lambda: settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    )
+    reset_timeout: float = field(default_factory=lambda: settings.CIRCUIT_BREAKER_RESET_TIMEOUT)
+    half_open_max_calls: int = field(
+        default_factory=lambda: settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS
+    )
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker
+
+    closed: calls go through; `failure_threshold` consecutive failures open it.
+    open: calls fail immediately until `reset_timeout` elapsed, then half-open.
+    half_open: up to `half_open_max_calls` probes go through; a successful probe
+    closes the breaker and a failed one opens it again.
+    """
+
+    def __init__(self, name: str, policy: BreakerPolicy):
+        self.name = name
+        self.policy = policy
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _retry_in(self, now: float) -> float:
+        return max(self.opened_at + self.policy.reset_timeout - now, 0.0)
+
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self.probes = 0
+
+    def acquire(self):
+        """Admit one call, or raise CircuitOpenError"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if self._retry_in(now) > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, self._retry_in(now))
+                self.state = CircuitState.HALF_OPEN
+                self.probes = 0
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self.probes >= self.policy.half_open_max_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+                self.probes += 1
+
+            self.calls += 1
+
+    def release(self, success: Optional[bool]):
+        """Report the outcome of an admitted call; None means it was abandoned"""
+        now = time.monotonic()
+        with self._lock:
+            probing = self.state == CircuitState.HALF_OPEN
+            if probing:
+                self.probes = max(self.probes - 1, 0)
+
+            if success is None:
+                return
+            if success:
+                self.consecutive_failures = 0
+                if probing:
+                    self.state = CircuitState.CLOSED
+                    self.opened_at = None
+                return
+
+            self.failures += 1
+            self.consecutive_failures += 1
+            if probing or (
+                self.state == CircuitState.CLOSED
+                and self.consecutive_failures >= self.policy.failure_threshold
+            ):
+                self._open(now)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "state": self.state.value,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in": self._retry_in(now) if self.state == CircuitState.OPEN else None,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "failure_threshold": self.policy.failure_threshold,
+                "reset_timeout": self.policy.reset_timeout,
+                "half_open_max_calls": self.policy.half_open_max_calls,
+            }
+
+
+class CircuitBreakers:
+    """Process-wide circuit breakers shared by every SagaExecutor"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, policy: BreakerPolicy) -> CircuitBreaker:
+        """Get or create a breaker; the thresholds of the latest policy apply"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, policy)
+                self._breakers[name] = breaker
+            elif breaker.policy != policy:
+                breaker.policy = policy
+            return breaker
+
+    def reset(self, name: str) -> bool:
+        """Forget a breaker's state; it starts closed on its next call"""
+        with self._lock:
+            return self._breakers.pop(name, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.stats() for name, breaker in breakers.items()}
+
+
+circuit_breakers = CircuitBreakers()
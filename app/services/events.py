@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import asyncpg
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.models import SagaExecution, SagaExecutionStep
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads are limited to 8000 bytes; long error messages are cut to fit
+MAX_ERROR_LENGTH = 1000
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _error(message: Optional[str]) -> Optional[str]:
+    if message is not None and len(message) > MAX_ERROR_LENGTH:
+        return message[:MAX_ERROR_LENGTH] + "..."
+    return message
+
+
+def step_event(step: SagaExecutionStep) -> Dict[str, Any]:
+    """Progress event of a step transition (without request and response payloads)"""
+    return {
+        "event": "step",
+        "execution_id": step.saga_execution_id,
+        "step_name": step.step_name,
+        "step_type": step.step_type,
+        "status": step.status.value,
+        "error_message": _error(step.error_message),
+        "attempts": len(step.attempts or []),
+        "started_at": _iso(step.started_at),
+        "completed_at": _iso(step.completed_at),
+        "rollback_started_at": _iso(step.rollback_started_at),
+        "rollback_completed_at": _iso(step.rollback_completed_at),
+        "rollback_error": _error(step.rollback_error),
+    }
+
+
+def execution_event(execution: SagaExecution) -> Dict[str, Any]:
+    """Progress event of an execution status change; `finished` marks the last one"""
+    return {
+        "event": "execution",
+        "execution_id": execution.id,
+        "status": execution.status.value,
+        "error_message": _error(execution.error_message),
+        "completed_at": _iso(execution.completed_at),
+        "finished": execution.completed_at is not None,
+    }
+
+
+def _listen_dsn() -> str:
+    """Plain asyncpg DSN of the application database"""
+    url = async_engine.url.set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class ExecutionEventBus:
+    """In-process pub/sub of execution progress, bridged across processes with NOTIFY
+
+    The executor publishes every step and execution transition. Subscribers of the
+    execution in this process get it right away; when the bus is started, the event
+    is also sent with pg_notify on a dedicated connection, so that API processes
+    listening on the channel deliver it to their own subscribers. Events carrying
+    this process' origin are ignored by its listener, as they were delivered already.
+    """
+
+    def __init__(self, channel: Optional[str] = None, queue_size: Optional[int] = None):
+        self.channel = channel or settings.EVENTS_CHANNEL
+        self.queue_size = queue_size or settings.EVENTS_SUBSCRIBER_QUEUE_SIZE
+        self.origin = uuid.uuid4().hex
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._outbox: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listen = False
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    async def start(self, listen: bool = True):
+        """Start bridging events through Postgres (`listen` also delivers remote events)"""
+        if not settings.EVENTS_NOTIFY_ENABLED or self._task is not None:
+            return
+        if async_engine.dialect.name != "postgresql":
+            return
+        self._listen = listen
+        self._outbox = asyncio.Queue(maxsize=settings.EVENTS_OUTBOX_SIZE)
+        self._task = asyncio.create_task(self._bridge(), name="execution-events")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._outbox = None
+
+    @asynccontextmanager
+    async def subscribe(self, execution_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving the events of one execution while the context is open"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(execution_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(execution_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[execution_id]
+
+    def publish(self, event: Dict[str, Any]):
+        """Deliver an event to local subscribers and queue it for other processes"""
+        self.published += 1
+        self._deliver(event)
+        if self._outbox is not None:
+            try:
+                self._outbox.put_nowait(event)
+            except asyncio.QueueFull:
+                # Progress events are best effort; the database stays the source of truth
+                self.dropped += 1
+
+    def _deliver(self, event: Dict[str, Any]):
+        for queue in self._subscribers.get(event["execution_id"], ()):
+            if queue.full():
+                # A slow subscriber loses its oldest event rather than blocking the saga
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return
+        self.received += 1
+        self._deliver(message["event"])
+
+    async def _bridge(self):
+        """Keep a dedicated connection listening and sending notifications, reconnecting on errors"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(_listen_dsn())
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _, lost=lost: lost.set())
+                if self._listen:
+                    await connection.add_listener(self.channel, self._on_notify)
+                await self._send_notifications(connection, lost)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Execution event bridge failed, reconnecting")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(settings.EVENTS_RECONNECT_INTERVAL)
+
+    async def _send_notifications(self, connection: asyncpg.Connection, lost: asyncio.Event):
+        while not lost.is_set():
+            getter = asyncio.ensure_future(self._outbox.get())
+            waiter = asyncio.ensure_future(lost.wait())
+            try:
+                await asyncio.wait({getter, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+                if not getter.done():
+                    getter.cancel()
+            if not getter.done() or getter.cancelled():
+                return
+
+            # Whatever piled up meanwhile goes out in the same round trip
+            events = [getter.result()]
+            while not self._outbox.empty():
+                events.append(self._outbox.get_nowait())
+            await connection.executemany(
+                "SELECT pg_notify($1, $2)",
+                [
+                    (self.channel, json.dumps({"origin": self.origin, "event": event}))
+                    for event in events
+                ]
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "bridged": self.started,
+            "listening": self.started and self._listen,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+
+event_bus = ExecutionEventBus()
@@ -0,0 +1,281 @@
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, List, Optional, Set, Tuple
+
+
+Evaluator = Callable[[Mapping], Any]
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<placeholder>\$\{[^}]+\})
+  | (?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+  | (?P<op>&&|\|\||==|!=|<=|>=|<|>|!|\(|\)|\[|\]|,)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_\-]*(?:\.[A-Za-z0-9_\-]+)*)
+''', re.VERBOSE)
+
+KEYWORDS = {"true": True, "false": False, "null": None, "none": None}
+# Roots a bare (unwrapped) path may start with, besides the names of the saga's
+# steps: the step's own outputs and the saga input. Any other bareword, such as
+# APPROVED in `response.body.state == APPROVED`, is a string, as it always was.
+SCOPE_ROOTS = frozenset(["response", "kafka", "reply", "webhook"])
+COMPARISON_OPERATORS = ("==", "!=", "<", ">", "<=", ">=", "in")
+
+
+class ExpressionError(ValueError):
+    """Raised when a condition cannot be tokenized or parsed"""
+
+
+class Token:
+    def __init__(self, kind: str, value: Any, position: int):
+        self.kind = kind
+        self.value = value
+        self.position = position
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.value!r})"
+
+
+def tokenize(source: str) -> List[Token]:
+    """Split a condition into typed tokens"""
+    tokens = []
+    position = 0
+    while position < len(source):
+        match = TOKEN_PATTERN.match(source, position)
+        if not match:
+            raise ExpressionError(
+                f"Unexpected character {source[position]!r} at position {position} in: {source}"
+            )
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == "number":
+            value = float(text) if any(c in text for c in ".eE") else int(text)
+            tokens.append(Token("literal", value, position))
+        elif kind == "string":
+            body = text[1:-1]
+            value = re.sub(r'\\(.)', r'\1', body)
+            tokens.append(Token("literal", value, position))
+        elif kind == "placeholder":
+            tokens.append(Token("path", text[2:-1].strip(), position))
+        elif kind == "name":
+            lowered = text.lower()
+            if lowered in KEYWORDS:
+                tokens.append(Token("literal", KEYWORDS[lowered], position))
+            elif text == "in":
+                tokens.append(Token("op", "in", position))
+            else:
+                tokens.append(Token("name", text, position))
+        elif kind == "op":
+            tokens.append(Token("op", text, position))
+        position = match.end()
+    return tokens
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if _is_number(value):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _coerce_pair(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Compare numbers with numeric strings numerically, everything else as-is"""
+    if _is_number(left) or _is_number(right):
+        left_num = _as_number(left)
+        right_num = _as_number(right)
+        if left_num is not None and right_num is not None:
+            return left_num, right_num
+    return left, right
+
+
+def _equals(left: Any, right: Any) -> bool:
+    left, right = _coerce_pair(left, right)
+    if isinstance(left, bool) != isinstance(right, bool):
+        return False
+    return left == right
+
+
+def _ordered(compare: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def apply(left: Any, right: Any) -> bool:
+        left, right = _coerce_pair(left, right)
+        try:
+            return bool(compare(left, right))
+        except TypeError:
+            return False
+    return apply
+
+
+def _contains(left: Any, right: Any) -> bool:
+    if right is None:
+        return False
+    if isinstance(right, (list, tuple)):
+        return any(_equals(left, item) for item in right)
+    try:
+        return left in right
+    except TypeError:
+        return False
+
+
+COMPARATORS = {
+    "==": _equals,
+    "!=": lambda left, right: not _equals(left, right),
+    "<": _ordered(lambda left, right: left < right),
+    ">": _ordered(lambda left, right: left > right),
+    "<=": _ordered(lambda left, right: left <= right),
+    ">=": _ordered(lambda left, right: left >= right),
+    "in": _contains,
+}
+
+
+def _compile_path(path: str) -> Evaluator:
+    parts = tuple(path.split('.'))
+
+    def evaluate(scope: Mapping) -> Any:
+        current: Any = scope
+        for part in parts:
+            if isinstance(current, Mapping) and part in current:
+                current = current[part]
+            elif isinstance(current, list) and part.isdigit() and int(part) < len(current):
+                current = current[int(part)]
+            else:
+                return None
+        return current
+
+    return evaluate
+
+
+class _Parser:
+    """Recursive-descent parser producing nested evaluator closures"""
+
+    def __init__(self, source: str, roots: FrozenSet[str]):
+        self.source = source
+        self.roots = roots
+        self.tokens = tokenize(source)
+        self.index = 0
+        self.references: Set[str] = set()
+
+    def _peek(self) -> Optional[Token]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def _accept(self, *ops: str) -> Optional[Token]:
+        token = self._peek()
+        if token is not None and token.kind == "op" and token.value in ops:
+            self.index += 1
+            return token
+        return None
+
+    def _expect(self, op: str):
+        if self._accept(op) is None:
+            raise ExpressionError(f"Expected '{op}' in: {self.source}")
+
+    def parse(self) -> Evaluator:
+        if not self.tokens:
+            raise ExpressionError("Empty condition")
+        evaluator = self._parse_or()
+        token = self._peek()
+        if token is not None:
+            raise ExpressionError(
+                f"Unexpected {token.value!r} at position {token.position} in: {self.source}"
+            )
+        return evaluator
+
+    def _parse_or(self) -> Evaluator:
+        operands = [self._parse_and()]
+        while self._accept("||"):
+            operands.append(self._parse_and())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda scope: any(operand(scope) for operand in operands)
+
+    def _parse_and(self) -> Evaluator:
+        operands = [self._parse_not()]
+        while self._accept("&&"):
+            operands.append(self._parse_not())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda scope: all(operand(scope) for operand in operands)
+
+    def _parse_not(self) -> Evaluator:
+        if self._accept("!"):
+            operand = self._parse_not()
+            return lambda scope: not operand(scope)
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> Evaluator:
+        left = self._parse_operand()
+        token = self._accept(*COMPARISON_OPERATORS)
+        if token is None:
+            return left
+        right = self._parse_operand()
+        comparator = COMPARATORS[token.value]
+        return lambda scope: comparator(left(scope), right(scope))
+
+    def _parse_operand(self) -> Evaluator:
+        if self._accept("("):
+            inner = self._parse_or()
+            self._expect(")")
+            return inner
+
+        if self._accept("["):
+            items: List[Evaluator] = []
+            if not self._accept("]"):
+                items.append(self._parse_operand())
+                while self._accept(","):
+                    items.append(self._parse_operand())
+                self._expect("]")
+            return lambda scope: [item(scope) for item in items]
+
+        token = self._peek()
+        if token is None:
+            raise ExpressionError(f"Unexpected end of condition: {self.source}")
+        self.index += 1
+
+        if token.kind == "name" and token.value.split('.')[0] not in self.roots:
+            text = token.value
+            return lambda scope: text
+        if token.kind == "literal":
+            value = token.value
+            return lambda scope: value
+        if token.kind in ("path", "name"):
+            self.references.add(token.value.split('.')[0])
+            return _compile_path(token.value)
+        raise ExpressionError(
+            f"Unexpected {token.value!r} at position {token.position} in: {self.source}"
+        )
+
+
+class Expression:
+    """Compiled success condition"""
+
+    def __init__(self, source: str, roots: FrozenSet[str] = SCOPE_ROOTS):
+        parser = _Parser(source, roots)
+        self.source = source
+        self._evaluate = parser.parse()
+        # Root names (first path segment) of every path in the condition
+        self.references: FrozenSet[str] = frozenset(parser.references)
+
+    def evaluate(self, scope: Mapping) -> bool:
+        """Evaluate the condition against a scope, short-circuiting && and ||"""
+        return bool(self._evaluate(scope))
+
+    def __repr__(self) -> str:
+        return f"Expression({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str, roots: FrozenSet[str] = SCOPE_ROOTS) -> Expression:
+    """Compile a condition string into a reusable Expression
+
+    Bare paths are only resolved when they start with one of `roots`; `${...}`
+    paths always are.
+    """
+    return Expression(source, roots)
@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+
+
+class HttpClientPool:
+    """Process-wide pooled HTTP client shared by API steps and rollbacks"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_stats: Dict[str, Dict[str, int]] = {}
+
+    async def start(self):
+        """Create the underlying client (called on application startup)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                http2=settings.HTTP_HTTP2,
+            )
+
+    async def close(self):
+        """Close every pooled connection (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("HTTP client pool is not started")
+        return self._client
+
+    def host_key(self, url: str) -> str:
+        """Downstream identity (host and explicit port) used for per-host limits"""
+        parsed = httpx.URL(url)
+        return f"{parsed.host}:{parsed.port}" if parsed.port else parsed.host
+
+    def _slots_for(self, host: str) -> asyncio.Semaphore:
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = asyncio.Semaphore(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+            self._host_slots[host] = slots
+            self._host_stats[host] = {"requests": 0, "errors": 0, "in_flight": 0, "waiting": 0}
+        return slots
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request, holding one of the per-host connection slots"""
+        if self._client is None:
+            # Scripts and workers outside the app lifespan start the pool lazily
+            await self.start()
+
+        host = self.host_key(url)
+        slots = self._slots_for(host)
+        stats = self._host_stats[host]
+
+        stats["waiting"] += 1
+        try:
+            await slots.acquire()
+        finally:
+            stats["waiting"] -= 1
+
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        try:
+            return await self.client.request(method=method, url=url, **kwargs)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            stats["in_flight"] -= 1
+            slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool statistics for monitoring, from this pool's own per-host counters"""
+        hosts = {
+            host: {
+                **stats,
+                "free_slots": settings.HTTP_MAX_CONNECTIONS_PER_HOST - stats["in_flight"],
+            }
+            for host, stats in self._host_stats.items()
+        }
+        return {
+            "started": self._client is not None,
+            "http2": settings.HTTP_HTTP2,
+            "limits": {
+                "max_connections": settings.HTTP_MAX_CONNECTIONS,
+                "max_connections_per_host": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+            },
+            "in_flight": sum(stats["in_flight"] for stats in self._host_stats.values()),
+            "waiting": sum(stats["waiting"] for stats in self._host_stats.values()),
+            "hosts": hosts,
+        }
+
+http_client = HttpClientPool()
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import SagaExecution, SagaIdempotencyKey
+
+# (saga configuration id, Idempotency-Key)
+Scope = Tuple[int, str]
+
+
+class IdempotencyKeyReused(ValueError):
+    """Raised when an idempotency key is submitted again with a different input_data"""
+
+
+class IdempotencyKeyTaken(RuntimeError):
+    """Raised when another submission stored the idempotency key first"""
+
+
+def request_hash(input_data: Any) -> str:
+    """SHA-256 of the canonical JSON of a submission's input_data"""
+    raw = json.dumps(input_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def claim_key(
+    db: AsyncSession,
+    saga_configuration_id: int,
+    key: str,
+    input_data: Dict[str, Any],
+    execution: SagaExecution
+) -> bool:
+    """Store the key of a flushed execution in the caller's transaction; False when already taken
+
+    A concurrent claim of the same key blocks on the unique index until the first
+    transaction ends, so exactly one of them stores it.
+    """
+    result = await db.execute(
+        pg_insert(SagaIdempotencyKey)
+        .values(
+            saga_configuration_id=saga_configuration_id,
+            idempotency_key=key,
+            request_hash=request_hash(input_data),
+            execution_id=execution.id,
+            execution_started_at=execution.started_at,
+        )
+        .on_conflict_do_nothing(index_elements=["saga_configuration_id", "idempotency_key"])
+        .returning(SagaIdempotencyKey.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def _find_key(db: AsyncSession, scope: Scope) -> Optional[SagaIdempotencyKey]:
+    result = await db.execute(
+        select(SagaIdempotencyKey).where(
+            SagaIdempotencyKey.saga_configuration_id == scope[0],
+            SagaIdempotencyKey.idempotency_key == scope[1]
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+@dataclass
+class _Entry:
+    request_hash: str
+    # Resolves to the execution id, or to None when the submission failed
+    execution_id: asyncio.Future
+    expires_at: float
+
+
+class IdempotencyGuard:
+    """Starts at most one execution per (configuration, Idempotency-Key)
+
+    The unique index of saga_idempotency_keys settles races between processes. A
+    bounded TTL cache in front of it answers retries seen by this process without a
+    query, and makes duplicates of a submission still in flight wait for it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Scope, _Entry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _cached(self, scope: Scope) -> Optional[_Entry]:
+        entry = self._entries.get(scope)
+        if entry is None:
+            return None
+        # Entries in flight never expire: their duplicates are waiting on them
+        if entry.execution_id.done() and entry.expires_at <= time.monotonic():
+            del self._entries[scope]
+            return None
+        self._entries.move_to_end(scope)
+        return entry
+
+    def _reserve(self, scope: Scope, digest: str) -> _Entry:
+        entry = _Entry(
+            request_hash=digest,
+            execution_id=asyncio.get_running_loop().create_future(),
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._entries[scope] = entry
+        self._entries.move_to_end(scope)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    @staticmethod
+    def _check(stored_hash: str, digest: str):
+        if stored_hash != digest:
+            raise IdempotencyKeyReused(
+                "Idempotency-Key was already used with a different input_data"
+            )
+
+    async def run_once(
+        self,
+        db: AsyncSession,
+        saga_configuration_id: int,
+        key: str,
+        input_data: Dict[str, Any],
+        submit: Callable[[], Awaitable[int]]
+    ) -> Tuple[int, bool]:
+        """Return the execution id for a key and whether it was replayed
+
+        `submit` creates the execution, claiming the key with claim_key, and returns
+        its id; it only runs when neither this process nor the database knows the key.
+        """
+        scope = (saga_configuration_id, key)
+        digest = request_hash(input_data)
+
+        entry = self._cached(scope)
+        if entry is not None:
+            self._check(entry.request_hash, digest)
+            execution_id = await asyncio.shield(entry.execution_id)
+            if execution_id is not None:
+                self.hits += 1
+                return execution_id, True
+            # The submission this one waited on failed: try again
+        self.misses += 1
+
+        entry = self._reserve(scope, digest)
+        execution_id: Optional[int] = None
+        replayed = True
+        try:
+            stored = await _find_key(db, scope)
+            if stored is None:
+                try:
+                    execution_id = await submit()
+                    replayed = False
+                except IdempotencyKeyTaken:
+                    # Another process stored the key between the lookup and the claim
+                    stored = await _find_key(db, scope)
+                    if stored is None:
+                        raise
+            if stored is not None:
+                self._check(stored.request_hash, digest)
+                execution_id = stored.execution_id
+        finally:
+            if not entry.execution_id.done():
+                entry.execution_id.set_result(execution_id)
+            if execution_id is None and self._entries.get(scope) is entry:
+                del self._entries[scope]
+        return execution_id, replayed
+
+    def forget(self, execution_id: int):
+        """Drop the cached keys of a deleted execution"""
+        for scope in [
+            scope for scope, entry in self._entries.items()
+            if entry.execution_id.done() and entry.execution_id.result() == execution_id
+        ]:
+            del self._entries[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "in_flight": sum(1 for entry in self._entries.values() if not entry.execution_id.done()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+idempotency_guard = IdempotencyGuard(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE,
+    ttl=settings.IDEMPOTENCY_CACHE_TTL
+)
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import threading
+from typing import Dict, Any, Optional, Union
+from kafka import KafkaProducer
+
+from app.core.config import settings
+
+
+def _parse_acks(value: str) -> Union[int, str]:
+    return value if value == "all" else int(value)
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    # The awaiting side may already have given up (timeout or cancellation)
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SharedKafkaProducer:
+    """App-scoped Kafka producer whose acknowledgements are awaited asynchronously"""
+
+    def __init__(self):
+        self._producer: Optional[KafkaProducer] = None
+        self._lock = threading.Lock()
+
+    def _get_producer(self) -> KafkaProducer:
+        """Get or create the underlying producer (blocking, run off the event loop)"""
+        with self._lock:
+            if self._producer is None:
+                self._producer = KafkaProducer(
+                    bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
+                    value_serializer=lambda v: json.dumps(v).encode('utf-8'),
+                    key_serializer=lambda k: k.encode('utf-8') if k else None,
+                    acks=_parse_acks(settings.KAFKA_ACKS),
+                    linger_ms=settings.KAFKA_LINGER_MS,
+                    batch_size=settings.KAFKA_BATCH_SIZE,
+                    compression_type=settings.KAFKA_COMPRESSION_TYPE or None,
+                    enable_idempotence=settings.KAFKA_ENABLE_IDEMPOTENCE,
+                    max_in_flight_requests_per_connection=settings.KAFKA_MAX_IN_FLIGHT,
+                )
+            return self._producer
+
+    async def send(
+        self,
+        topic: str,
+        value: Any,
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ):
+        """Publish a record and wait for its broker acknowledgement without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        ack: asyncio.Future = loop.create_future()
+
+        def on_success(metadata):
+            loop.call_soon_threadsafe(_resolve, ack, metadata)
+
+        def on_error(exc):
+            loop.call_soon_threadsafe(_resolve, ack, None, exc)
+
+        def enqueue():
+            # send() may block on metadata refresh or a full buffer, so it runs in a thread
+            future = self._get_producer().send(
+                topic=topic,
+                key=key,
+                value=value,
+                headers=[(k, str(v).encode('utf-8')) for k, v in (headers or {}).items()]
+            )
+            future.add_callback(on_success)
+            future.add_errback(on_error)
+
+        await loop.run_in_executor(None, enqueue)
+        return await asyncio.wait_for(ack, timeout or settings.KAFKA_ACK_TIMEOUT)
+
+    async def close(self):
+        """Flush pending batches and close the producer (called on application shutdown)"""
+        with self._lock:
+            producer, self._producer = self._producer, None
+        if producer is not None:
+            await asyncio.get_running_loop().run_in_executor(None, producer.close)
+
+
+kafka_producer = SharedKafkaProducer()
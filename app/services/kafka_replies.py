@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from kafka import KafkaConsumer, TopicPartition
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _decode(value: Optional[bytes]) -> Any:
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value.decode("utf-8", errors="replace")
+
+
+class ReplyConflictError(RuntimeError):
+    """Raised when a reply with the same correlation id is already being awaited"""
+
+
+class KafkaReplyConsumer:
+    """Process-wide consumer of reply topics that routes replies to waiting requests
+
+    Every process reads all partitions of the reply topics it awaits, without a
+    consumer group, starting from the end of each partition; replies are matched to
+    the waiting future by the value of their correlation header, and replies that
+    nobody here is waiting for (meant for another process) are ignored. All calls to
+    the kafka-python consumer run on one dedicated thread.
+    """
+
+    def __init__(self):
+        self._consumer: Optional[KafkaConsumer] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribing = asyncio.Lock()
+        self._topics: Set[str] = set()
+        # (topic, correlation header) -> waiting futures by correlation id
+        self._waiters: Dict[Tuple[str, str], Dict[str, asyncio.Future]] = {}
+        self.delivered = 0
+        self.unmatched = 0
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _connect(self):
+        if self._consumer is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kafka-replies")
+        self._consumer = await self._call(
+            lambda: KafkaConsumer(
+                bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
+                group_id=None,
+                enable_auto_commit=False,
+            )
+        )
+
+    def _assign(self, topic: str):
+        """Add every partition of a topic to the assignment, positioned at its end"""
+        partitions = self._consumer.partitions_for_topic(topic)
+        if not partitions:
+            raise RuntimeError(f"Reply topic not found: {topic}")
+        new = [TopicPartition(topic, partition) for partition in partitions]
+        self._consumer.assign(list(self._consumer.assignment()) + new)
+        self._consumer.seek_to_end(*new)
+        # Resolve the positions now, so that no reply produced from here on is skipped
+        for partition in new:
+            self._consumer.position(partition)
+
+    async def _subscribe(self, topic: str):
+        if topic in self._topics:
+            return
+        async with self._subscribing:
+            await self._connect()
+            if topic not in self._topics:
+                await self._call(self._assign, topic)
+                self._topics.add(topic)
+            if self._task is None:
+                # Polling starts once there is something assigned to poll
+                self._task = asyncio.create_task(self._consume(), name="kafka-replies")
+
+    def _poll(self) -> List[Any]:
+        batches = self._consumer.poll(timeout_ms=int(settings.KAFKA_REPLY_POLL_TIMEOUT * 1000))
+        return [record for records in batches.values() for record in records]
+
+    async def _consume(self):
+        while True:
+            try:
+                records = await self._call(self._poll)
+            except Exception:
+                logger.exception("Reply consumer poll failed")
+                await asyncio.sleep(settings.KAFKA_REPLY_POLL_TIMEOUT)
+                continue
+            for record in records:
+                self._dispatch(record)
+
+    def _dispatch(self, record: Any):
+        headers = {
+            key: value.decode("utf-8", errors="replace") if value is not None else None
+            for key, value in (record.headers or [])
+        }
+        for (topic, header), waiters in self._waiters.items():
+            if topic != record.topic or header not in headers:
+                continue
+            future = waiters.get(headers[header])
+            if future is not None and not future.done():
+                future.set_result({
+                    "topic": record.topic,
+                    "partition": record.partition,
+                    "offset": record.offset,
+                    "headers": headers,
+                    "body": _decode(record.value),
+                })
+                self.delivered += 1
+                return
+        self.unmatched += 1
+
+    async def request(
+        self,
+        send,
+        topic: str,
+        correlation_id: str,
+        correlation_key: str,
+        timeout: float
+    ) -> Dict[str, Any]:
+        """Publish a request through `send` and wait for its correlated reply on `topic`
+
+        The waiter is registered (and the topic assigned) before publishing, so an
+        immediate reply cannot be missed. Raises TimeoutError when no reply arrives.
+        """
+        await self._subscribe(topic)
+        waiters = self._waiters.setdefault((topic, correlation_key), {})
+        if correlation_id in waiters:
+            raise ReplyConflictError(
+                f"A reply on {topic} for {correlation_key}={correlation_id} is already awaited"
+            )
+        future = asyncio.get_running_loop().create_future()
+        waiters[correlation_id] = future
+        try:
+            metadata = await send()
+            reply = await asyncio.wait_for(future, timeout)
+            return {"metadata": metadata, "reply": reply}
+        finally:
+            waiters.pop(correlation_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "topics": sorted(self._topics),
+            "waiting": sum(len(waiters) for waiters in self._waiters.values()),
+            "delivered": self.delivered,
+            "unmatched": self.unmatched,
+        }
+
+    async def close(self):
+        """Stop consuming replies (called on application shutdown)"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        if self._consumer is None:
+            return
+        await self._call(self._consumer.close)
+        self._executor.shutdown(wait=False)
+        self._consumer = None
+        self._executor = None
+        self._topics.clear()
+
+
+kafka_replies = KafkaReplyConsumer()
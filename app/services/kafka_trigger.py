@@ -0,0 +1,390 @@
+import asyncio
+import json
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from kafka import ConsumerRebalanceListener, KafkaConsumer, TopicPartition
+from kafka.errors import CommitFailedError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import (
+    SagaConfiguration,
+    SagaCorrelationId,
+    SagaConfigurationStatus,
+    SagaExecution,
+    SagaExecutionStatus,
+)
+from app.services.events import event_bus
+from app.services.http_client import http_client
+from app.services.kafka_producer import kafka_producer
+from app.services.kafka_replies import kafka_replies
+from app.services.leases import lease_keeper
+from app.services.plan_cache import plan_cache
+from app.services.recovery import recovery_sweeper
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import SagaPlanError, TriggerPlan
+
+logger = logging.getLogger(__name__)
+
+# Correlation ids of triggered executions are derived from the record coordinates,
+# so a record delivered again after a crash maps to the execution already stored
+TRIGGER_NAMESPACE = uuid.UUID("6f1c8c36-4a5e-4d1f-9a4f-3b0d2f6e8a71")
+
+
+class _PauseAssigned(ConsumerRebalanceListener):
+    """Keeps partitions assigned by a rebalance paused while the trigger is at capacity"""
+
+    def __init__(self, trigger: "TriggerConsumer"):
+        self.trigger = trigger
+
+    def on_partitions_revoked(self, revoked):
+        pass
+
+    def on_partitions_assigned(self, assigned):
+        if self.trigger._paused and assigned:
+            self.trigger._consumer.pause(*assigned)
+
+
+class TriggerConsumer:
+    """Starts executions of one saga configuration from the records of its Kafka topic
+
+    The kafka-python consumer is not thread-safe, so every call to it runs on a
+    dedicated single-thread executor. Each polled batch is stored as RUNNING,
+    leased executions in one transaction before its offsets are committed; the
+    executions then run in this process. When `max_in_flight` executions are
+    running, the assigned partitions are paused (the consumer keeps polling to
+    stay in its group) and resumed as soon as an execution finishes. Partitions
+    assigned by a rebalance meanwhile are paused as well.
+    """
+
+    def __init__(
+        self,
+        saga_config: SagaConfiguration,
+        trigger: TriggerPlan,
+        max_in_flight: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.config_id = saga_config.id
+        self.name = saga_config.name
+        self.topic = trigger.topic
+        self.group = trigger.group or f"saga-express.{saga_config.name}"
+        self.max_in_flight = max_in_flight or settings.KAFKA_TRIGGER_MAX_IN_FLIGHT
+        self.batch_size = batch_size or settings.KAFKA_TRIGGER_BATCH_SIZE
+        self.poll_timeout = settings.KAFKA_TRIGGER_POLL_TIMEOUT
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"kafka-trigger-{self.config_id}"
+        )
+        self._consumer: Optional[KafkaConsumer] = None
+        self._running: Dict[int, asyncio.Task] = {}
+        self._paused = False
+        self.started = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.pauses = 0
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _connect(self) -> KafkaConsumer:
+        consumer = KafkaConsumer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
+            group_id=self.group,
+            enable_auto_commit=False,
+            auto_offset_reset=settings.KAFKA_TRIGGER_AUTO_OFFSET_RESET,
+            max_poll_records=self.batch_size,
+        )
+        consumer.subscribe([self.topic], listener=_PauseAssigned(self))
+        return consumer
+
+    def _poll(self, max_records: int, timeout: float) -> List[Any]:
+        batches = self._consumer.poll(timeout_ms=int(timeout * 1000), max_records=max_records)
+        return [record for records in batches.values() for record in records]
+
+    def _pause(self) -> bool:
+        """Pause every assigned partition; True when some were not paused yet"""
+        assigned = self._consumer.assignment() - self._consumer.paused()
+        if assigned:
+            self._consumer.pause(*assigned)
+        return bool(assigned)
+
+    def _poll_paused(self):
+        """Poll to stay in the group without consuming anything
+
+        Records can still come from partitions assigned before they were paused; their
+        partitions are rewound to the first of them, so they are delivered again (and
+        their offsets not committed past them) once consumption resumes.
+        """
+        first: Dict[TopicPartition, int] = {}
+        for record in self._poll(self.batch_size, 0):
+            partition = TopicPartition(record.topic, record.partition)
+            first[partition] = min(first.get(partition, record.offset), record.offset)
+        for partition, offset in first.items():
+            self._consumer.seek(partition, offset)
+        self._pause()
+
+    def _resume(self):
+        paused = self._consumer.paused()
+        if paused:
+            self._consumer.resume(*paused)
+
+    def _commit(self):
+        try:
+            self._consumer.commit()
+        except CommitFailedError as e:
+            # Partitions were reassigned: the batch is redelivered and deduplicated
+            logger.warning("Trigger %s could not commit offsets: %s", self.name, str(e))
+
+    async def run(self, stopping: asyncio.Event):
+        """Consume the topic until `stopping` is set"""
+        self._consumer = await self._call(self._connect)
+        logger.info(
+            "Trigger consumer for saga '%s' started (topic=%s, group=%s)",
+            self.name, self.topic, self.group
+        )
+        try:
+            while not stopping.is_set():
+                free = self.max_in_flight - len(self._running)
+                if free <= 0:
+                    await self._wait_for_capacity()
+                    continue
+
+                if self._paused:
+                    await self._call(self._resume)
+                    self._paused = False
+                records = await self._call(
+                    self._poll, min(free, self.batch_size), self.poll_timeout
+                )
+                if records:
+                    await self._ingest(records)
+        finally:
+            await self._drain()
+            await self._call(self._consumer.close)
+            self._executor.shutdown(wait=False)
+            logger.info("Trigger consumer for saga '%s' stopped", self.name)
+
+    async def _wait_for_capacity(self):
+        """Backpressure: pause the partitions until an in-flight execution finishes"""
+        if await self._call(self._pause):
+            self.pauses += 1
+        self._paused = True
+        await asyncio.wait(
+            list(self._running.values()),
+            timeout=self.poll_timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        # Paused partitions return no records, but polling keeps the group membership
+        await self._call(self._poll_paused)
+
+    def _correlation_id(self, record: Any) -> str:
+        key = f"{self.config_id}/{self.group}/{record.topic}/{record.partition}/{record.offset}"
+        return str(uuid.uuid5(TRIGGER_NAMESPACE, key))
+
+    def _decode(self, record: Any) -> Optional[Dict[str, Any]]:
+        """Input data of the execution started by a record (None for unreadable records)"""
+        try:
+            payload = json.loads(record.value) if record.value is not None else {}
+        except (TypeError, ValueError):
+            self.invalid += 1
+            logger.warning(
+                "Trigger %s skipped a non-JSON record at %s[%d]@%d",
+                self.name, record.topic, record.partition, record.offset
+            )
+            return None
+        return payload if isinstance(payload, dict) else {"value": payload}
+
+    async def _ingest(self, records: List[Any]):
+        inputs: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            payload = self._decode(record)
+            if payload is not None:
+                inputs[self._correlation_id(record)] = payload
+
+        execution_ids: List[int] = []
+        if inputs:
+            async with AsyncSessionLocal() as db:
+                try:
+                    execution_ids = await self._persist(db, inputs)
+                except IntegrityError:
+                    # Another consumer of the group stored part of the batch concurrently
+                    await db.rollback()
+                    execution_ids = await self._persist(db, inputs)
+
+        # Every record of the batch is now durable (or skipped), so its offsets can be committed
+        await self._call(self._commit)
+
+        for execution_id in execution_ids:
+            self._running[execution_id] = asyncio.create_task(self._execute(execution_id))
+
+    async def _persist(self, db: AsyncSession, inputs: Dict[str, Dict[str, Any]]) -> List[int]:
+        """Store new executions for the batch in one transaction and lease them to this process
+
+        Their correlation ids are claimed in saga_correlation_ids, whose unique
+        constraint makes a batch stored concurrently by another consumer fail here.
+        """
+        result = await db.execute(
+            select(SagaCorrelationId.correlation_id)
+            .where(SagaCorrelationId.correlation_id.in_(list(inputs)))
+        )
+        existing = set(result.scalars().all())
+        self.duplicates += len(existing)
+
+        rows = [
+            {
+                "saga_configuration_id": self.config_id,
+                "correlation_id": correlation_id,
+                "status": SagaExecutionStatus.RUNNING,
+                "input_data": input_data,
+                "lease_owner": lease_keeper.owner,
+                "lease_expires_at": lease_keeper.expiry(),
+            }
+            for correlation_id, input_data in inputs.items()
+            if correlation_id not in existing
+        ]
+        if not rows:
+            return []
+
+        result = await db.execute(
+            insert(SagaExecution).values(rows).returning(
+                SagaExecution.id, SagaExecution.correlation_id, SagaExecution.started_at
+            )
+        )
+        stored = result.all()
+        await db.execute(
+            insert(SagaCorrelationId).values([
+                {
+                    "correlation_id": correlation_id,
+                    "execution_id": execution_id,
+                    "execution_started_at": started_at,
+                }
+                for execution_id, correlation_id, started_at in stored
+            ])
+        )
+        execution_ids = [execution_id for execution_id, _, _ in stored]
+        await db.commit()
+        lease_keeper.track(execution_ids)
+        self.started += len(execution_ids)
+        return execution_ids
+
+    async def _execute(self, execution_id: int):
+        try:
+            async with AsyncSessionLocal() as db:
+                execution = await db.get(SagaExecution, execution_id)
+                saga_config = await db.get(SagaConfiguration, self.config_id)
+                await SagaExecutor(db).run_execution(saga_config, execution)
+        except Exception:
+            logger.exception("Triggered execution %s failed", execution_id)
+        finally:
+            self._running.pop(execution_id, None)
+
+    async def _drain(self):
+        if not self._running:
+            return
+        tasks = list(self._running.values())
+        _, pending = await asyncio.wait(tasks, timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+        # Cancelled executions keep their lease until it expires and they are recovered
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "saga": self.name,
+            "topic": self.topic,
+            "group": self.group,
+            "in_flight": len(self._running),
+            "max_in_flight": self.max_in_flight,
+            "started": self.started,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "pauses": self.pauses,
+        }
+
+
+async def load_triggers(
+    db: AsyncSession,
+    config_ids: Optional[List[int]] = None
+) -> List[Tuple[SagaConfiguration, TriggerPlan]]:
+    """Active saga configurations declaring a Kafka trigger"""
+    query = select(SagaConfiguration).where(
+        SagaConfiguration.status == SagaConfigurationStatus.ACTIVE
+    )
+    if config_ids:
+        query = query.where(SagaConfiguration.id.in_(config_ids))
+    result = await db.execute(query.order_by(SagaConfiguration.id))
+
+    triggers = []
+    for saga_config in result.scalars().all():
+        try:
+            plan = plan_cache.get_plan(saga_config)
+        except SagaPlanError as e:
+            logger.warning("Skipping saga '%s': %s", saga_config.name, str(e))
+            continue
+        if plan.trigger is not None and plan.trigger.type == "kafka":
+            triggers.append((saga_config, plan.trigger))
+    return triggers
+
+
+class SagaConsumer:
+    """Consumer process running one TriggerConsumer per Kafka-triggered saga
+
+    Like the worker, it also runs the recovery sweeper, so executions orphaned by
+    a dead consumer are resumed by the surviving processes.
+    """
+
+    def __init__(
+        self,
+        config_ids: Optional[List[int]] = None,
+        max_in_flight: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.config_ids = config_ids
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.consumers: List[TriggerConsumer] = []
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        """Stop consuming; running executions are given WORKER_SHUTDOWN_TIMEOUT to finish"""
+        self._stopping.set()
+
+    async def _consume(self, consumer: TriggerConsumer):
+        try:
+            await consumer.run(self._stopping)
+        except Exception:
+            # A broken consumer stops the whole process rather than silently lagging
+            logger.exception("Trigger consumer for saga '%s' failed", consumer.name)
+            self._stopping.set()
+
+    async def run(self):
+        """Consume the trigger topics until stopped"""
+        async with AsyncSessionLocal() as db:
+            triggers = await load_triggers(db, self.config_ids)
+        if not triggers:
+            logger.warning("No active saga configuration declares a Kafka trigger")
+            return
+
+        self.consumers = [
+            TriggerConsumer(saga_config, trigger, self.max_in_flight, self.batch_size)
+            for saga_config, trigger in triggers
+        ]
+        await http_client.start()
+        await lease_keeper.start()
+        # Progress is only published from here; API processes deliver it to clients
+        await event_bus.start(listen=False)
+        if settings.RECOVERY_ENABLED:
+            await recovery_sweeper.start()
+        try:
+            await asyncio.gather(*(self._consume(consumer) for consumer in self.consumers))
+        finally:
+            await recovery_sweeper.stop()
+            await lease_keeper.stop()
+            await event_bus.stop()
+            await http_client.close()
+            await kafka_producer.close()
+            await kafka_replies.close()
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import SagaExecution
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLostError(RuntimeError):
+    """Raised when another process took over an execution running here"""
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaseKeeper:
+    """Holds and renews the leases of every execution running in this process
+
+    A lease (lease_owner / lease_expires_at, database clock) tells other processes
+    that an execution is alive. Leases are renewed every third of their duration;
+    an execution whose lease expired belongs to a dead process and is picked up by
+    the recovery sweeper. When a renewal finds a lease taken over, the task running
+    that execution here is cancelled, so that it stops calling downstreams.
+    """
+
+    def __init__(self, owner: Optional[str] = None, duration: Optional[float] = None):
+        self.owner = owner or default_owner()
+        self.duration = duration or settings.WORKER_LEASE_DURATION
+        self._held: Set[int] = set()
+        # Tasks running leased executions, cancelled when their lease is lost
+        self._watched: Dict[int, asyncio.Task] = {}
+        self._lost: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def expiry(self):
+        """SQL expression for the end of a lease taken now"""
+        return func.now() + timedelta(seconds=self.duration)
+
+    async def start(self):
+        """Start renewing held leases (called on application or worker startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._heartbeat(), name="lease-heartbeat")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def track(self, execution_ids: Iterable[int]):
+        self._held.update(execution_ids)
+
+    def untrack(self, execution_id: int):
+        self._held.discard(execution_id)
+        self._watched.pop(execution_id, None)
+        self._lost.discard(execution_id)
+
+    def holds(self, execution_id: int) -> bool:
+        return execution_id in self._held
+
+    def watch(self, execution_id: int):
+        """Cancel the current task if the lease of this execution is lost"""
+        if execution_id in self._held:
+            self._watched[execution_id] = asyncio.current_task()
+
+    def lost(self, execution_id: int) -> bool:
+        """Whether a watched execution was cancelled because its lease was taken over"""
+        return execution_id in self._lost
+
+    async def acquire(self, db: AsyncSession, execution: SagaExecution):
+        """Lease an execution about to run here; committed with the caller's transaction"""
+        await db.execute(
+            update(SagaExecution)
+            .where(SagaExecution.id == execution.id)
+            .values(lease_owner=self.owner, lease_expires_at=self.expiry())
+            .execution_options(synchronize_session=False)
+        )
+        self.track([execution.id])
+
+    async def release(self, db: AsyncSession, execution_id: int):
+        """Drop the lease of a finished execution; committed with the caller's transaction"""
+        if execution_id not in self._held:
+            # Never leased here, or already taken over by another process
+            return
+        self.untrack(execution_id)
+        await db.execute(
+            update(SagaExecution)
+            .where(
+                SagaExecution.id == execution_id,
+                SagaExecution.lease_owner == self.owner
+            )
+            .values(lease_owner=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def renew(self, db: AsyncSession, execution_ids: List[int]) -> Set[int]:
+        """Extend the leases still owned by this process and return their ids"""
+        result = await db.execute(
+            update(SagaExecution)
+            .where(
+                SagaExecution.id.in_(execution_ids),
+                SagaExecution.lease_owner == self.owner
+            )
+            .values(lease_expires_at=self.expiry())
+            .returning(SagaExecution.id)
+            .execution_options(synchronize_session=False)
+        )
+        renewed = set(result.scalars().all())
+        await db.commit()
+        return renewed
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.duration / 3)
+            held = list(self._held)
+            if not held:
+                continue
+            try:
+                async with AsyncSessionLocal() as db:
+                    renewed = await self.renew(db, held)
+            except Exception:
+                logger.exception("Lease owner %s could not renew its leases", self.owner)
+                continue
+            lost = set(held) - renewed
+            if lost:
+                # Another process considered these executions dead and took them over
+                logger.warning("Lease owner %s lost executions %s", self.owner, sorted(lost))
+                self._held.difference_update(lost)
+                for execution_id in lost:
+                    task = self._watched.pop(execution_id, None)
+                    if task is not None:
+                        self._lost.add(execution_id)
+                        task.cancel()
+
+
+lease_keeper = LeaseKeeper()
@@ -0,0 +1,217 @@
+import gzip
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Partitioned parents, children first: they are purged before their executions
+PARTITIONED_TABLES = ("saga_step_payloads", "saga_execution_steps", "saga_executions")
+PARTITION_KEYS = {
+    "saga_step_payloads": "execution_started_at",
+    "saga_execution_steps": "execution_started_at",
+    "saga_executions": "started_at",
+}
+RETENTION_ACTIONS = ("drop", "detach")
+
+COLUMNS_QUERY = text("""
+    SELECT attname FROM pg_attribute
+    WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped
+    ORDER BY attnum
+""")
+
+PARTITIONS_QUERY = text(r"""
+    SELECT child.relname,
+           (regexp_match(pg_get_expr(child.relpartbound, child.oid), 'TO \(''([^'']+)''\)'))[1]::timestamptz
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = to_regclass(:table)
+""")
+
+
+@dataclass(frozen=True)
+class Partition:
+    """Monthly (or legacy) partition of a table; the default partition has no upper bound"""
+    table: str
+    name: str
+    upper_bound: Optional[datetime]
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """First instant (UTC) of the month `months` after the month of `value`"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def list_partitions(connection: Connection, table: str) -> List[Partition]:
+    rows = connection.execute(PARTITIONS_QUERY, {"table": table}).all()
+    partitions = [Partition(table, name, upper_bound) for name, upper_bound in rows]
+    return sorted(partitions, key=lambda p: (p.upper_bound is None, p.upper_bound))
+
+
+def create_partition(connection: Connection, table: str, start: datetime, end: datetime) -> str:
+    """Create the partition of [start, end), moving its rows out of the default partition
+
+    Postgres refuses to create a partition while the default one holds rows of its
+    range (when the retention job did not run in time), so the default partition is
+    detached meanwhile and attached again once those rows moved.
+    """
+    name = f"{table}_p{start:%Y_%m}"
+    default = f"{table}_default"
+    key = PARTITION_KEYS[table]
+    bounds = {"start": start, "end": end}
+    bound_sql = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+
+    stray = connection.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {key} >= :start AND {key} < :end)"),
+        bounds
+    ).scalar()
+    if not stray:
+        connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bound_sql}"))
+        return name
+
+    columns = ", ".join(connection.execute(COLUMNS_QUERY, {"table": table}).scalars())
+    connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    connection.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bound_sql}"))
+    moved = connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {key} >= :start AND {key} < :end "
+            f"RETURNING {columns}) INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+        ),
+        bounds
+    ).rowcount
+    connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+    logger.warning("Moved %d rows of %s from %s into %s", moved, table, default, name)
+    return name
+
+
+def ensure_partitions(connection: Connection, table: str, months_ahead: int) -> List[str]:
+    """Create the monthly partitions following the last one, up to `months_ahead` months from now"""
+    bounds = [p.upper_bound for p in list_partitions(connection, table) if p.upper_bound is not None]
+    start = max(bounds) if bounds else month_start(datetime.now(timezone.utc))
+    until = month_start(datetime.now(timezone.utc), months_ahead + 1)
+    created = []
+    while start < until:
+        end = month_start(start, 1)
+        created.append(create_partition(connection, table, start, end))
+        start = end
+    return created
+
+
+def export_partition(connection: Connection, partition: Partition, directory: str) -> Dict[str, Any]:
+    """Write every row of a partition as gzip-compressed NDJSON, durably, before it is purged
+
+    Rows are streamed from a server-side cursor; the file only gets its final name
+    once it is complete and synced to disk.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{partition.name}.ndjson.gz")
+    partial = path + ".partial"
+    result = connection.execute(
+        text(f"SELECT to_jsonb(row)::text FROM {partition.name} AS row"),
+        execution_options={
+            "stream_results": True,
+            "yield_per": settings.RETENTION_EXPORT_BATCH_SIZE,
+        }
+    )
+    rows = 0
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            for (line,) in result:
+                archive.write(line.encode("utf-8") + b"\n")
+                rows += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return {"path": path, "rows": rows}
+
+
+def purge_partition(connection: Connection, partition: Partition, action: str):
+    """Drop a partition, or detach it into a standalone table left for the operator"""
+    if action == "detach":
+        connection.execute(text(f"ALTER TABLE {partition.table} DETACH PARTITION {partition.name}"))
+    else:
+        connection.execute(text(f"DROP TABLE {partition.name}"))
+
+
+# Non-partitioned tables pointing to executions, purged with the executions' partitions
+EXECUTION_KEY_TABLES = {
+    "idempotency_keys": "saga_idempotency_keys",
+    "correlation_ids": "saga_correlation_ids",
+}
+
+
+def purge_execution_keys(connection: Connection, table: str, upper_bound: datetime) -> int:
+    """Delete the keys of executions started before a purged partition's bound"""
+    result = connection.execute(
+        text(f"DELETE FROM {table} WHERE execution_started_at < :bound"),
+        {"bound": upper_bound}
+    )
+    return result.rowcount
+
+
+def run_retention(
+    retention_days: Optional[int] = None,
+    action: Optional[str] = None,
+    archive_dir: Optional[str] = None,
+    months_ahead: Optional[int] = None,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """Create upcoming partitions and purge the ones entirely older than the retention period
+
+    Each partition is exported (when an archive directory is given) and purged in
+    its own transaction, so an interrupted run only leaves the remaining ones for
+    the next run. A table whose partitions cannot be created is reported under
+    "errors" and does not stop the purge.
+    """
+    retention_days = retention_days if retention_days is not None else settings.RETENTION_DAYS
+    action = action or settings.RETENTION_ACTION
+    archive_dir = archive_dir or settings.RETENTION_ARCHIVE_DIR
+    months_ahead = months_ahead if months_ahead is not None else settings.PARTITION_MONTHS_AHEAD
+    if action not in RETENTION_ACTIONS:
+        raise ValueError(f"Unknown retention action: {action}")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    report: Dict[str, Any] = {
+        "cutoff": cutoff.isoformat(), "created": [], "purged": [], "errors": []
+    }
+
+    if not dry_run:
+        for table in PARTITIONED_TABLES:
+            try:
+                with engine.begin() as connection:
+                    report["created"] += ensure_partitions(connection, table, months_ahead)
+            except SQLAlchemyError as e:
+                # Purging must not depend on it: the next run creates the partitions again
+                logger.exception("Could not create the partitions of %s", table)
+                report["errors"].append({"table": table, "error": str(getattr(e, "orig", None) or e)})
+
+    for table in PARTITIONED_TABLES:
+        with engine.connect() as connection:
+            expired = [
+                partition for partition in list_partitions(connection, table)
+                if partition.upper_bound is not None and partition.upper_bound <= cutoff
+            ]
+        for partition in expired:
+            entry: Dict[str, Any] = {"partition": partition.name, "action": action}
+            if not dry_run:
+                with engine.begin() as connection:
+                    if archive_dir:
+                        entry.update(export_partition(connection, partition, archive_dir))
+                    purge_partition(connection, partition, action)
+                    if table == "saga_executions":
+                        for kind, key_table in EXECUTION_KEY_TABLES.items():
+                            entry[kind] = purge_execution_keys(
+                                connection, key_table, partition.upper_bound
+                            )
+                logger.info("Retention %s partition %s", action, partition.name)
+            report["purged"].append(entry)
+    return report
@@ -0,0 +1,112 @@
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional extra: pip install saga-express[zstd]
+    zstandard = None
+
+PAYLOAD_MODES = ("full", "truncate", "allowlist")
+PAYLOAD_ENCODINGS = ("zstd", "gzip")
+# Step payload kinds and the step columns they are stored in when kept inline
+PAYLOAD_COLUMNS = {"request": "request_data", "response": "response_data"}
+
+
+class PayloadEncodingError(RuntimeError):
+    """Raised when a stored payload uses an encoding that is not available here"""
+
+
+@dataclass(frozen=True)
+class PayloadPolicy:
+    """How much of a step's request and response payloads is stored
+
+    `full` keeps the payload, `truncate` replaces one larger than `max_bytes` (as
+    compact JSON) by a preview, and `allowlist` keeps only the dotted `fields`.
+    Whatever is kept is compressed into saga_step_payloads above `compress_above`.
+    """
+    mode: str = "full"
+    max_bytes: Optional[int] = None
+    fields: Tuple[str, ...] = ()
+    compress_above: Optional[int] = None
+
+    def apply(self, payload: Any) -> Any:
+        if payload is None or self.mode == "full":
+            return payload
+        if self.mode == "allowlist":
+            return _allowlisted(payload, self.fields)
+        raw = dumps(payload)
+        if len(raw) <= self.max_bytes:
+            return payload
+        return {
+            "truncated": True,
+            "size": len(raw),
+            "preview": raw[:self.max_bytes].decode("utf-8", errors="ignore"),
+        }
+
+
+FULL_PAYLOADS = PayloadPolicy()
+
+
+def _allowlisted(payload: Any, fields: Tuple[str, ...]) -> Any:
+    """Copy of a payload with only the given dotted paths (missing paths are skipped)"""
+    kept: Dict[str, Any] = {}
+    for path in fields:
+        keys = path.split(".")
+        value = payload
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                break
+            value = value[key]
+        else:
+            target = kept
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = value
+    return kept
+
+
+def dumps(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def compress(raw: bytes) -> Tuple[str, bytes]:
+    """Compress with PAYLOAD_COMPRESSION, falling back to gzip when zstandard is missing"""
+    encoding = settings.PAYLOAD_COMPRESSION
+    if encoding == "zstd" and zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=settings.PAYLOAD_COMPRESSION_LEVEL).compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=min(settings.PAYLOAD_COMPRESSION_LEVEL, 9))
+
+
+def decompress(encoding: str, data: bytes) -> Any:
+    if encoding == "zstd":
+        if zstandard is None:
+            raise PayloadEncodingError("Payload is zstd-compressed but zstandard is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif encoding == "gzip":
+        raw = gzip.decompress(data)
+    else:
+        raise PayloadEncodingError(f"Unknown payload encoding: {encoding}")
+    return json.loads(raw)
+
+
+def store(policy: PayloadPolicy, payload: Any) -> Tuple[Any, Optional[Tuple[str, int, bytes]]]:
+    """Apply a policy to a payload and split it into its inline value and compressed form
+
+    Returns `(inline, None)` for payloads kept in the step row, or
+    `(None, (encoding, size, data))` for payloads moved to saga_step_payloads.
+    """
+    kept = policy.apply(payload)
+    if kept is None:
+        return None, None
+    raw = dumps(kept)
+    threshold = policy.compress_above
+    if threshold is None:
+        threshold = settings.PAYLOAD_COMPRESS_ABOVE
+    if len(raw) <= threshold:
+        return kept, None
+    encoding, data = compress(raw)
+    return None, (encoding, len(raw), data)
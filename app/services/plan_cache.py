@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.models import SagaConfiguration
+from app.services.saga_plan import SagaPlan, compile_plan
+
+
+PlanKey = Tuple[int, Optional[datetime]]
+
+
+class PlanCache:
+    """LRU cache of compiled saga plans keyed by (configuration id, updated_at)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._plans: "OrderedDict[PlanKey, SagaPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_plan(self, saga_config: SagaConfiguration) -> SagaPlan:
+        """Return the compiled plan for a configuration, compiling it on a miss"""
+        key = (saga_config.id, saga_config.updated_at)
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        # Compile outside the lock; a concurrent miss on the same key is harmless
+        plan = compile_plan(saga_config.yaml_content)
+
+        with self._lock:
+            # A newer revision supersedes every older plan of the same configuration
+            for stale in [k for k in self._plans if k[0] == key[0] and k != key]:
+                del self._plans[stale]
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+                self.evictions += 1
+
+        return plan
+
+    def invalidate(self, saga_config_id: int):
+        """Drop every cached plan of a configuration"""
+        with self._lock:
+            for key in [k for k in self._plans if k[0] == saga_config_id]:
+                del self._plans[key]
+
+    def clear(self):
+        """Drop every cached plan"""
+        with self._lock:
+            self._plans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._plans),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+plan_cache = PlanCache(maxsize=settings.PLAN_CACHE_SIZE)
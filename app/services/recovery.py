@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import SagaConfiguration, SagaExecution, SagaExecutionStatus
+from app.services.events import event_bus, execution_event
+from app.services.leases import lease_keeper
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import SagaPlanError
+
+logger = logging.getLogger(__name__)
+
+# Unfinished executions that had started: running steps or compensating
+ORPHAN_STATUSES = (SagaExecutionStatus.RUNNING, SagaExecutionStatus.FAILED)
+
+
+async def claim_orphans(db: AsyncSession, limit: int) -> List[int]:
+    """Take over unfinished executions whose lease expired, oldest lease first
+
+    Executions that never had a lease (started by a process without a lease keeper,
+    or before leases existed) are orphans once RECOVERY_UNLEASED_GRACE elapsed.
+    """
+    unleased_before = func.now() - timedelta(seconds=settings.RECOVERY_UNLEASED_GRACE)
+    candidates = (
+        select(SagaExecution.id)
+        .where(
+            SagaExecution.status.in_(ORPHAN_STATUSES),
+            SagaExecution.completed_at.is_(None),
+            or_(
+                SagaExecution.lease_expires_at < func.now(),
+                and_(
+                    SagaExecution.lease_expires_at.is_(None),
+                    SagaExecution.started_at < unleased_before
+                )
+            )
+        )
+        .order_by(func.coalesce(SagaExecution.lease_expires_at, SagaExecution.started_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(SagaExecution)
+        .where(SagaExecution.id.in_(candidates.scalar_subquery()))
+        .values(lease_owner=lease_keeper.owner, lease_expires_at=lease_keeper.expiry())
+        .returning(SagaExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = sorted(result.scalars().all())
+    await db.commit()
+    lease_keeper.track(claimed)
+    return claimed
+
+
+async def recover_execution(execution_id: int):
+    """Resume or compensate an orphaned execution leased to this process"""
+    async with AsyncSessionLocal() as db:
+        execution = await db.get(SagaExecution, execution_id)
+        saga_config = await db.get(SagaConfiguration, execution.saga_configuration_id)
+        try:
+            await SagaExecutor(db).resume_execution(saga_config, execution)
+        except SagaPlanError as e:
+            # The configuration no longer compiles; nothing can be resumed or compensated
+            execution.status = SagaExecutionStatus.FAILED
+            execution.error_message = f"Recovery failed: {str(e)}"
+            execution.completed_at = datetime.utcnow()
+            await lease_keeper.release(db, execution.id)
+            await db.commit()
+            event_bus.publish(execution_event(execution))
+
+
+class RecoverySweeper:
+    """Periodically takes over executions orphaned by a dead process and finishes them"""
+
+    def __init__(self, interval: Optional[float] = None, batch_size: Optional[int] = None):
+        self.interval = interval or settings.RECOVERY_INTERVAL
+        self.batch_size = batch_size or settings.RECOVERY_BATCH_SIZE
+        self._task: Optional[asyncio.Task] = None
+        self._recovering: Dict[int, asyncio.Task] = {}
+        self.recovered = 0
+
+    async def start(self):
+        """Start sweeping (requires the lease keeper to be running)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_forever(), name="recovery-sweeper")
+
+    async def stop(self):
+        """Stop sweeping; interrupted recoveries are picked up again once their lease expires"""
+        tasks = list(self._recovering.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def sweep_once(self) -> List[int]:
+        """Claim and start recovering up to the free recovery slots"""
+        free = self.batch_size - len(self._recovering)
+        if free <= 0:
+            return []
+        async with AsyncSessionLocal() as db:
+            claimed = await claim_orphans(db, free)
+        for execution_id in claimed:
+            logger.warning("Recovering orphaned execution %s", execution_id)
+            self._recovering[execution_id] = asyncio.create_task(self._recover(execution_id))
+        return claimed
+
+    async def _recover(self, execution_id: int):
+        try:
+            await recover_execution(execution_id)
+            self.recovered += 1
+        except Exception:
+            logger.exception("Recovery of execution %s failed", execution_id)
+        finally:
+            self._recovering.pop(execution_id, None)
+
+    async def _sweep_forever(self):
+        while True:
+            try:
+                await self.sweep_once()
+            except Exception:
+                logger.exception("Recovery sweep failed")
+            await asyncio.sleep(self.interval)
+
+
+recovery_sweeper = RecoverySweeper()
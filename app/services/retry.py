@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, Any, FrozenSet, Optional
+
+from app.core.config import settings
+
+
+DEFAULT_RETRY_STATUSES = frozenset({502, 503, 504})
+# Matched against the names of the exception class and its bases
+DEFAULT_RETRY_EXCEPTIONS = frozenset({"TransportError", "TimeoutError", "KafkaTimeoutError"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Retry settings of a step or rollback; one attempt means no retries"""
+    max_attempts: int = 1
+    backoff_base: float = 0.1
+    backoff_cap: float = 5.0
+    jitter: bool = True
+    retry_on_status: FrozenSet[int] = DEFAULT_RETRY_STATUSES
+    retry_on: FrozenSet[str] = DEFAULT_RETRY_EXCEPTIONS
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the attempt following `attempt` (exponential, capped, full jitter)"""
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def retries_status(self, status_code: int) -> bool:
+        return status_code in self.retry_on_status
+
+    def retries_exception(self, error: BaseException) -> bool:
+        return any(cls.__name__ in self.retry_on for cls in type(error).__mro__)
+
+
+NO_RETRY = RetryPolicy()
+
+
+class RetryBudget:
+    """Caps retries to a fraction of the requests sent to one downstream
+
+    Within the sliding window, retries are allowed while they stay below
+    `ratio` times the first attempts plus a floor of `min_per_second`, so a
+    failing downstream sees at most (1 + ratio) times its normal load.
+    """
+
+    def __init__(self, ratio: float, min_per_second: float, window: float):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def deposit(self):
+        """Count a first attempt towards the budget"""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_withdraw(self) -> bool:
+        """Take one retry from the budget, or return False if it is exhausted"""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            allowed = self.ratio * len(self._requests) + self.min_per_second * self.window
+            if len(self._retries) >= allowed:
+                self.rejected += 1
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "requests": len(self._requests),
+                "retries": len(self._retries),
+                "rejected": self.rejected,
+            }
+
+
+class RetryBudgets:
+    """Process-wide retry budgets, one per downstream host"""
+
+    def __init__(
+        self,
+        ratio: Optional[float] = None,
+        min_per_second: Optional[float] = None,
+        window: Optional[float] = None
+    ):
+        self.ratio = ratio if ratio is not None else settings.RETRY_BUDGET_RATIO
+        self.min_per_second = (
+            min_per_second if min_per_second is not None else settings.RETRY_BUDGET_MIN_PER_SECOND
+        )
+        self.window = window if window is not None else settings.RETRY_BUDGET_WINDOW
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> RetryBudget:
+        with self._lock:
+            budget = self._budgets.get(host)
+            if budget is None:
+                budget = RetryBudget(self.ratio, self.min_per_second, self.window)
+                self._budgets[host] = budget
+            return budget
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            budgets = dict(self._budgets)
+        return {
+            "ratio": self.ratio,
+            "min_per_second": self.min_per_second,
+            "window": self.window,
+            "hosts": {host: budget.stats() for host, budget in budgets.items()},
+        }
+
+
+retry_budgets = RetryBudgets()
@@ -1,13 +1,14 @@
-import yaml
-import httpx
+import asyncio
+import logging
+import time
 import uuid
-import re
-from typing import Dict, Any, Optional, List
+from collections import ChainMap
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from kafka import KafkaProducer
-import json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models import (
     SagaConfiguration,
     SagaExecution,
@@ -15,177 +16,134 @@ from app.models import (
     SagaExecutionStep,
     SagaExecutionStepStatus
 )
-from app.core.config import settings
+from app.services.circuit_breaker import BreakerPolicy, CircuitOpenError, circuit_breakers
+from app.services.events import event_bus, execution_event
+from app.services.http_client import http_client
+from app.services.idempotency import IdempotencyKeyTaken, claim_key
+from app.services.kafka_producer import kafka_producer
+from app.services.kafka_replies import kafka_replies
+from app.services.leases import LeaseLostError, lease_keeper
+from app.services.plan_cache import plan_cache
+from app.services.retry import RetryPolicy, retry_budgets
+from app.services.saga_plan import SagaPlan, SagaPlanError, StepPlan, RollbackPlan
+from app.services.step_journal import StepJournal
+
+logger = logging.getLogger(__name__)
+
+# Kafka actions share one retry budget and circuit breaker for the cluster
+KAFKA_DOWNSTREAM = "kafka"
 
 
 class SagaExecutor:
     """Executes SAGA workflows based on YAML configuration"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.context: Dict[str, Any] = {}
-        self.kafka_producer: Optional[KafkaProducer] = None
+        self.journal: Optional[StepJournal] = None
     
-    def _get_kafka_producer(self) -> KafkaProducer:
-        """Get or create Kafka producer"""
-        if self.kafka_producer is None:
-            self.kafka_producer = KafkaProducer(
-                bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS.split(","),
-                value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-                key_serializer=lambda k: k.encode('utf-8') if k else None
-            )
-        return self.kafka_producer
+    def _failure_message(self, error: Exception, timeout: Optional[float]) -> str:
+        """Readable error message for a failed step or compensation"""
+        if isinstance(error, TimeoutError):
+            return f"Timed out after {timeout}s"
+        return str(error)
     
-    def _interpolate_value(self, value: Any, context: Dict[str, Any]) -> Any:
-        """Interpolate variables in value using context"""
-        if not isinstance(value, str):
-            return value
+    async def _with_retries(
+        self,
+        policy: RetryPolicy,
+        breaker_policy: Optional[BreakerPolicy],
+        downstream: str,
+        attempt: Callable[[], Awaitable[Any]],
+        timeout: Optional[float],
+        step: SagaExecutionStep,
+        phase: str
+    ) -> Any:
+        """Run an action under its retry policy, recording every attempt on the step
         
-        # Check if the entire value is a single variable reference
-        single_var_pattern = r'^\$\{([^}]+)\}$'
-        single_match = re.match(single_var_pattern, value)
+        The timeout bounds each attempt. Retries are drawn from the downstream's retry
+        budget; once it is exhausted the last outcome is returned or raised as-is. Each
+        attempt goes through the downstream's circuit breaker, and an open breaker
+        fails the action immediately without further retries.
+        """
+        budget = retry_budgets.get(downstream)
+        budget.deposit()
+        breaker = None
+        if breaker_policy is not None:
+            breaker = circuit_breakers.get(breaker_policy.name or downstream, breaker_policy)
+        number = 0
         
-        if single_match:
-            var_path = single_match.group(1)
-            
-            # Handle special variables
-            if var_path == "current_timestamp":
-                return datetime.utcnow().isoformat()
-            
-            # Navigate through context using dot notation
-            parts = var_path.split('.')
-            current = context
+        while True:
+            number += 1
+            entry: Dict[str, Any] = {
+                "phase": phase,
+                "attempt": number,
+                "started_at": datetime.utcnow().isoformat()
+            }
             
-            for part in parts:
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
-                else:
-                    return value  # Return original if not found
+            if breaker is not None:
+                try:
+                    breaker.acquire()
+                except CircuitOpenError as e:
+                    entry["error"] = str(e)
+                    entry["duration_ms"] = 0.0
+                    step.attempts = (step.attempts or []) + [entry]
+                    raise
             
-            # Return the actual value (could be dict, list, etc.)
-            return current
-        
-        # Pattern to match ${variable.path} for string interpolation
-        pattern = r'\$\{([^}]+)\}'
-        
-        def replace_var(match):
-            var_path = match.group(1)
+            started = time.monotonic()
+            result = error = None
+            healthy = None
+            try:
+                async with asyncio.timeout(timeout):
+                    result = await attempt()
+            except Exception as e:
+                error = e
+                healthy = False
+                entry["error"] = self._failure_message(e, timeout)
+                retryable = policy.retries_exception(e)
+            else:
+                status_code = getattr(result, "status_code", None)
+                entry["status"] = status_code
+                # Client errors are the caller's problem, not a sign of a sick downstream
+                healthy = status_code is None or status_code < 500
+                retryable = status_code is not None and policy.retries_status(status_code)
+            finally:
+                if breaker is not None:
+                    breaker.release(healthy)
+            entry["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
             
-            # Handle special variables
-            if var_path == "current_timestamp":
-                return datetime.utcnow().isoformat()
+            retrying = retryable and number < policy.max_attempts
+            if retrying and not budget.try_withdraw():
+                entry["retry_budget_exhausted"] = True
+                retrying = False
             
-            # Navigate through context using dot notation
-            parts = var_path.split('.')
-            current = context
+            # Reassigned rather than appended so journal snapshots never change under it
+            step.attempts = (step.attempts or []) + [entry]
+            if not retrying:
+                if error is not None:
+                    raise error
+                return result
             
-            for part in parts:
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
-                else:
-                    return match.group(0)  # Return original if not found
-            
-            return str(current)
-        
-        result = re.sub(pattern, replace_var, value)
-        return result
-    
-    def _interpolate_dict(self, data: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
-        """Recursively interpolate all values in a dictionary"""
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, dict):
-                result[key] = self._interpolate_dict(value, context)
-            elif isinstance(value, list):
-                result[key] = [
-                    self._interpolate_dict(item, context) if isinstance(item, dict)
-                    else self._interpolate_value(item, context)
-                    for item in value
-                ]
-            else:
-                result[key] = self._interpolate_value(value, context)
-        return result
-    
-    def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> bool:
-        """Evaluate a condition string"""
-        # Handle compound conditions first
-        if "&&" in condition:
-            conditions = condition.split("&&")
-            return all(self._evaluate_condition(c.strip(), context) for c in conditions)
-        elif "||" in condition:
-            conditions = condition.split("||")
-            return any(self._evaluate_condition(c.strip(), context) for c in conditions)
-        
-        # Simple condition evaluation
-        # Replace variables in condition
-        interpolated = self._interpolate_value(condition, context)
-        
-        # Handle simple comparisons
-        if "==" in interpolated:
-            left, right = interpolated.split("==", 1)
-            left = left.strip()
-            right = right.strip()
-            
-            # Try to convert to numbers if possible
-            try:
-                left_num = float(left.strip('"').strip("'"))
-                right_num = float(right.strip('"').strip("'"))
-                return left_num == right_num
-            except ValueError:
-                # String comparison
-                left = left.strip('"').strip("'")
-                right = right.strip('"').strip("'")
-                return left == right
-        elif "!=" in interpolated:
-            left, right = interpolated.split("!=", 1)
-            left = left.strip()
-            right = right.strip()
-            
-            # Try to convert to numbers if possible
-            try:
-                left_num = float(left.strip('"').strip("'"))
-                right_num = float(right.strip('"').strip("'"))
-                return left_num != right_num
-            except ValueError:
-                # String comparison
-                left = left.strip('"').strip("'")
-                right = right.strip('"').strip("'")
-                return left != right
-        
-        # Default: try to evaluate as boolean
-        return bool(interpolated)
+            self.journal.record(step)
+            await asyncio.sleep(policy.backoff(number))
     
     async def _execute_api_step(
         self,
-        step_config: Dict[str, Any],
-        context: Dict[str, Any],
-        execution: SagaExecution,
-        step_name: str
+        step_plan: StepPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
     ) -> SagaExecutionStep:
         """Execute an API step"""
-        step = SagaExecutionStep(
-            saga_execution_id=execution.id,
-            step_name=step_name,
-            step_type="api",
-            status=SagaExecutionStepStatus.RUNNING
-        )
-        self.db.add(step)
-        self.db.commit()
+        step_name = step_plan.name
         
         try:
-            endpoint = step_config["endpoint"]
-            url = self._interpolate_value(endpoint["url"], context)
-            method = endpoint.get("method", "POST").upper()
-            
-            # Prepare headers
-            headers = {}
-            if "headers" in endpoint:
-                headers = self._interpolate_dict(endpoint["headers"], context)
+            url = step_plan.url.render(context)
+            method = step_plan.method
+            headers = step_plan.headers.render(context)
             
             # Prepare body
             body = None
-            if "body" in step_config:
-                body = self._interpolate_dict(step_config["body"], context)
+            if step_plan.body is not None:
+                body = step_plan.body.render(context)
             
             step.request_data = {
                 "url": url,
@@ -193,100 +151,80 @@ class SagaExecutor:
                 "headers": headers,
                 "body": body
             }
-            self.db.commit()
+            self.journal.record(step)
             
-            # Execute HTTP request
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
+            # Execute HTTP request over the shared connection pool, retried per the step policy
+            response = await self._with_retries(
+                step_plan.retry,
+                step_plan.breaker,
+                http_client.host_key(url),
+                lambda: http_client.request(
                     method=method,
                     url=url,
                     headers=headers,
-                    json=body
-                )
-                
-                response_data = {
-                    "status": response.status_code,
-                    "body": response.json() if response.content else {}
-                }
-                
-                step.response_data = response_data
-                
-                # Update context with response
-                context[step_name] = {
-                    "response": response_data
-                }
-                
-                # Check success condition
-                success_config = step_config.get("success", {})
-                condition = success_config.get("condition", "response.status == 200")
-                
-                # Wrap condition variables in ${} for interpolation
-                condition_for_eval = condition
-                if "response." in condition and "${" not in condition:
-                    # Replace response.xxx with ${response.xxx}
-                    import re as re_module
-                    condition_for_eval = re_module.sub(r'(response\.[a-zA-Z0-9_.]+)', r'${\1}', condition)
-                
-                interpolated_condition = self._interpolate_value(condition_for_eval, context[step_name])
-                
-                if self._evaluate_condition(condition_for_eval, context[step_name]):
-                    # Extract values
-                    if "extract" in success_config:
-                        for key, path in success_config["extract"].items():
-                            # Wrap path in ${} if needed
-                            if not path.startswith("${"):
-                                path_for_interp = "${" + path + "}"
-                            else:
-                                path_for_interp = path
-                            value = self._interpolate_value(path_for_interp, context[step_name])
-                            context[step_name][key] = value
-                    
-                    step.status = SagaExecutionStepStatus.COMPLETED
-                else:
-                    step.status = SagaExecutionStepStatus.FAILED
-                    step.error_message = f"Condition not met: {condition} (interpolated: {interpolated_condition})"
-                
-                step.completed_at = datetime.utcnow()
-                self.db.commit()
-                
-                return step
+                    json=body,
+                    timeout=step_plan.timeout or settings.HTTP_TIMEOUT
+                ),
+                step_plan.timeout,
+                step,
+                "forward"
+            )
+            
+            response_data = {
+                "status": response.status_code,
+                "body": response.json() if response.content else {}
+            }
+            
+            step.response_data = response_data
+            
+            # Update context with response
+            context[step_name] = {
+                "response": response_data
+            }
+            
+            # Check success condition; step-local names shadow the saga context
+            condition = step_plan.success_condition
+            if condition.evaluate(ChainMap(context[step_name], context)):
+                # Extract values
+                for key, path in step_plan.extract.items():
+                    context[step_name][key] = path.render(context[step_name])
                 
+                step.status = SagaExecutionStepStatus.COMPLETED
+            else:
+                step.status = SagaExecutionStepStatus.FAILED
+                step.error_message = (
+                    f"Condition not met: {condition.source} "
+                    f"(response status: {response.status_code})"
+                )
+            
+            step.completed_at = datetime.utcnow()
+            self.journal.record(step)
+            await self.journal.checkpoint()
+            
+            return step
+            
         except Exception as e:
             step.status = SagaExecutionStepStatus.FAILED
-            step.error_message = str(e)
+            step.error_message = self._failure_message(e, step_plan.timeout)
             step.completed_at = datetime.utcnow()
-            self.db.commit()
+            self.journal.record(step)
+            await self.journal.checkpoint()
             return step
     
     async def _execute_kafka_step(
         self,
-        step_config: Dict[str, Any],
-        context: Dict[str, Any],
-        execution: SagaExecution,
-        step_name: str
+        step_plan: StepPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
     ) -> SagaExecutionStep:
         """Execute a Kafka step"""
-        step = SagaExecutionStep(
-            saga_execution_id=execution.id,
-            step_name=step_name,
-            step_type="kafka",
-            status=SagaExecutionStepStatus.RUNNING
-        )
-        self.db.add(step)
-        self.db.commit()
+        step_name = step_plan.name
         
         try:
-            endpoint = step_config["endpoint"]
-            topic = self._interpolate_value(endpoint["topic"], context)
-            partition_key = self._interpolate_value(endpoint.get("partition_key", ""), context)
-            
-            # Prepare headers
-            headers = {}
-            if "headers" in endpoint:
-                headers = self._interpolate_dict(endpoint["headers"], context)
-            
-            # Prepare body
-            body = self._interpolate_dict(step_config["body"], context)
+            topic = step_plan.topic.render(context)
+            partition_key = step_plan.partition_key.render(context)
+            headers = step_plan.headers.render(context)
+            body = step_plan.body.render(context)
             
             step.request_data = {
                 "topic": topic,
@@ -294,19 +232,24 @@ class SagaExecutor:
                 "headers": headers,
                 "body": body
             }
-            self.db.commit()
-            
-            # Send to Kafka
-            producer = self._get_kafka_producer()
-            future = producer.send(
-                topic=topic,
-                key=partition_key if partition_key else None,
-                value=body,
-                headers=[(k, v.encode('utf-8')) for k, v in headers.items()]
-            )
+            self.journal.record(step)
             
-            # Wait for acknowledgment
-            record_metadata = future.get(timeout=10)
+            # Send to Kafka and await the acknowledgment without blocking the loop
+            record_metadata = await self._with_retries(
+                step_plan.retry,
+                step_plan.breaker,
+                KAFKA_DOWNSTREAM,
+                lambda: kafka_producer.send(
+                    topic=topic,
+                    key=partition_key if partition_key else None,
+                    value=body,
+                    headers=headers,
+                    timeout=step_plan.timeout
+                ),
+                step_plan.timeout,
+                step,
+                "forward"
+            )
             
             response_data = {
                 "topic": record_metadata.topic,
@@ -324,166 +267,594 @@ class SagaExecutor:
             
             step.status = SagaExecutionStepStatus.COMPLETED
             step.completed_at = datetime.utcnow()
-            self.db.commit()
+            self.journal.record(step)
+            await self.journal.checkpoint()
             
             return step
             
         except Exception as e:
             step.status = SagaExecutionStepStatus.FAILED
-            step.error_message = str(e)
+            step.error_message = self._failure_message(e, step_plan.timeout)
             step.completed_at = datetime.utcnow()
-            self.db.commit()
+            self.journal.record(step)
+            await self.journal.checkpoint()
+            return step
+    
+    async def _execute_kafka_request_reply_step(
+        self,
+        step_plan: StepPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
+    ) -> SagaExecutionStep:
+        """Execute a Kafka step that publishes a request and awaits its correlated reply"""
+        step_name = step_plan.name
+        # Per step, so that parallel request-reply steps of a saga await distinct replies
+        correlation_id = f"{context['webhook']['correlation_id']}:{step_name}"
+        reply_timeout = step_plan.reply_timeout or settings.KAFKA_REPLY_TIMEOUT
+        
+        try:
+            topic = step_plan.topic.render(context)
+            partition_key = step_plan.partition_key.render(context)
+            headers = {
+                **step_plan.headers.render(context),
+                step_plan.correlation_key: correlation_id,
+                "reply_topic": step_plan.reply_topic
+            }
+            body = step_plan.body.render(context)
+            
+            step.request_data = {
+                "topic": topic,
+                "partition_key": partition_key,
+                "headers": headers,
+                "body": body,
+                "reply_topic": step_plan.reply_topic
+            }
+            self.journal.record(step)
+            
+            # Replies are routed to this step by the process-wide reply consumer
+            exchange = await self._with_retries(
+                step_plan.retry,
+                step_plan.breaker,
+                KAFKA_DOWNSTREAM,
+                lambda: kafka_replies.request(
+                    lambda: kafka_producer.send(
+                        topic=topic,
+                        key=partition_key if partition_key else None,
+                        value=body,
+                        headers=headers,
+                        timeout=step_plan.timeout
+                    ),
+                    topic=step_plan.reply_topic,
+                    correlation_id=correlation_id,
+                    correlation_key=step_plan.correlation_key,
+                    timeout=reply_timeout
+                ),
+                step_plan.timeout,
+                step,
+                "forward"
+            )
+            
+            record_metadata = exchange["metadata"]
+            response_data = {
+                "kafka": {
+                    "topic": record_metadata.topic,
+                    "partition": record_metadata.partition,
+                    "offset": record_metadata.offset,
+                    "ack_received": True
+                },
+                "reply": exchange["reply"]
+            }
+            
+            step.response_data = response_data
+            
+            # Update context with the acknowledgement and the reply
+            context[step_name] = dict(response_data)
+            
+            # Check success condition; step-local names shadow the saga context
+            condition = step_plan.success_condition
+            if condition.evaluate(ChainMap(context[step_name], context)):
+                for key, path in step_plan.extract.items():
+                    context[step_name][key] = path.render(context[step_name])
+                
+                step.status = SagaExecutionStepStatus.COMPLETED
+            else:
+                step.status = SagaExecutionStepStatus.FAILED
+                step.error_message = f"Condition not met: {condition.source}"
+            
+            step.completed_at = datetime.utcnow()
+            self.journal.record(step)
+            await self.journal.checkpoint()
+            
+            return step
+        
+        except Exception as e:
+            step.status = SagaExecutionStepStatus.FAILED
+            if isinstance(e, TimeoutError) and (
+                step_plan.timeout is None or reply_timeout < step_plan.timeout
+            ):
+                step.error_message = f"No reply on {step_plan.reply_topic} after {reply_timeout}s"
+            else:
+                step.error_message = self._failure_message(e, step_plan.timeout)
+            step.completed_at = datetime.utcnow()
+            self.journal.record(step)
+            await self.journal.checkpoint()
             return step
     
     async def _rollback_step(
         self,
-        step_config: Dict[str, Any],
-        context: Dict[str, Any],
-        step_name: str
+        rollback: RollbackPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
     ):
-        """Execute rollback for a step"""
-        if "rollback" not in step_config or step_config["rollback"] is None:
-            return
+        """Execute rollback for a step, raising if the compensation did not succeed"""
+        if rollback.type == "api":
+            url = rollback.url.render(context)
+            headers = rollback.headers.render(context)
+            
+            body = None
+            if rollback.body is not None:
+                body = rollback.body.render(context)
+            
+            response = await self._with_retries(
+                rollback.retry,
+                rollback.breaker,
+                http_client.host_key(url),
+                lambda: http_client.request(
+                    method=rollback.method,
+                    url=url,
+                    headers=headers,
+                    json=body,
+                    timeout=rollback.timeout or settings.HTTP_TIMEOUT
+                ),
+                rollback.timeout,
+                step,
+                "rollback"
+            )
+            if response.is_error:
+                raise RuntimeError(f"Rollback returned status {response.status_code}")
+        
+        elif rollback.type == "kafka":
+            topic = rollback.topic.render(context)
+            partition_key = rollback.partition_key.render(context)
+            headers = rollback.headers.render(context)
+            body = rollback.body.render(context) if rollback.body is not None else None
+            
+            await self._with_retries(
+                rollback.retry,
+                rollback.breaker,
+                KAFKA_DOWNSTREAM,
+                lambda: kafka_producer.send(
+                    topic=topic,
+                    key=partition_key if partition_key else None,
+                    value=body,
+                    headers=headers,
+                    timeout=rollback.timeout
+                ),
+                rollback.timeout,
+                step,
+                "rollback"
+            )
+    
+    async def _execute_step(
+        self,
+        step_plan: StepPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
+    ) -> SagaExecutionStep:
+        """Dispatch a step to its executor by type"""
+        if step_plan.type == "api":
+            return await self._execute_api_step(step_plan, step, context)
+        elif step_plan.type == "kafka":
+            return await self._execute_kafka_step(step_plan, step, context)
+        elif step_plan.type == "kafka-request-reply":
+            return await self._execute_kafka_request_reply_step(step_plan, step, context)
+        raise ValueError(f"Unknown step type: {step_plan.type}")
+    
+    async def _run_steps(
+        self,
+        plan: SagaPlan,
+        context: Dict[str, Any],
+        execution: SagaExecution,
+        completed: Optional[Dict[str, Tuple[StepPlan, SagaExecutionStep]]] = None
+    ) -> Tuple[Dict[str, Tuple[StepPlan, SagaExecutionStep]], Optional[str]]:
+        """Run the plan as a DAG, starting every step whose dependencies completed
         
-        rollback_config = step_config["rollback"]
-        rollback_type = rollback_config.get("type", "api")
+        Returns the completed steps by name and the failure that stopped the saga, if
+        any. Once a step fails no new steps are started, but steps already in flight
+        are awaited so that their outcome is known before compensating. When the saga
+        global_timeout expires, in-flight steps are cancelled right away instead.
+        Steps passed in `completed` (a resumed execution) are not run again.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + plan.global_timeout if plan.global_timeout else None
+        
+        completed = dict(completed or {})
+        failure: Optional[str] = None
+        pending: List[StepPlan] = [step for step in plan.steps if step.name not in completed]
+        running: Dict[asyncio.Task, Tuple[StepPlan, SagaExecutionStep]] = {}
+        
+        self._release_outputs(context, completed)
         
         try:
-            if rollback_type == "api":
-                endpoint = rollback_config["endpoint"]
-                url = self._interpolate_value(endpoint["url"], context)
-                method = endpoint.get("method", "POST").upper()
-                
-                headers = {}
-                if "headers" in endpoint:
-                    headers = self._interpolate_dict(endpoint["headers"], context)
+            while pending or running:
+                if failure is None:
+                    for step_plan in list(pending):
+                        if len(running) >= plan.max_concurrency:
+                            break
+                        if step_plan.dependencies <= completed.keys():
+                            pending.remove(step_plan)
+                            step = self.journal.begin_step(execution, step_plan.name, step_plan.type)
+                            task = asyncio.create_task(
+                                self._execute_step(step_plan, step, context)
+                            )
+                            running[task] = (step_plan, step)
                 
-                body = None
-                if "body" in rollback_config:
-                    body = self._interpolate_dict(rollback_config["body"], context)
+                if not running:
+                    break
                 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    await client.request(
-                        method=method,
-                        url=url,
-                        headers=headers,
-                        json=body
-                    )
-            
-            elif rollback_type == "kafka":
-                endpoint = rollback_config["endpoint"]
-                topic = self._interpolate_value(endpoint["topic"], context)
-                partition_key = self._interpolate_value(endpoint.get("partition_key", ""), context)
+                timeout = None if deadline is None else max(deadline - loop.time(), 0)
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
                 
-                headers = {}
-                if "headers" in endpoint:
-                    headers = self._interpolate_dict(endpoint["headers"], context)
+                if not done:
+                    # Saga deadline expired: stop waiting on hung downstreams
+                    if failure is None:
+                        failure = f"Saga exceeded global_timeout of {plan.global_timeout}s"
+                    await self._cancel_running(running, completed, "Cancelled: saga deadline exceeded")
+                    break
                 
-                body = self._interpolate_dict(rollback_config["body"], context)
+                for task in done:
+                    step_plan, step = running.pop(task)
+                    step = task.result()
+                    if step.status == SagaExecutionStepStatus.COMPLETED:
+                        completed[step_plan.name] = (step_plan, step)
+                    elif failure is None:
+                        failure = f"Step '{step.step_name}' failed: {step.error_message}"
                 
-                producer = self._get_kafka_producer()
-                producer.send(
-                    topic=topic,
-                    key=partition_key if partition_key else None,
-                    value=body,
-                    headers=[(k, v.encode('utf-8')) for k, v in headers.items()]
-                )
-                producer.flush()
+                self._release_outputs(context, completed)
+        finally:
+            if running:
+                await self._cancel_running(running, completed, "Cancelled: saga aborted")
         
-        except Exception as e:
-            # Log rollback failure but continue
-            print(f"Rollback failed for step {step_name}: {str(e)}")
+        return completed, failure
     
-    async def execute_saga(
+    def _release_outputs(
+        self,
+        context: Dict[str, Any],
+        completed: Dict[str, Tuple[StepPlan, SagaExecutionStep]]
+    ):
+        """Drop raw step outputs from the context once every step reading them completed
+        
+        Only the extracted values of a released step stay in the context, so that
+        later checkpoints and the memory held by a long saga do not carry them.
+        """
+        for step_plan, _ in completed.values():
+            if step_plan.consumers is None or not step_plan.consumers <= completed.keys():
+                continue
+            output = context.get(step_plan.name)
+            if isinstance(output, dict) and output.keys() - step_plan.extract.keys():
+                context[step_plan.name] = {
+                    key: output[key] for key in step_plan.extract if key in output
+                }
+    
+    async def _cancel_running(
+        self,
+        running: Dict[asyncio.Task, Tuple[StepPlan, SagaExecutionStep]],
+        completed: Dict[str, Tuple[StepPlan, SagaExecutionStep]],
+        reason: str
+    ):
+        """Cancel in-flight steps, keeping those that finished before the cancellation landed"""
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        
+        for step_plan, step in running.values():
+            if step.status == SagaExecutionStepStatus.COMPLETED:
+                completed[step_plan.name] = (step_plan, step)
+            elif step.status == SagaExecutionStepStatus.RUNNING:
+                step.status = SagaExecutionStepStatus.FAILED
+                step.error_message = reason
+                step.completed_at = datetime.utcnow()
+                self.journal.record(step)
+        running.clear()
+    
+    async def _compensate_step(
+        self,
+        step_plan: StepPlan,
+        step: SagaExecutionStep,
+        context: Dict[str, Any]
+    ):
+        """Run the compensation of one completed step and record its timing"""
+        if step_plan.rollback is not None:
+            step.rollback_started_at = datetime.utcnow()
+            try:
+                await self._rollback_step(step_plan.rollback, step, context)
+            except Exception as e:
+                # Record the failure and keep compensating the remaining steps
+                logger.warning("Rollback failed for step %s: %s", step_plan.name, e)
+                step.rollback_error = self._failure_message(e, step_plan.rollback.timeout)
+            step.rollback_completed_at = datetime.utcnow()
+        
+        step.status = SagaExecutionStepStatus.ROLLED_BACK
+        self.journal.record(step)
+        await self.journal.checkpoint()
+    
+    async def _compensate(
+        self,
+        plan: SagaPlan,
+        completed: Dict[str, Tuple[StepPlan, SagaExecutionStep]],
+        context: Dict[str, Any]
+    ):
+        """Roll back completed steps according to the plan's rollback strategy
+        
+        sequential: one at a time, in reverse topological order.
+        parallel: groups run one after another in ascending `rollback.group`; the
+        compensations inside a group run concurrently, up to `rollback_concurrency`.
+        """
+        ordered = sorted(completed.values(), key=lambda item: item[0].order, reverse=True)
+        
+        if plan.rollback_strategy != "parallel":
+            for step_plan, step in ordered:
+                await self._compensate_step(step_plan, step, context)
+            return
+        
+        groups: Dict[int, List[Tuple[StepPlan, SagaExecutionStep]]] = {}
+        for step_plan, step in ordered:
+            group = step_plan.rollback.group if step_plan.rollback is not None else 0
+            groups.setdefault(group, []).append((step_plan, step))
+        
+        slots = asyncio.Semaphore(plan.rollback_concurrency or max(len(ordered), 1))
+        
+        async def compensate_with_slot(step_plan: StepPlan, step: SagaExecutionStep):
+            async with slots:
+                await self._compensate_step(step_plan, step, context)
+        
+        for group in sorted(groups):
+            await asyncio.gather(
+                *(compensate_with_slot(step_plan, step) for step_plan, step in groups[group])
+            )
+    
+    async def create_execution(
         self,
         saga_config: SagaConfiguration,
-        input_data: Dict[str, Any]
+        input_data: Dict[str, Any],
+        status: SagaExecutionStatus = SagaExecutionStatus.RUNNING,
+        idempotency_key: Optional[str] = None
     ) -> SagaExecution:
-        """Execute a complete SAGA workflow"""
-        # Parse YAML
-        config = yaml.safe_load(saga_config.yaml_content)
+        """Validate the configuration and persist a new execution record
         
-        # Create execution record
-        correlation_id = str(uuid.uuid4())
+        An idempotency key is stored in the same transaction; when another execution
+        already holds it, nothing is stored and IdempotencyKeyTaken is raised.
+        """
+        # Fails with SagaPlanError before anything is stored
+        plan_cache.get_plan(saga_config)
+        
+        saga_config_id = saga_config.id
         execution = SagaExecution(
-            saga_configuration_id=saga_config.id,
-            correlation_id=correlation_id,
-            status=SagaExecutionStatus.RUNNING,
+            saga_configuration_id=saga_config_id,
+            correlation_id=str(uuid.uuid4()),
+            status=status,
             input_data=input_data
         )
         self.db.add(execution)
-        self.db.commit()
-        self.db.refresh(execution)
+        if idempotency_key is not None:
+            await self.db.flush()
+            if not await claim_key(self.db, saga_config_id, idempotency_key, input_data, execution):
+                await self.db.rollback()
+                raise IdempotencyKeyTaken(idempotency_key)
+        await self.db.commit()
+        await self.db.refresh(execution)
+        return execution
+    
+    async def execute_saga(
+        self,
+        saga_config: SagaConfiguration,
+        input_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> SagaExecution:
+        """Execute a complete SAGA workflow"""
+        execution = await self.create_execution(
+            saga_config, input_data, idempotency_key=idempotency_key
+        )
+        return await self.run_execution(saga_config, execution)
+    
+    async def run_execution(
+        self,
+        saga_config: SagaConfiguration,
+        execution: SagaExecution
+    ) -> SagaExecution:
+        """Run the steps of a persisted execution until it completes or is rolled back"""
+        try:
+            # Compiled plan, parsed once per configuration revision
+            plan = plan_cache.get_plan(saga_config)
+        except SagaPlanError as e:
+            # The configuration changed into an invalid one while the execution was queued
+            execution.status = SagaExecutionStatus.FAILED
+            execution.error_message = str(e)
+            execution.completed_at = datetime.utcnow()
+            await lease_keeper.release(self.db, execution.id)
+            await self.db.commit()
+            event_bus.publish(execution_event(execution))
+            return execution
+        
+        execution.status = SagaExecutionStatus.RUNNING
+        if lease_keeper.started:
+            # Lets the recovery sweeper tell a live execution from an orphaned one
+            await lease_keeper.acquire(self.db, execution)
+        await self.db.commit()
+        event_bus.publish(execution_event(execution))
         
         # Initialize context
         context = {
             "webhook": {
-                "correlation_id": correlation_id,
-                **input_data
+                "correlation_id": execution.correlation_id,
+                **execution.input_data
             }
         }
         
-        executed_steps: List[Dict[str, Any]] = []
+        return await self._drive(plan, execution, context, {})
+    
+    async def resume_execution(
+        self,
+        saga_config: SagaConfiguration,
+        execution: SagaExecution
+    ) -> SagaExecution:
+        """Continue an execution orphaned by a dead process from its last checkpoint
+        
+        Steps recorded as COMPLETED are never invoked again; their outputs come from
+        the context snapshot. Steps that were in flight are marked failed: with the
+        `resume` recovery policy they are run again, with `compensate` (or when the
+        execution was already compensating) the completed steps are rolled back.
+        A completed step whose output is missing from the snapshot is still rolled
+        back; when a remaining step reads that output, the execution is compensated
+        instead of resumed.
+        """
+        plan = plan_cache.get_plan(saga_config)
+        plans = {step_plan.name: step_plan for step_plan in plan.steps}
+        
+        result = await self.db.execute(
+            select(SagaExecutionStep)
+            .where(
+                SagaExecutionStep.saga_execution_id == execution.id,
+                SagaExecutionStep.execution_started_at == execution.started_at
+            )
+            .order_by(SagaExecutionStep.id)
+        )
+        steps = result.scalars().all()
+        
+        context = dict(execution.context_snapshot or {})
+        context.setdefault("webhook", {
+            "correlation_id": execution.correlation_id,
+            **execution.input_data
+        })
+        
+        # The journal persists these records by id, so they are detached from the session
+        self.journal = StepJournal(
+            self.db,
+            flush_mode=plan.journal_flush,
+            payload_policies=plan.payload_policies
+        )
+        completed: Dict[str, Tuple[StepPlan, SagaExecutionStep]] = {}
+        for step in steps:
+            self.db.expunge(step)
+            step_plan = plans.get(step.step_name)
+            if step.status == SagaExecutionStepStatus.COMPLETED:
+                if step_plan is None:
+                    logger.warning(
+                        "Execution %s: completed step %s is no longer in the saga, not compensated",
+                        execution.id, step.step_name
+                    )
+                    continue
+                # Its side effect happened: compensated even without a checkpointed output
+                completed[step.step_name] = (step_plan, step)
+            elif step.status == SagaExecutionStepStatus.RUNNING:
+                # In flight when the process died
+                step.status = SagaExecutionStepStatus.FAILED
+                step.error_message = "Interrupted: the process running the saga stopped"
+                step.completed_at = datetime.utcnow()
+                self.journal.record(step)
+        
+        # Outputs the remaining steps (or the output projection) read but were never checkpointed
+        needed = set(plan.output.references) if plan.output is not None else set()
+        for step_plan in plan.steps:
+            if step_plan.name not in completed:
+                needed |= step_plan.references
+        missing = sorted(name for name in completed if name not in context and name in needed)
+        
+        compensating = (
+            execution.status == SagaExecutionStatus.FAILED
+            or plan.recovery == "compensate"
+            or bool(missing)
+        )
+        logger.info(
+            "Recovering execution %s (%d completed steps, %s)",
+            execution.id, len(completed), "compensating" if compensating else "resuming"
+        )
+        
+        if compensating:
+            execution.status = SagaExecutionStatus.FAILED
+            if not execution.error_message:
+                execution.error_message = "Interrupted: compensated after recovery"
+                if missing:
+                    execution.error_message += (
+                        f" (outputs of {', '.join(missing)} were not checkpointed)"
+                    )
+        return await self._drive(plan, execution, context, completed, compensate_only=compensating)
+    
+    async def _drive(
+        self,
+        plan: SagaPlan,
+        execution: SagaExecution,
+        context: Dict[str, Any],
+        completed: Dict[str, Tuple[StepPlan, SagaExecutionStep]],
+        compensate_only: bool = False
+    ) -> SagaExecution:
+        """Run the remaining steps (or only the compensation) and record the outcome
+        
+        A run cancelled here stops renewing its lease, so that the execution is
+        recovered once the lease expires. A run whose lease was taken over by another
+        process is cancelled by the lease keeper and ends with LeaseLostError, without
+        writing anything more.
+        """
+        execution_id = execution.id
+        # Step transitions are buffered and persisted at the plan's durability points
+        if self.journal is None:
+            self.journal = StepJournal(
+                self.db,
+                flush_mode=plan.journal_flush,
+                payload_policies=plan.payload_policies
+            )
+        self.journal.execution = execution
+        self.journal.context = context
+        if lease_keeper.holds(execution_id):
+            self.journal.lease_owner = lease_keeper.owner
+        lease_keeper.watch(execution_id)
         
         try:
-            # Execute each step
-            for step_config in config.get("executions", []):
-                step_name = step_config["name"]
-                step_type = step_config["type"]
-                
-                if step_type == "api":
-                    step = await self._execute_api_step(step_config, context, execution, step_name)
-                elif step_type == "kafka":
-                    step = await self._execute_kafka_step(step_config, context, execution, step_name)
+            try:
+                if compensate_only:
+                    failure = execution.error_message
                 else:
-                    raise ValueError(f"Unknown step type: {step_type}")
-                
-                executed_steps.append({
-                    "name": step_name,
-                    "config": step_config,
-                    "step": step
-                })
+                    completed, failure = await self._run_steps(plan, context, execution, completed)
                 
-                # Check if step failed
-                if step.status == SagaExecutionStepStatus.FAILED:
-                    # Rollback in reverse order
+                # Check if a step failed or the saga deadline expired
+                if failure is not None:
                     execution.status = SagaExecutionStatus.FAILED
-                    execution.error_message = f"Step '{step_name}' failed: {step.error_message}"
+                    execution.error_message = failure
                     
-                    for executed in reversed(executed_steps):
-                        await self._rollback_step(
-                            executed["config"],
-                            context,
-                            executed["name"]
-                        )
-                        executed["step"].status = SagaExecutionStepStatus.ROLLED_BACK
-                        self.db.commit()
+                    await self._compensate(plan, completed, context)
                     
                     execution.status = SagaExecutionStatus.ROLLED_BACK
-                    execution.completed_at = datetime.utcnow()
-                    self.db.commit()
-                    self.db.refresh(execution)
-                    return execution
-            
-            # All steps completed successfully
-            execution.status = SagaExecutionStatus.COMPLETED
-            execution.output_data = context
-            execution.completed_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(execution)
-            
-            return execution
+                else:
+                    # All steps completed successfully
+                    execution.status = SagaExecutionStatus.COMPLETED
+                    execution.output_data = (
+                        plan.output.render(context) if plan.output is not None else context
+                    )
+                
+            except LeaseLostError:
+                raise
+            except Exception as e:
+                execution.status = SagaExecutionStatus.FAILED
+                execution.error_message = str(e)
             
-        except Exception as e:
-            execution.status = SagaExecutionStatus.FAILED
-            execution.error_message = str(e)
             execution.completed_at = datetime.utcnow()
-            self.db.commit()
-            self.db.refresh(execution)
-            return execution
-        
+            self.journal.context = None
+            # The journal of a leased execution releases the lease with the final state
+            # (still fenced on it); stop renewing it first, so that a heartbeat finding
+            # it released does not take the finished execution for lost
+            lease_keeper.untrack(execution_id)
+            await self.journal.flush()
+            await self.db.refresh(execution)
+        except asyncio.CancelledError:
+            if lease_keeper.lost(execution_id) and asyncio.current_task().uncancel() == 0:
+                raise LeaseLostError(
+                    f"Execution {execution_id} was taken over by another process"
+                ) from None
+            raise
         finally:
-            # Close Kafka producer
-            if self.kafka_producer:
-                self.kafka_producer.close()
-                self.kafka_producer = None
+            lease_keeper.untrack(execution_id)
+        
+        event_bus.publish(execution_event(execution))
+        return execution
@@ -0,0 +1,564 @@
+import re
+import yaml
+from dataclasses import dataclass, field
+from typing import Dict, Any, FrozenSet, Optional, List, Tuple
+
+from app.core.config import settings
+
+from app.services.circuit_breaker import BreakerPolicy
+from app.services.expressions import SCOPE_ROOTS, Expression, ExpressionError, compile_expression
+from app.services.payloads import FULL_PAYLOADS, PAYLOAD_MODES, PayloadPolicy
+from app.services.retry import NO_RETRY, RetryPolicy
+from app.services.step_journal import FlushMode
+from app.services.templating import Template, Constant, compile_template, compile_path
+
+
+STEP_TYPES = ("api", "kafka", "kafka-request-reply")
+ROLLBACK_TYPES = ("api", "kafka")
+EXECUTION_MODES = ("sequential", "dag")
+ROLLBACK_STRATEGIES = ("sequential", "parallel")
+RECOVERY_POLICIES = ("resume", "compensate")
+TRIGGER_TYPES = ("kafka",)
+DEFAULT_SUCCESS_CONDITION = "response.status == 200"
+# A correlated reply arriving in time is success unless the step says otherwise
+DEFAULT_REPLY_SUCCESS_CONDITION = "true"
+DEFAULT_CORRELATION_KEY = "correlation_id"
+
+DURATION_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(ms|s|m|h)?\s*$')
+DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class SagaPlanError(ValueError):
+    """Raised when a saga YAML cannot be compiled into an execution plan"""
+
+
+@dataclass
+class RollbackPlan:
+    """Normalized compensation action of a step"""
+    type: str
+    endpoint: Dict[str, Any]
+    method: str = "POST"
+    url: Optional[Template] = None
+    topic: Optional[Template] = None
+    partition_key: Template = field(default_factory=lambda: Constant(""))
+    headers: Template = field(default_factory=lambda: Constant({}))
+    body: Optional[Template] = None
+    # Ordering group for the parallel rollback strategy (lower groups run first)
+    group: int = 0
+    timeout: Optional[float] = None
+    retry: RetryPolicy = NO_RETRY
+    breaker: Optional[BreakerPolicy] = None
+
+    @property
+    def paths(self) -> FrozenSet[Tuple[str, ...]]:
+        """Context paths referenced by the compensation"""
+        templates = [self.headers, self.partition_key]
+        templates += [t for t in (self.url, self.topic, self.body) if t is not None]
+        return frozenset().union(*(template.paths for template in templates))
+
+
+@dataclass
+class StepPlan:
+    """Normalized step of a saga plan"""
+    name: str
+    type: str
+    endpoint: Dict[str, Any]
+    method: str = "POST"
+    url: Optional[Template] = None
+    topic: Optional[Template] = None
+    partition_key: Template = field(default_factory=lambda: Constant(""))
+    headers: Template = field(default_factory=lambda: Constant({}))
+    body: Optional[Template] = None
+    success_condition: Expression = field(
+        default_factory=lambda: compile_expression(DEFAULT_SUCCESS_CONDITION)
+    )
+    extract: Dict[str, Template] = field(default_factory=dict)
+    rollback: Optional[RollbackPlan] = None
+    # Seconds allowed for one attempt of the step
+    timeout: Optional[float] = None
+    retry: RetryPolicy = NO_RETRY
+    breaker: Optional[BreakerPolicy] = None
+    depends_on: List[str] = field(default_factory=list)
+    # kafka-request-reply: topic the reply is awaited on, matched by a correlation header
+    reply_topic: Optional[str] = None
+    correlation_key: str = DEFAULT_CORRELATION_KEY
+    reply_timeout: Optional[float] = None
+    # What is stored of the step's payloads; the saga default unless overridden
+    payloads: Optional[PayloadPolicy] = None
+    # Resolved upstream steps (explicit plus inferred), filled in by compile_plan
+    dependencies: FrozenSet[str] = frozenset()
+    # Position in the topological order, used to order compensations
+    order: int = 0
+    # Steps whose forward action reads this step's output, which is released once
+    # they all completed; None when it is needed until the end of the saga
+    consumers: Optional[FrozenSet[str]] = None
+
+    @property
+    def references(self) -> FrozenSet[str]:
+        """Root names referenced by the forward action of the step"""
+        templates = [self.headers, self.partition_key]
+        templates += [t for t in (self.url, self.topic, self.body) if t is not None]
+        return frozenset().union(
+            self.success_condition.references,
+            *(template.references for template in templates)
+        )
+
+
+@dataclass(frozen=True)
+class TriggerPlan:
+    """Event source that starts executions of the saga"""
+    type: str
+    topic: str
+    # Consumer group; defaults to one group per saga configuration
+    group: Optional[str] = None
+
+
+@dataclass
+class SagaPlan:
+    """Parsed and normalized saga configuration, ready to be executed"""
+    steps: List[StepPlan]
+    execution_mode: str = "sequential"
+    max_concurrency: int = 1
+    rollback_strategy: str = "sequential"
+    rollback_concurrency: Optional[int] = None
+    # Seconds allowed for the forward phase of the whole saga
+    global_timeout: Optional[float] = None
+    journal_flush: Optional[str] = None
+    # What to do with an execution orphaned by a crash: resume it or roll it back
+    recovery: str = "resume"
+    trigger: Optional[TriggerPlan] = None
+    payloads: PayloadPolicy = FULL_PAYLOADS
+    # Projection of the context stored as output_data; the whole context when absent
+    output: Optional[Template] = None
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def payload_policies(self) -> Dict[str, PayloadPolicy]:
+        return {step.name: step.payloads for step in self.steps}
+
+
+def parse_duration(value: Any, what: str) -> Optional[float]:
+    """Parse durations such as `500ms`, `10s`, `2m` or `1h` (bare numbers are seconds)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        match = DURATION_PATTERN.match(str(value))
+        if not match:
+            raise SagaPlanError(f"Invalid duration for {what}: {value}")
+        seconds = float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise SagaPlanError(f"Duration for {what} must be positive: {value}")
+    return seconds
+
+
+def _positive_int(owner: str, raw: Dict[str, Any], key: str, default: int) -> int:
+    value = raw.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise SagaPlanError(f"{owner}: {key} must be a positive integer")
+    return value
+
+
+def _compile_retry(owner: str, raw: Any) -> RetryPolicy:
+    """Normalize a `retry` block; without one the action is attempted once"""
+    if raw is None:
+        return NO_RETRY
+    if not isinstance(raw, dict):
+        raise SagaPlanError(f"{owner}: retry must be a mapping")
+
+    max_attempts = _positive_int(f"{owner} retry", raw, "max_attempts", 3)
+
+    backoff = raw.get("backoff") or {}
+    if not isinstance(backoff, dict):
+        raise SagaPlanError(f"{owner}: retry backoff must be a mapping")
+    base = parse_duration(backoff.get("base", NO_RETRY.backoff_base), f"{owner} retry backoff base")
+    cap = parse_duration(backoff.get("cap", NO_RETRY.backoff_cap), f"{owner} retry backoff cap")
+    jitter = backoff.get("jitter", True)
+    if not isinstance(jitter, bool):
+        raise SagaPlanError(f"{owner}: retry backoff jitter must be true or false")
+
+    statuses = raw.get("retry_on_status", sorted(NO_RETRY.retry_on_status))
+    if not isinstance(statuses, list) or not all(
+        isinstance(code, int) and 100 <= code <= 599 for code in statuses
+    ):
+        raise SagaPlanError(f"{owner}: retry_on_status must be a list of HTTP status codes")
+
+    exceptions = raw.get("retry_on", sorted(NO_RETRY.retry_on))
+    if not isinstance(exceptions, list) or not all(isinstance(name, str) for name in exceptions):
+        raise SagaPlanError(f"{owner}: retry_on must be a list of exception class names")
+
+    return RetryPolicy(
+        max_attempts=max_attempts,
+        backoff_base=base,
+        backoff_cap=max(cap, base),
+        jitter=jitter,
+        retry_on_status=frozenset(statuses),
+        retry_on=frozenset(exceptions),
+    )
+
+
+def _compile_breaker(owner: str, raw: Any) -> Optional[BreakerPolicy]:
+    """Normalize a `breaker` block: a name, a mapping of thresholds, or false to disable"""
+    if raw is False or (raw is None and not settings.CIRCUIT_BREAKER_ENABLED):
+        return None
+    if raw is None or raw is True:
+        return BreakerPolicy()
+    if isinstance(raw, str):
+        return BreakerPolicy(name=raw)
+    if not isinstance(raw, dict):
+        raise SagaPlanError(f"{owner}: breaker must be a name, a mapping or false")
+
+    defaults = BreakerPolicy()
+    name = raw.get("name")
+    return BreakerPolicy(
+        name=str(name) if name is not None else None,
+        failure_threshold=_positive_int(
+            f"{owner} breaker", raw, "failure_threshold", defaults.failure_threshold
+        ),
+        reset_timeout=parse_duration(
+            raw.get("reset_timeout", defaults.reset_timeout), f"{owner} breaker reset_timeout"
+        ),
+        half_open_max_calls=_positive_int(
+            f"{owner} breaker", raw, "half_open_max_calls", defaults.half_open_max_calls
+        ),
+    )
+
+
+def _compile_payloads(owner: str, raw: Any) -> Optional[PayloadPolicy]:
+    """Normalize a `payload_storage` block"""
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise SagaPlanError(f"{owner}: payload_storage must be a mapping")
+
+    mode = raw.get("mode", "full")
+    if mode not in PAYLOAD_MODES:
+        raise SagaPlanError(f"{owner}: unknown payload_storage mode: {mode}")
+
+    max_bytes = None
+    if mode == "truncate":
+        max_bytes = _positive_int(f"{owner} payload_storage", raw, "max_bytes", 1024)
+
+    fields = raw.get("fields") or []
+    if mode == "allowlist" and (
+        not fields or not isinstance(fields, list)
+        or not all(isinstance(path, str) and path for path in fields)
+    ):
+        raise SagaPlanError(f"{owner}: payload_storage fields must be a list of dotted paths")
+
+    compress_above = raw.get("compress_above")
+    if compress_above is not None:
+        compress_above = _positive_int(f"{owner} payload_storage", raw, "compress_above", 0)
+
+    return PayloadPolicy(
+        mode=mode,
+        max_bytes=max_bytes,
+        fields=tuple(fields) if mode == "allowlist" else (),
+        compress_above=compress_above,
+    )
+
+
+def _compile_endpoint(endpoint: Dict[str, Any]) -> Dict[str, Any]:
+    """Compile the templated parts of an endpoint block"""
+    compiled: Dict[str, Any] = {
+        "method": str(endpoint.get("method", "POST")).upper(),
+        "headers": compile_template(endpoint.get("headers") or {}),
+        "partition_key": compile_template(endpoint.get("partition_key", "")),
+    }
+    if "url" in endpoint:
+        compiled["url"] = compile_template(endpoint["url"])
+    if "topic" in endpoint:
+        compiled["topic"] = compile_template(endpoint["topic"])
+    return compiled
+
+
+def _compile_body(raw: Dict[str, Any]) -> Optional[Template]:
+    if raw.get("body") is None:
+        return None
+    return compile_template(raw["body"])
+
+
+def _compile_rollback(step_name: str, raw: Optional[Dict[str, Any]]) -> Optional[RollbackPlan]:
+    """Normalize the rollback block of a step"""
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise SagaPlanError(f"Step '{step_name}': rollback must be a mapping")
+
+    rollback_type = raw.get("type", "api")
+    if rollback_type not in ROLLBACK_TYPES:
+        raise SagaPlanError(f"Step '{step_name}': unknown rollback type: {rollback_type}")
+
+    endpoint = raw.get("endpoint")
+    if not isinstance(endpoint, dict):
+        raise SagaPlanError(f"Step '{step_name}': rollback endpoint is required")
+    if rollback_type == "api" and "url" not in endpoint:
+        raise SagaPlanError(f"Step '{step_name}': rollback endpoint url is required")
+    if rollback_type == "kafka" and "topic" not in endpoint:
+        raise SagaPlanError(f"Step '{step_name}': rollback endpoint topic is required")
+
+    group = raw.get("group", 0)
+    if not isinstance(group, int):
+        raise SagaPlanError(f"Step '{step_name}': rollback group must be an integer")
+
+    return RollbackPlan(
+        type=rollback_type,
+        endpoint=endpoint,
+        body=_compile_body(raw),
+        group=group,
+        timeout=parse_duration(raw.get("timeout"), f"step '{step_name}' rollback timeout"),
+        retry=_compile_retry(f"Step '{step_name}' rollback", raw.get("retry")),
+        breaker=_compile_breaker(f"Step '{step_name}' rollback", raw.get("breaker")),
+        **_compile_endpoint(endpoint),
+    )
+
+
+def _compile_step(raw: Dict[str, Any], roots: FrozenSet[str] = SCOPE_ROOTS) -> StepPlan:
+    """Normalize a single entry of `executions`
+
+    `roots` are the names a bare path of the success condition may start with.
+    """
+    if not isinstance(raw, dict) or "name" not in raw or "type" not in raw:
+        raise SagaPlanError("Every execution step must declare a name and a type")
+
+    name = raw["name"]
+    step_type = raw["type"]
+    if step_type not in STEP_TYPES:
+        raise SagaPlanError(f"Unknown step type: {step_type}")
+
+    endpoint = raw.get("endpoint")
+    if not isinstance(endpoint, dict):
+        raise SagaPlanError(f"Step '{name}': endpoint is required")
+    if step_type == "api" and "url" not in endpoint:
+        raise SagaPlanError(f"Step '{name}': endpoint url is required")
+    if step_type in ("kafka", "kafka-request-reply"):
+        if "topic" not in endpoint:
+            raise SagaPlanError(f"Step '{name}': endpoint topic is required")
+        if "body" not in raw:
+            raise SagaPlanError(f"Step '{name}': body is required for kafka steps")
+
+    reply_topic = endpoint.get("reply_topic")
+    correlation_key = endpoint.get("correlation_key", DEFAULT_CORRELATION_KEY)
+    if step_type == "kafka-request-reply":
+        if not isinstance(reply_topic, str) or not reply_topic:
+            raise SagaPlanError(f"Step '{name}': endpoint reply_topic is required")
+        if not isinstance(correlation_key, str) or not correlation_key:
+            raise SagaPlanError(f"Step '{name}': correlation_key must be a header name")
+
+    success = raw.get("success") or {}
+    default_condition = (
+        DEFAULT_REPLY_SUCCESS_CONDITION
+        if step_type == "kafka-request-reply" else DEFAULT_SUCCESS_CONDITION
+    )
+    try:
+        success_condition = compile_expression(
+            str(success.get("condition", default_condition)), roots
+        )
+    except ExpressionError as e:
+        raise SagaPlanError(f"Step '{name}': invalid success condition: {str(e)}")
+
+    depends_on = raw.get("depends_on") or []
+    if isinstance(depends_on, str):
+        depends_on = [depends_on]
+    if not isinstance(depends_on, list):
+        raise SagaPlanError(f"Step '{name}': depends_on must be a list of step names")
+
+    # Rollback may be declared at the step level or, as documented, under `error`
+    rollback_raw = raw.get("rollback")
+    if rollback_raw is None:
+        rollback_raw = (raw.get("error") or {}).get("rollback")
+
+    return StepPlan(
+        name=name,
+        type=step_type,
+        endpoint=endpoint,
+        body=_compile_body(raw),
+        success_condition=success_condition,
+        extract={
+            key: compile_path(str(path))
+            for key, path in (success.get("extract") or {}).items()
+        },
+        rollback=_compile_rollback(name, rollback_raw),
+        timeout=parse_duration(raw.get("timeout"), f"step '{name}' timeout"),
+        retry=_compile_retry(f"Step '{name}'", raw.get("retry")),
+        breaker=_compile_breaker(f"Step '{name}'", raw.get("breaker")),
+        depends_on=[str(dependency) for dependency in depends_on],
+        reply_topic=reply_topic if step_type == "kafka-request-reply" else None,
+        correlation_key=correlation_key,
+        reply_timeout=parse_duration(raw.get("reply_timeout"), f"step '{name}' reply_timeout"),
+        payloads=_compile_payloads(f"Step '{name}'", raw.get("payload_storage")),
+        **_compile_endpoint(endpoint),
+    )
+
+
+def _compile_trigger(raw: Any) -> Optional[TriggerPlan]:
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise SagaPlanError("trigger must be a mapping")
+
+    trigger_type = raw.get("type")
+    if trigger_type not in TRIGGER_TYPES:
+        raise SagaPlanError(f"Unknown trigger type: {trigger_type}")
+
+    topic = raw.get("topic")
+    if not isinstance(topic, str) or not topic:
+        raise SagaPlanError("trigger: 'topic' is required")
+
+    group = raw.get("group")
+    if group is not None and (not isinstance(group, str) or not group):
+        raise SagaPlanError("trigger: 'group' must be a non-empty string")
+
+    return TriggerPlan(type=trigger_type, topic=topic, group=group)
+
+
+def _resolve_dependencies(steps: List[StepPlan], execution_mode: str) -> List[StepPlan]:
+    """Fill in step dependencies and return the steps in topological order"""
+    names = {step.name for step in steps}
+
+    for index, step in enumerate(steps):
+        unknown = [name for name in step.depends_on if name not in names]
+        if unknown:
+            raise SagaPlanError(f"Step '{step.name}': unknown depends_on: {', '.join(unknown)}")
+
+        if execution_mode == "sequential":
+            # Every step waits for the one declared before it, as in YAML order
+            dependencies = {steps[index - 1].name} if index > 0 else set()
+        else:
+            # Explicit depends_on plus every other step referenced through ${step-name...}
+            dependencies = set(step.depends_on) | (step.references & names)
+        dependencies.discard(step.name)
+        step.dependencies = frozenset(dependencies)
+
+    # Kahn's algorithm, keeping YAML order among steps that are ready together
+    ordered: List[StepPlan] = []
+    remaining = list(steps)
+    done = set()
+    while remaining:
+        ready = [step for step in remaining if step.dependencies <= done]
+        if not ready:
+            cycle = ", ".join(step.name for step in remaining)
+            raise SagaPlanError(f"Dependency cycle between steps: {cycle}")
+        for step in ready:
+            step.order = len(ordered)
+            ordered.append(step)
+            done.add(step.name)
+        remaining = [step for step in remaining if step.name not in done]
+    return ordered
+
+
+def _compile_output(raw: Any) -> Optional[Template]:
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        raise SagaPlanError("output must be a mapping")
+    return compile_template(raw)
+
+
+def _resolve_consumers(steps: List[StepPlan], output: Optional[Template]):
+    """Find, for each step, the later steps that still need its output in the context
+
+    Outputs read by a compensation (which may run until the saga ends) or by the
+    output projection are kept, unless only their extracted values are read.
+    Without an output projection every output is kept, as the whole context
+    becomes output_data.
+    """
+    if output is None:
+        for step in steps:
+            step.consumers = None
+        return
+
+    paths = set(output.paths)
+    for step in steps:
+        if step.rollback is not None:
+            paths |= step.rollback.paths
+
+    for step in steps:
+        if any(
+            path[0] == step.name and (len(path) < 2 or path[1] not in step.extract)
+            for path in paths
+        ):
+            step.consumers = None
+        else:
+            step.consumers = frozenset(
+                other.name for other in steps
+                if other is not step and step.name in other.references
+            )
+
+
+def compile_plan(yaml_content: str) -> SagaPlan:
+    """Parse a saga YAML and normalize it into a SagaPlan"""
+    try:
+        config = yaml.safe_load(yaml_content)
+    except yaml.YAMLError as e:
+        raise SagaPlanError(f"Invalid YAML content: {str(e)}")
+
+    if config is None:
+        config = {}
+    if not isinstance(config, dict):
+        raise SagaPlanError("Saga configuration must be a YAML mapping")
+
+    raw_steps = config.get("executions") or []
+    # Bare paths in conditions may name any step of the saga, not only earlier ones
+    roots = SCOPE_ROOTS | {
+        str(raw["name"]) for raw in raw_steps if isinstance(raw, dict) and "name" in raw
+    }
+    steps = [_compile_step(raw, roots) for raw in raw_steps]
+
+    names = [step.name for step in steps]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise SagaPlanError(f"Duplicate step names: {', '.join(sorted(duplicates))}")
+
+    saga_config = config.get("saga_config") or {}
+
+    execution_mode = saga_config.get("execution_mode", "sequential")
+    if execution_mode not in EXECUTION_MODES:
+        raise SagaPlanError(f"Unknown execution_mode: {execution_mode}")
+    steps = _resolve_dependencies(steps, execution_mode)
+
+    max_concurrency = saga_config.get("max_concurrency", settings.SAGA_MAX_CONCURRENCY)
+    if not isinstance(max_concurrency, int) or max_concurrency < 1:
+        raise SagaPlanError("max_concurrency must be a positive integer")
+
+    rollback_strategy = saga_config.get("rollback_strategy", "sequential")
+    if rollback_strategy not in ROLLBACK_STRATEGIES:
+        raise SagaPlanError(f"Unknown rollback_strategy: {rollback_strategy}")
+
+    rollback_concurrency = saga_config.get("rollback_concurrency")
+    if rollback_concurrency is not None and (
+        not isinstance(rollback_concurrency, int) or rollback_concurrency < 1
+    ):
+        raise SagaPlanError("rollback_concurrency must be a positive integer")
+
+    journal_flush = saga_config.get("journal_flush")
+    if journal_flush is not None and journal_flush not in [mode.value for mode in FlushMode]:
+        raise SagaPlanError(f"Unknown journal_flush mode: {journal_flush}")
+
+    recovery = saga_config.get("recovery", "resume")
+    if recovery not in RECOVERY_POLICIES:
+        raise SagaPlanError(f"Unknown recovery policy: {recovery}")
+
+    payloads = _compile_payloads("saga_config", saga_config.get("payload_storage")) or FULL_PAYLOADS
+    for step in steps:
+        if step.payloads is None:
+            step.payloads = payloads
+
+    output = _compile_output(config.get("output"))
+    _resolve_consumers(steps, output)
+
+    return SagaPlan(
+        steps=steps,
+        execution_mode=execution_mode,
+        max_concurrency=max_concurrency if execution_mode == "dag" else 1,
+        rollback_strategy=rollback_strategy,
+        rollback_concurrency=rollback_concurrency,
+        global_timeout=parse_duration(saga_config.get("global_timeout"), "global_timeout"),
+        journal_flush=journal_flush,
+        recovery=recovery,
+        trigger=_compile_trigger(config.get("trigger")),
+        payloads=payloads,
+        output=output,
+        raw=config,
+    )
@@ -0,0 +1,250 @@
+import asyncio
+import enum
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import SagaExecution, SagaExecutionStep, SagaExecutionStepStatus, SagaStepPayload
+from app.services.events import event_bus, step_event
+from app.services.leases import LeaseLostError
+from app.services.payloads import FULL_PAYLOADS, PAYLOAD_COLUMNS, PayloadPolicy, store
+
+logger = logging.getLogger(__name__)
+
+
+class FlushMode(str, enum.Enum):
+    STEP = "step"
+    SAGA = "saga"
+    INTERVAL = "interval"
+
+
+# Columns written by the journal; the id is assigned on first insert
+STEP_COLUMNS = (
+    "saga_execution_id",
+    "execution_started_at",
+    "step_name",
+    "step_type",
+    "status",
+    "request_data",
+    "response_data",
+    "error_message",
+    "started_at",
+    "completed_at",
+    "rollback_started_at",
+    "rollback_completed_at",
+    "rollback_error",
+    "attempts",
+)
+
+
+class StepJournal:
+    """Write-behind journal that buffers step transitions and persists them in batches
+
+    Step records are kept in memory (never attached to the session) and are written
+    with multi-row INSERT / executemany UPDATE statements at durability points:
+
+    - step: after every step and compensation
+    - saga: only when the saga finishes
+    - interval: at the first durability point after the flush interval elapsed
+
+    When given an execution, every flush also stores the saga context as its
+    context_snapshot, in the same transaction as the step records, so that a
+    recovered execution resumes with exactly the outputs of its completed steps.
+
+    Request and response payloads are stored per the step's payload policy; large
+    ones are compressed into saga_step_payloads, in the same transaction.
+
+    With a lease_owner, that update is fenced on the execution's lease: a flush made
+    after another process took the execution over is rolled back with LeaseLostError.
+    The flush of a finished execution also releases its lease.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        flush_mode: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        execution: Optional[SagaExecution] = None,
+        context: Optional[Dict[str, Any]] = None,
+        payload_policies: Optional[Dict[str, PayloadPolicy]] = None,
+        lease_owner: Optional[str] = None
+    ):
+        self.db = db
+        self.execution = execution
+        self.lease_owner = lease_owner
+        # Set once a fenced flush failed: the session was rolled back and nothing more is written
+        self._lease_lost: Optional[LeaseLostError] = None
+        # Set to None once the snapshot is no longer needed (saga finished)
+        self.context = context
+        self.flush_mode = FlushMode(flush_mode or settings.STEP_JOURNAL_FLUSH_MODE)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else settings.STEP_JOURNAL_FLUSH_INTERVAL
+        )
+        self.payload_policies = payload_policies or {}
+        self._new: List[SagaExecutionStep] = []
+        # (id(step), kind) -> (payload, its inline value): payloads are only encoded when replaced
+        self._stored: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+        self._dirty: Dict[int, SagaExecutionStep] = {}
+        self._lock = asyncio.Lock()
+        self._last_flush = time.monotonic()
+        self.flushes = 0
+
+    def begin_step(
+        self,
+        execution: SagaExecution,
+        step_name: str,
+        step_type: str
+    ) -> SagaExecutionStep:
+        """Create a RUNNING step record, persisted on the next flush"""
+        step = SagaExecutionStep(
+            saga_execution_id=execution.id,
+            execution_started_at=execution.started_at,
+            step_name=step_name,
+            step_type=step_type,
+            status=SagaExecutionStepStatus.RUNNING,
+            started_at=datetime.utcnow()
+        )
+        self._new.append(step)
+        event_bus.publish(step_event(step))
+        return step
+
+    def record(self, step: SagaExecutionStep):
+        """Mark a step as changed since the last flush and publish the transition"""
+        self._dirty[id(step)] = step
+        event_bus.publish(step_event(step))
+
+    async def checkpoint(self):
+        """Durability point reached; flush if the configured mode asks for it"""
+        if self.flush_mode == FlushMode.STEP:
+            await self.flush()
+        elif self.flush_mode == FlushMode.INTERVAL:
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                await self.flush()
+
+    def _snapshot(
+        self,
+        step: SagaExecutionStep,
+        offloaded: Dict[Tuple[int, str], Tuple]
+    ) -> Dict[str, Any]:
+        """Column values of a step, with its payloads stored per policy (compressed ones go to `offloaded`)"""
+        row = {column: getattr(step, column) for column in STEP_COLUMNS}
+        policy = self.payload_policies.get(step.step_name, FULL_PAYLOADS)
+        for kind, column in PAYLOAD_COLUMNS.items():
+            payload = row[column]
+            stored = self._stored.get((id(step), kind))
+            if stored is not None and stored[0] is payload:
+                row[column] = stored[1]
+                continue
+            inline, compressed = store(policy, payload)
+            if compressed is not None:
+                offloaded[(id(step), kind)] = (step, kind, *compressed)
+            self._stored[(id(step), kind)] = (payload, inline)
+            row[column] = inline
+        return row
+
+    async def _write_payloads(self, offloaded: Dict[Tuple[int, str], Tuple]):
+        rows = [
+            {
+                "step_id": step.id,
+                "kind": kind,
+                "execution_started_at": step.execution_started_at,
+                "saga_execution_id": step.saga_execution_id,
+                "encoding": encoding,
+                "size": size,
+                "data": data,
+            }
+            for step, kind, encoding, size, data in offloaded.values()
+        ]
+        statement = pg_insert(SagaStepPayload).values(rows)
+        await self.db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["step_id", "kind", "execution_started_at"],
+                set_={
+                    "encoding": statement.excluded.encoding,
+                    "size": statement.excluded.size,
+                    "data": statement.excluded.data,
+                }
+            )
+        )
+
+    async def flush(self):
+        """Persist buffered transitions, plus pending execution changes, in one commit
+
+        Shielded so that cancelling a step task cannot interrupt a commit halfway.
+        A cancelled caller still waits for the flush to end before the cancellation
+        propagates, as the session must not be used by anyone else meanwhile.
+        """
+        flush = asyncio.ensure_future(self._flush())
+        try:
+            await asyncio.shield(flush)
+        except asyncio.CancelledError:
+            while not flush.done():
+                try:
+                    await asyncio.wait([flush])
+                except asyncio.CancelledError:
+                    pass
+            if not flush.cancelled() and flush.exception() is not None:
+                logger.warning("Journal flush failed during cancellation: %s", flush.exception())
+            raise
+
+    async def _flush(self):
+        async with self._lock:
+            if self._lease_lost is not None:
+                raise self._lease_lost
+            # Snapshot synchronously so transitions recorded while awaiting land in the next flush
+            new_steps, self._new = self._new, []
+            # Steps never inserted are written with their latest state by the INSERT below
+            dirty_steps = [step for step in self._dirty.values() if step.id is not None]
+            self._dirty.clear()
+            offloaded: Dict[Tuple[int, str], Tuple] = {}
+            inserts = [self._snapshot(step, offloaded) for step in new_steps]
+            updates = [{"id": step.id, **self._snapshot(step, offloaded)} for step in dirty_steps]
+            context = dict(self.context) if self.context is not None else None
+
+            if inserts:
+                result = await self.db.execute(
+                    insert(SagaExecutionStep).returning(
+                        SagaExecutionStep.id, sort_by_parameter_order=True
+                    ),
+                    inserts
+                )
+                for step, step_id in zip(new_steps, result.scalars().all(), strict=True):
+                    step.id = step_id
+            if updates:
+                # Bulk UPDATE by the full primary key (id, execution_started_at), pruned to one partition
+                await self.db.execute(update(SagaExecutionStep), updates)
+            if offloaded:
+                # After the INSERT above, which assigned the ids of new steps
+                await self._write_payloads(offloaded)
+            if self.execution is not None:
+                execution_id = self.execution.id
+                statement = update(SagaExecution).where(
+                    SagaExecution.id == execution_id,
+                    SagaExecution.started_at == self.execution.started_at
+                )
+                values: Dict[str, Any] = {"context_snapshot": context}
+                if self.lease_owner is not None:
+                    statement = statement.where(SagaExecution.lease_owner == self.lease_owner)
+                    if self.execution.completed_at is not None:
+                        values.update(lease_owner=None, lease_expires_at=None)
+                result = await self.db.execute(
+                    statement
+                    .values(**values)
+                    .returning(SagaExecution.id)
+                    .execution_options(synchronize_session=False)
+                )
+                if self.lease_owner is not None and result.scalar_one_or_none() is None:
+                    self._lease_lost = LeaseLostError(
+                        f"Execution {execution_id} was taken over by another process"
+                    )
+                    await self.db.rollback()
+                    raise self._lease_lost
+
+            await self.db.commit()
+            self._last_flush = time.monotonic()
+            self.flushes += 1
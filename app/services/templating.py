@@ -0,0 +1,157 @@
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, FrozenSet, List, Tuple, Union
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\$\{([^}]+)\}')
+SINGLE_PLACEHOLDER_PATTERN = re.compile(r'^\$\{([^}]+)\}$')
+
+_MISSING = object()
+
+
+class Template(ABC):
+    """Precompiled value that can be rendered against a saga context"""
+
+    is_constant = False
+    # Root names (first path segment) of every reference in the template
+    references: FrozenSet[str] = frozenset()
+    # Full dotted paths of every reference, split into their segments
+    paths: FrozenSet[Tuple[str, ...]] = frozenset()
+
+    @abstractmethod
+    def render(self, context: Dict[str, Any]) -> Any:
+        """Value of the template for a context"""
+
+
+class Constant(Template):
+    """Subtree without placeholders; rendered as the very same object"""
+
+    is_constant = True
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, context: Dict[str, Any]) -> Any:
+        return self.value
+
+
+class Reference(Template):
+    """Whole-value `${path}` reference, resolved without stringification"""
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.parts: Tuple[str, ...] = tuple(path.split('.'))
+        self.source = source
+        self.references = frozenset([self.parts[0]])
+        self.paths = frozenset([self.parts])
+
+    def resolve(self, context: Dict[str, Any]) -> Any:
+        """Walk the context along the dotted path, or return _MISSING"""
+        if self.path == "current_timestamp":
+            return datetime.utcnow().isoformat()
+
+        current: Any = context
+        for part in self.parts:
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                return _MISSING
+        return current
+
+    def render(self, context: Dict[str, Any]) -> Any:
+        value = self.resolve(context)
+        # Unresolved references are kept verbatim
+        return self.source if value is _MISSING else value
+
+
+class Interpolation(Template):
+    """String mixing literal text and `${path}` references"""
+
+    def __init__(self, parts: List[Union[str, Reference]]):
+        self.parts = parts
+        self.references = frozenset(
+            part.parts[0] for part in parts if isinstance(part, Reference)
+        )
+        self.paths = frozenset(part.parts for part in parts if isinstance(part, Reference))
+
+    def render(self, context: Dict[str, Any]) -> str:
+        chunks = []
+        for part in self.parts:
+            if isinstance(part, str):
+                chunks.append(part)
+                continue
+            value = part.resolve(context)
+            chunks.append(part.source if value is _MISSING else str(value))
+        return "".join(chunks)
+
+
+class DictTemplate(Template):
+    """Mapping with at least one templated value; constant values are shared"""
+
+    def __init__(self, items: List[Tuple[Any, Template]]):
+        self.items = items
+        self.references = frozenset().union(*(template.references for _, template in items))
+        self.paths = frozenset().union(*(template.paths for _, template in items))
+
+    def render(self, context: Dict[str, Any]) -> Dict[Any, Any]:
+        return {key: template.render(context) for key, template in self.items}
+
+
+class ListTemplate(Template):
+    """Sequence with at least one templated item; constant items are shared"""
+
+    def __init__(self, items: List[Template]):
+        self.items = items
+        self.references = frozenset().union(*(template.references for template in items))
+        self.paths = frozenset().union(*(template.paths for template in items))
+
+    def render(self, context: Dict[str, Any]) -> List[Any]:
+        return [template.render(context) for template in self.items]
+
+
+def _compile_string(value: str) -> Template:
+    single_match = SINGLE_PLACEHOLDER_PATTERN.match(value)
+    if single_match:
+        return Reference(single_match.group(1), value)
+
+    parts: List[Union[str, Reference]] = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(value):
+        if match.start() > position:
+            parts.append(value[position:match.start()])
+        parts.append(Reference(match.group(1), match.group(0)))
+        position = match.end()
+
+    if not parts:
+        return Constant(value)
+    if position < len(value):
+        parts.append(value[position:])
+    return Interpolation(parts)
+
+
+def compile_template(value: Any) -> Template:
+    """Compile a YAML value into a tree of precompiled accessors"""
+    if isinstance(value, str):
+        return _compile_string(value)
+
+    if isinstance(value, dict):
+        items = [(key, compile_template(item)) for key, item in value.items()]
+        if all(template.is_constant for _, template in items):
+            return Constant(value)
+        return DictTemplate(items)
+
+    if isinstance(value, list):
+        items = [compile_template(item) for item in value]
+        if all(template.is_constant for template in items):
+            return Constant(value)
+        return ListTemplate(items)
+
+    return Constant(value)
+
+
+def compile_path(path: str) -> Template:
+    """Compile a dotted path, with or without the `${...}` wrapper"""
+    if not path.startswith("${"):
+        path = "${" + path + "}"
+    return compile_template(path)
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import SagaExecution, SagaExecutionStatus
+from app.services.events import event_bus
+from app.services.http_client import http_client
+from app.services.kafka_producer import kafka_producer
+from app.services.kafka_replies import kafka_replies
+from app.services.leases import lease_keeper
+from app.services.recovery import recovery_sweeper
+from app.services.worker_pool import run_pending_execution, worker_pool
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresWorkQueue:
+    """Durable queue made of the PENDING rows of saga_executions
+
+    Workers claim batches with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+    claimers never block on or double-claim the same rows, and hold a lease that
+    the process LeaseKeeper renews while they run. A claimed execution whose lease
+    expires before it starts becomes claimable again.
+    """
+
+    def __init__(self, max_depth: Optional[int] = None):
+        self.max_depth = max_depth or settings.WORKER_QUEUE_SIZE
+
+    async def is_full(self, db: AsyncSession) -> bool:
+        pending = await db.scalar(
+            select(func.count())
+            .select_from(SagaExecution)
+            .where(SagaExecution.status == SagaExecutionStatus.PENDING)
+        )
+        return pending >= self.max_depth
+
+    def submit(self, execution_id: int):
+        """Nothing to enqueue: the committed PENDING row is the queue entry"""
+
+    async def claim(self, db: AsyncSession, limit: int) -> List[int]:
+        """Lease up to `limit` unclaimed PENDING executions to this process, oldest first"""
+        candidates = (
+            select(SagaExecution.id)
+            .where(
+                SagaExecution.status == SagaExecutionStatus.PENDING,
+                or_(
+                    SagaExecution.lease_expires_at.is_(None),
+                    SagaExecution.lease_expires_at < func.now()
+                )
+            )
+            .order_by(SagaExecution.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(SagaExecution)
+            .where(SagaExecution.id.in_(candidates.scalar_subquery()))
+            .values(lease_owner=lease_keeper.owner, lease_expires_at=lease_keeper.expiry())
+            .returning(SagaExecution.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = sorted(result.scalars().all())
+        await db.commit()
+        lease_keeper.track(claimed)
+        return claimed
+
+
+postgres_queue = PostgresWorkQueue()
+
+
+def get_work_queue():
+    """Queue that submitted executions are handed to, per WORKER_QUEUE_BACKEND"""
+    if settings.WORKER_QUEUE_BACKEND == "postgres":
+        return postgres_queue
+    return worker_pool
+
+
+class SagaWorker:
+    """Worker process claiming executions from the Postgres queue and running them
+
+    The worker also runs the recovery sweeper, so executions orphaned by a dead
+    worker are resumed by the surviving ones.
+    """
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        lease_duration: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        queue: Optional[PostgresWorkQueue] = None
+    ):
+        # Leases taken by this process are owned by the worker id
+        if worker_id:
+            lease_keeper.owner = worker_id
+        if lease_duration:
+            lease_keeper.duration = lease_duration
+        self.worker_id = lease_keeper.owner
+        self.concurrency = concurrency or settings.WORKER_POOL_SIZE
+        self.batch_size = batch_size or settings.WORKER_CLAIM_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL
+        self.queue = queue or postgres_queue
+        self.sweeper = recovery_sweeper
+        self._running: Dict[int, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self):
+        """Stop claiming; running executions are given WORKER_SHUTDOWN_TIMEOUT to finish"""
+        self._stopping.set()
+
+    async def run(self):
+        """Claim and run executions until stopped"""
+        await http_client.start()
+        await lease_keeper.start()
+        # Progress is only published from here; API processes deliver it to clients
+        await event_bus.start(listen=False)
+        if settings.RECOVERY_ENABLED:
+            await self.sweeper.start()
+        logger.info(
+            "Worker %s started (concurrency=%d, batch=%d)",
+            self.worker_id, self.concurrency, self.batch_size
+        )
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._running)
+                if free <= 0:
+                    await self._wait_for_slot()
+                    continue
+
+                wanted = min(free, self.batch_size)
+                claimed = await self._claim(wanted)
+                for execution_id in claimed:
+                    self._running[execution_id] = asyncio.create_task(
+                        self._execute(execution_id)
+                    )
+                if len(claimed) < wanted:
+                    # Queue drained (or unreachable): wait before polling again
+                    await self._idle()
+        finally:
+            await self.sweeper.stop()
+            await self._drain()
+            await lease_keeper.stop()
+            await event_bus.stop()
+            await http_client.close()
+            await kafka_producer.close()
+            await kafka_replies.close()
+            logger.info("Worker %s stopped", self.worker_id)
+
+    async def _wait_for_slot(self):
+        """Wait until an execution finishes or the worker is stopped"""
+        stopping = asyncio.create_task(self._stopping.wait())
+        try:
+            await asyncio.wait(
+                [*self._running.values(), stopping], return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            stopping.cancel()
+
+    async def _idle(self):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+        except TimeoutError:
+            pass
+
+    async def _claim(self, limit: int) -> List[int]:
+        try:
+            async with AsyncSessionLocal() as db:
+                return await self.queue.claim(db, limit)
+        except Exception:
+            logger.exception("Worker %s could not claim executions", self.worker_id)
+            return []
+
+    async def _execute(self, execution_id: int):
+        try:
+            await run_pending_execution(execution_id)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Execution %s failed in worker %s", execution_id, self.worker_id)
+        finally:
+            self._running.pop(execution_id, None)
+
+    async def _drain(self):
+        if not self._running:
+            return
+        tasks = list(self._running.values())
+        _, pending = await asyncio.wait(tasks, timeout=settings.WORKER_SHUTDOWN_TIMEOUT)
+        # Cancelled executions keep their lease until it expires and they are recovered
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
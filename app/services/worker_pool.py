@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import SagaConfiguration, SagaExecution, SagaExecutionStatus
+from app.services.leases import lease_keeper
+from app.services.saga_executor import SagaExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when an execution is submitted while the worker queue is at capacity"""
+
+
+def _unleased():
+    """Criteria of PENDING executions that no live process has taken yet"""
+    return (
+        SagaExecution.status == SagaExecutionStatus.PENDING,
+        or_(
+            SagaExecution.lease_owner.is_(None),
+            SagaExecution.lease_owner == lease_keeper.owner,
+            SagaExecution.lease_expires_at < func.now()
+        )
+    )
+
+
+async def take_pending(db: AsyncSession, execution_id: int) -> bool:
+    """Lease a PENDING execution to this process, unless another live process holds it
+
+    The same execution may be queued by several processes (see SagaWorkerPool.start);
+    only the one that takes it runs it.
+    """
+    result = await db.execute(
+        update(SagaExecution)
+        .where(SagaExecution.id == execution_id, *_unleased())
+        .values(lease_owner=lease_keeper.owner, lease_expires_at=lease_keeper.expiry())
+        .returning(SagaExecution.id)
+        .execution_options(synchronize_session=False)
+    )
+    taken = result.scalar_one_or_none() is not None
+    await db.commit()
+    if taken:
+        lease_keeper.track([execution_id])
+    return taken
+
+
+async def run_pending_execution(execution_id: int):
+    """Run a PENDING execution to completion in its own session"""
+    async with AsyncSessionLocal() as db:
+        if not await take_pending(db, execution_id):
+            lease_keeper.untrack(execution_id)
+            return
+        execution = await db.get(SagaExecution, execution_id)
+        if execution is None or execution.status != SagaExecutionStatus.PENDING:
+            lease_keeper.untrack(execution_id)
+            return
+        saga_config = await db.get(SagaConfiguration, execution.saga_configuration_id)
+        await SagaExecutor(db).run_execution(saga_config, execution)
+
+
+class SagaWorkerPool:
+    """Bounded in-process queue of submitted executions consumed by asyncio workers"""
+
+    def __init__(self, size: Optional[int] = None, queue_size: Optional[int] = None):
+        self.size = size or settings.WORKER_POOL_SIZE
+        self.queue_size = queue_size or settings.WORKER_QUEUE_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._busy: Set[int] = set()
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        """Start the workers (called on application startup)
+
+        PENDING executions left behind by a stopped or crashed process are queued
+        again, oldest first, up to the queue size.
+        """
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"saga-worker-{index}")
+            for index in range(self.size)
+        ]
+        await self._requeue_pending()
+
+    async def _requeue_pending(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(SagaExecution.id)
+                    .where(*_unleased())
+                    .order_by(SagaExecution.id)
+                    .limit(self.queue_size)
+                )
+                execution_ids = result.scalars().all()
+        except Exception:
+            logger.exception("Could not load the pending executions to queue again")
+            return
+        for execution_id in execution_ids:
+            self._queue.put_nowait(execution_id)
+        if execution_ids:
+            logger.info("Queued %d pending executions again", len(execution_ids))
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stop accepting work, let running executions finish, then cancel the workers
+
+        Executions still queued stay PENDING in the database and are queued again
+        by the next pool that starts.
+        """
+        if not self.started:
+            return
+        workers, self._workers = self._workers, []
+        queued = self._queue.qsize()
+        # Drop queued work so that idle workers do not pick up anything new
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        if queued:
+            logger.warning("Worker pool stopped with %d queued executions left pending", queued)
+
+        timeout = timeout if timeout is not None else settings.WORKER_SHUTDOWN_TIMEOUT
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._busy and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+
+    async def is_full(self, db: AsyncSession) -> bool:
+        return self._queue is not None and self._queue.full()
+
+    def submit(self, execution_id: int):
+        """Queue a persisted PENDING execution, or raise QueueFullError"""
+        if self._queue is None:
+            raise RuntimeError("Worker pool is not started")
+        try:
+            self._queue.put_nowait(execution_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Worker queue is full ({self.queue_size} executions)")
+
+    async def _work(self):
+        queue = self._queue
+        while True:
+            execution_id = await queue.get()
+            self._busy.add(execution_id)
+            try:
+                await run_pending_execution(execution_id)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Background execution %s failed", execution_id)
+            finally:
+                self._busy.discard(execution_id)
+                queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "workers": self.size,
+            "busy": len(self._busy),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "processed": self.processed,
+            "failed": self.failed,
+        }
+
+
+worker_pool = SagaWorkerPool()
@@ -0,0 +1,147 @@
+import types
+
+import httpx
+import pytest
+
+from app.models import SagaExecution, SagaExecutionStatus
+from app.services import circuit_breaker, idempotency, retry, saga_executor
+from app.services.saga_executor import SagaExecutor
+from app.services.step_journal import StepJournal
+
+
+# Modules whose time.monotonic the `clock` fixture replaces
+CLOCKED_MODULES = (circuit_breaker, idempotency, retry)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a test sets `now`"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    for module in CLOCKED_MODULES:
+        monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=clock))
+    return clock
+
+
+class FakeHttpClient:
+    """Stands in for the shared HTTP client, answering requests by method and URL
+
+    Handlers are async callables receiving the JSON body; unrouted requests get an
+    empty 200 response.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.requests = []
+
+    def host_key(self, url):
+        return httpx.URL(url).host
+
+    def on(self, method, url, handler):
+        self.handlers[(method, url)] = handler
+
+    async def request(self, method, url, headers=None, json=None, timeout=None):
+        self.requests.append((method, url))
+        handler = self.handlers.get((method, url))
+        if handler is None:
+            return httpx.Response(200, json={})
+        return await handler(json)
+
+
+@pytest.fixture
+def http(monkeypatch):
+    client = FakeHttpClient()
+    monkeypatch.setattr(saga_executor, "http_client", client)
+    return client
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0] if self._rows else None
+
+
+class FakeSession:
+    """Session double on which every statement succeeds, matching one row per parameter set"""
+
+    def __init__(self):
+        self.commits = 0
+        self.statements = []
+        # Returned by SELECT statements
+        self.rows = []
+
+    async def execute(self, statement, parameters=None):
+        self.statements.append(statement)
+        if statement.is_select:
+            return FakeResult(self.rows)
+        return FakeResult(list(range(1, len(parameters) + 1)) if parameters else [1])
+
+    def expunge(self, instance):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, instance):
+        pass
+
+
+class SagaRun:
+    """Outcome of a saga driven by run_saga: the execution, its context and steps by name"""
+
+    def __init__(self, executor, execution, context, steps):
+        self.executor = executor
+        self.execution = execution
+        self.context = context
+        self.steps = steps
+
+
+@pytest.fixture
+def db():
+    return FakeSession()
+
+
+@pytest.fixture
+def run_saga(http, db):
+    """Drive a compiled plan through the executor, over the `db` session and the fake HTTP client"""
+    async def run(plan, input_data=None):
+        executor = SagaExecutor(db)
+        executor.journal = StepJournal(executor.db, flush_mode="saga")
+        steps = {}
+        begin_step = executor.journal.begin_step
+
+        def record_step(execution, step_name, step_type):
+            steps[step_name] = begin_step(execution, step_name, step_type)
+            return steps[step_name]
+
+        executor.journal.begin_step = record_step
+        execution = SagaExecution(
+            id=1,
+            correlation_id="c1",
+            status=SagaExecutionStatus.RUNNING,
+            input_data=input_data or {}
+        )
+        context = {"webhook": {"correlation_id": "c1", **execution.input_data}}
+        await executor._drive(plan, execution, context, {})
+        return SagaRun(executor, execution, context, steps)
+
+    return run
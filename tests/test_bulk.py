@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from app.services.bulk import BulkInputError, iter_json_values, run_bulk
+
+
+async def chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(*chunks, max_item_bytes=None):
+    return [value async for value in iter_json_values(chunked(*chunks), max_item_bytes)]
+
+
+async def items(*values):
+    for value in values:
+        yield value
+
+
+class TestIterJsonValues:
+    async def test_json_array(self):
+        assert await collect(b'[{"a": 1}, {"a": 2}, 3]') == [{"a": 1}, {"a": 2}, 3]
+
+    async def test_ndjson(self):
+        assert await collect(b'{"a": 1}\n{"a": 2}\n\n"x"\n') == [{"a": 1}, {"a": 2}, "x"]
+
+    async def test_empty_bodies(self):
+        assert await collect(b"") == []
+        assert await collect(b" [ ] ") == []
+
+    async def test_items_split_across_chunks(self):
+        body = b'[{"name": "caf\xc3\xa9"}, 12345, true]'
+        chunks = [body[index:index + 3] for index in range(0, len(body), 3)]
+
+        assert await collect(*chunks) == [{"name": "café"}, 12345, True]
+
+    async def test_number_cut_at_a_chunk_boundary(self):
+        assert await collect(b"12", b"34\n5") == [1234, 5]
+
+    async def test_values_are_yielded_before_the_body_ends(self):
+        arrived = asyncio.Event()
+
+        async def slow():
+            yield b'{"a": 1}\n'
+            await arrived.wait()
+            yield b'{"a": 2}\n'
+
+        values = iter_json_values(slow())
+        assert await values.__anext__() == {"a": 1}
+        arrived.set()
+        assert await values.__anext__() == {"a": 2}
+
+    async def test_content_after_the_array_is_ignored(self):
+        assert await collect(b"[1, 2] trailing") == [1, 2]
+
+    @pytest.mark.parametrize("body, message", [
+        (b"[1, 2", "Unterminated JSON array"),
+        (b"[1, 2,]", "Trailing ','"),
+        (b"[1 2]", "Expected ',' or ']'"),
+        (b'{"a": }', "Invalid JSON item"),
+        (b"\xff", "not valid UTF-8"),
+    ])
+    async def test_malformed_bodies(self, body, message):
+        with pytest.raises(BulkInputError, match=message):
+            await collect(body)
+
+    async def test_items_larger_than_the_limit_are_rejected(self):
+        with pytest.raises(BulkInputError, match="Invalid JSON item"):
+            await collect(b'{"a": "', b"x" * 20, b'"}', max_item_bytes=10)
+
+
+class TestRunBulk:
+    async def test_runs_every_item_with_bounded_concurrency(self):
+        in_flight = peak = 0
+
+        async def run(index, item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"index": index, "item": item}
+
+        results = [result async for result in run_bulk(items(*"abcde"), run, 2)]
+
+        assert sorted((result["index"], result["item"]) for result in results) == list(
+            enumerate("abcde")
+        )
+        assert peak == 2
+
+    async def test_input_error_is_yielded_last(self):
+        async def run(index, item):
+            return {"index": index}
+
+        results = [
+            result async for result in run_bulk(iter_json_values(chunked(b"[1, 2 x")), run, 4)
+        ]
+
+        assert results[-1]["index"] == 2
+        assert "Expected ','" in results[-1]["error"]
+        assert sorted(result["index"] for result in results[:-1]) == [0, 1]
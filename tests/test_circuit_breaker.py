@@ -0,0 +1,105 @@
+import pytest
+
+from app.services.circuit_breaker import (
+    BreakerPolicy,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+def make_breaker(failure_threshold=3, reset_timeout=10, half_open_max_calls=1):
+    return CircuitBreaker("orders", BreakerPolicy(
+        failure_threshold=failure_threshold,
+        reset_timeout=reset_timeout,
+        half_open_max_calls=half_open_max_calls,
+    ))
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        breaker.acquire()
+        breaker.release(False)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 2)
+        assert breaker.state == CircuitState.CLOSED
+
+        fail(breaker)
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError) as error:
+            breaker.acquire()
+        assert error.value.retry_in == 10
+        assert breaker.stats()["rejected"] == 1
+
+    def test_success_resets_the_failure_count(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 2)
+        breaker.acquire()
+        breaker.release(True)
+        fail(breaker, 2)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_admits_a_limited_number_of_probes(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 3)
+        clock.now += 10
+
+        breaker.acquire()
+        assert breaker.state == CircuitState.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.acquire()
+
+    def test_successful_probe_closes(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 3)
+        clock.now += 10
+
+        breaker.acquire()
+        breaker.release(True)
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()["retry_in"] is None
+
+    def test_failed_probe_opens_again(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 3)
+        clock.now += 10
+
+        fail(breaker)
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.stats()["retry_in"] == 10
+
+    def test_abandoned_probe_frees_its_slot(self, clock):
+        breaker = make_breaker()
+        fail(breaker, 3)
+        clock.now += 10
+
+        breaker.acquire()
+        breaker.release(None)
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.acquire()
+
+
+class TestCircuitBreakers:
+    def test_breakers_are_shared_by_name_and_follow_the_latest_policy(self):
+        breakers = CircuitBreakers()
+        first = breakers.get("orders", BreakerPolicy(failure_threshold=3))
+        second = breakers.get("orders", BreakerPolicy(failure_threshold=5))
+
+        assert first is second
+        assert second.policy.failure_threshold == 5
+        assert set(breakers.stats()) == {"orders"}
+
+    def test_reset_forgets_a_breaker(self):
+        breakers = CircuitBreakers()
+        breaker = breakers.get("orders", BreakerPolicy(failure_threshold=1))
+        fail(breaker)
+
+        assert breakers.reset("orders")
+        assert not breakers.reset("orders")
+        assert breakers.get("orders", BreakerPolicy()).state == CircuitState.CLOSED
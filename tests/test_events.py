@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from app.services.events import ExecutionEventBus
+
+
+def event(execution_id, status="running"):
+    return {"event": "execution", "execution_id": execution_id, "status": status}
+
+
+async def test_events_reach_the_subscribers_of_their_execution():
+    bus = ExecutionEventBus(channel="events", queue_size=10)
+
+    async with bus.subscribe(1) as first, bus.subscribe(1) as second, bus.subscribe(2) as other:
+        bus.publish(event(1))
+
+        assert first.get_nowait() == event(1)
+        assert second.get_nowait() == event(1)
+        assert other.empty()
+        assert bus.stats()["subscribers"] == 3
+
+    assert bus.stats()["subscribers"] == 0
+    assert bus.stats()["published"] == 1
+
+
+async def test_slow_subscriber_drops_its_oldest_events():
+    bus = ExecutionEventBus(channel="events", queue_size=2)
+
+    async with bus.subscribe(1) as queue:
+        for status in ("running", "compensating", "rolled_back"):
+            bus.publish(event(1, status))
+
+        assert [queue.get_nowait()["status"] for _ in range(2)] == ["compensating", "rolled_back"]
+    assert bus.dropped == 1
+
+
+async def test_full_outbox_drops_events_without_blocking():
+    bus = ExecutionEventBus(channel="events", queue_size=10)
+    bus._outbox = asyncio.Queue(maxsize=1)
+
+    bus.publish(event(1))
+    bus.publish(event(1, "completed"))
+
+    assert bus._outbox.qsize() == 1
+    assert bus.dropped == 1
+
+
+async def test_notifications_from_other_processes_are_delivered():
+    bus = ExecutionEventBus(channel="events", queue_size=10)
+
+    async with bus.subscribe(1) as queue:
+        bus._on_notify(None, 0, "events", json.dumps({"origin": "other", "event": event(1)}))
+        # Sent by this process, which delivered it on publish already
+        bus._on_notify(None, 0, "events", json.dumps({"origin": bus.origin, "event": event(1)}))
+        bus._on_notify(None, 0, "events", "not json")
+
+        assert queue.get_nowait() == event(1)
+        assert queue.empty()
+    assert bus.received == 1
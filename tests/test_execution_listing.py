@@ -0,0 +1,152 @@
+import base64
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.saga_execution import _decode_cursor, _encode_cursor
+from app.core.database import get_async_db
+from app.main import app
+from app.models import (
+    SagaExecution,
+    SagaExecutionStatus,
+    SagaExecutionStep,
+    SagaExecutionStepStatus,
+)
+
+URL = "/api/v1/saga-executions/"
+
+
+@pytest.fixture
+def client(db):
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_async_db] = override
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_async_db)
+
+
+def execution(execution_id, started_at=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)):
+    return SagaExecution(
+        id=execution_id,
+        saga_configuration_id=1,
+        correlation_id=f"c{execution_id}",
+        status=SagaExecutionStatus.COMPLETED,
+        input_data={"order_id": execution_id},
+        output_data={"done": True},
+        started_at=started_at,
+        steps=[]
+    )
+
+
+def encoded(value):
+    return base64.urlsafe_b64encode(value).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("started_at", [
+    datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2024, 5, 1, 12, 30),
+])
+def test_cursor_round_trip(started_at):
+    cursor = _encode_cursor(execution(42, started_at))
+
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == (started_at, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    "é",
+    encoded(b"not json"),
+    encoded(b"\xff\xfe"),
+    encoded(b"42"),
+    encoded(b'["2024-05-01T12:30:00"]'),
+    encoded(b'["yesterday", 42]'),
+    encoded(b'[null, 42]'),
+    encoded(b'["2024-05-01T12:30:00", "x"]'),
+    encoded(b'["2024-05-01T12:30:00", [42]]'),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        _decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_malformed_cursor_is_a_bad_request(client):
+    response = client.get(URL, params={"cursor": encoded(b'{"a": 1}')})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+def test_full_page_links_to_the_next_one(client, db):
+    db.rows = [execution(2), execution(1)]
+
+    response = client.get(URL, params={"limit": 2})
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [2, 1]
+    cursor = response.headers["X-Next-Cursor"]
+    assert _decode_cursor(cursor) == (db.rows[-1].started_at, 1)
+
+    client.get(URL, params={"limit": 2, "cursor": cursor})
+    query = db.statements[-1].compile()
+    assert "(saga_executions.started_at, saga_executions.id) < (" in str(query)
+    assert list(query.params.values())[:2] == [db.rows[-1].started_at, 1]
+
+
+def test_last_page_has_no_cursor(client, db):
+    db.rows = [execution(1)]
+
+    response = client.get(URL, params={"limit": 2})
+
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_summary_reads_and_returns_only_the_projected_columns(client, db):
+    listed = execution(1)
+    listed.context_snapshot = {"reserve": {"response": {}}}
+    listed.steps = [SagaExecutionStep(
+        id=3,
+        step_name="reserve",
+        step_type="api",
+        status=SagaExecutionStepStatus.COMPLETED,
+        request_data={"body": {}},
+        response_data={"status": 200},
+        attempts=[{"attempt": 1}],
+        started_at=listed.started_at
+    )]
+    db.rows = [listed]
+
+    response = client.get(URL + "summary")
+
+    assert response.status_code == 200
+    [summary] = response.json()
+    assert set(summary) == {
+        "id",
+        "saga_configuration_id",
+        "correlation_id",
+        "status",
+        "error_message",
+        "started_at",
+        "completed_at",
+        "steps",
+    }
+    assert set(summary["steps"][0]) == {
+        "id",
+        "step_name",
+        "step_type",
+        "status",
+        "error_message",
+        "started_at",
+        "completed_at",
+        "rollback_started_at",
+        "rollback_completed_at",
+        "rollback_error",
+    }
+    query = str(db.statements[-1].compile())
+    assert "saga_executions.status" in query
+    for column in ("input_data", "output_data", "context_snapshot"):
+        assert f"saga_executions.{column}" not in query
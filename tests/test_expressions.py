@@ -0,0 +1,75 @@
+import pytest
+
+from app.services.expressions import ExpressionError, compile_expression
+from app.services.saga_plan import compile_plan
+
+
+def response(status=200, **body):
+    return {"response": {"status": status, "body": body}}
+
+
+class TestExpressions:
+    @pytest.mark.parametrize("condition, scope, expected", [
+        ("response.status == 200", response(200), True),
+        ("response.status != 200", response(500), True),
+        ("response.status == 200 && response.body.valid == true", response(valid=True), True),
+        ("response.status == 200 || response.status == 201", response(201), True),
+        ("!(response.status >= 500)", response(503), False),
+        ("response.body.state in ['APPROVED', 'PENDING']", response(state="PENDING"), True),
+        ("response.body.code == 201", response(code="201"), True),
+        ("response.body.missing == null", response(), True),
+        ("${response.body.items.0} == 'a'", response(items=["a"]), True),
+    ])
+    def test_evaluates_conditions(self, condition, scope, expected):
+        assert compile_expression(condition).evaluate(scope) is expected
+
+    def test_short_circuits(self):
+        condition = compile_expression("response.status == 200 || response.body.missing.deep > 1")
+
+        assert condition.evaluate(response(200)) is True
+
+    def test_references_are_root_names(self):
+        condition = compile_expression("response.status == 200 && ${webhook.amount} > 10")
+
+        assert condition.references == {"response", "webhook"}
+
+    @pytest.mark.parametrize("condition", ["", "response.status ==", "(response.status == 200", "a # b"])
+    def test_rejects_malformed_conditions(self, condition):
+        with pytest.raises(ExpressionError):
+            compile_expression(condition)
+
+
+class TestBarewords:
+    """Unquoted words outside the known scopes compare as strings, as in the baseline"""
+
+    @pytest.mark.parametrize("condition, state, expected", [
+        ("response.body.status == APPROVED", "APPROVED", True),
+        ("response.body.status == APPROVED", "DENIED", False),
+        ("response.body.status != APPROVED", "DENIED", True),
+        ("response.body.status == order-approved", "order-approved", True),
+    ])
+    def test_bareword_is_a_string(self, condition, state, expected):
+        scope = {"response": {"body": {"status": state}}}
+        assert compile_expression(condition).evaluate(scope) is expected
+
+    def test_bareword_is_not_a_reference(self):
+        assert compile_expression("response.body.status == APPROVED").references == {"response"}
+
+    def test_step_names_resolve_as_paths_in_plans(self):
+        plan = compile_plan("""
+saga_config: {execution_mode: dag}
+executions:
+  - name: check
+    type: api
+    endpoint: {url: "http://svc/check"}
+  - name: charge
+    type: api
+    endpoint: {url: "http://svc/charge"}
+    success:
+      condition: "response.status == 200 && check.response.body.ok == true"
+""")
+        charge = plan.steps[1]
+
+        assert charge.dependencies == {"check"}
+        scope = {**response(200), "check": response(ok=True)}
+        assert charge.success_condition.evaluate(scope) is True
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.services.http_client import HttpClientPool
+
+
+async def test_stats_count_in_flight_requests_per_host():
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(200 if request.url.path == "/ok" else 500)
+
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        calls = [
+            asyncio.create_task(pool.request("GET", "http://orders:8000/ok")),
+            asyncio.create_task(pool.request("GET", "http://orders:8000/ok")),
+            asyncio.create_task(pool.request("GET", "http://stock/fail")),
+        ]
+        await asyncio.sleep(0.01)
+
+        stats = pool.stats()
+        assert stats["in_flight"] == 3
+        assert stats["hosts"]["orders:8000"]["in_flight"] == 2
+        assert stats["hosts"]["orders:8000"]["free_slots"] == settings.HTTP_MAX_CONNECTIONS_PER_HOST - 2
+
+        release.set()
+        responses = await asyncio.gather(*calls)
+        assert [response.status_code for response in responses] == [200, 200, 500]
+
+        stats = pool.stats()
+        assert stats["in_flight"] == 0
+        assert stats["hosts"]["orders:8000"]["requests"] == 2
+        assert stats["hosts"]["stock"]["requests"] == 1
+    finally:
+        await pool.close()
+
+
+async def test_transport_errors_are_counted():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    pool = HttpClientPool()
+    pool._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    try:
+        try:
+            await pool.request("GET", "http://down/")
+        except httpx.ConnectError:
+            pass
+
+        assert pool.stats()["hosts"]["down"] == {
+            "requests": 1, "errors": 1, "in_flight": 0, "waiting": 0,
+            "free_slots": settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        }
+    finally:
+        await pool.close()
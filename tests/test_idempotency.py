@@ -0,0 +1,188 @@
+import asyncio
+import types
+
+import pytest
+
+from app.services import idempotency
+from app.services.idempotency import (
+    IdempotencyGuard,
+    IdempotencyKeyReused,
+    IdempotencyKeyTaken,
+    request_hash,
+)
+
+
+@pytest.fixture
+def stored_keys(monkeypatch):
+    """Keys in the database by scope, looked up in place of saga_idempotency_keys"""
+    keys = {}
+
+    async def find_key(db, scope):
+        return keys.get(scope)
+
+    monkeypatch.setattr(idempotency, "_find_key", find_key)
+    return keys
+
+
+def stored(input_data, execution_id):
+    return types.SimpleNamespace(request_hash=request_hash(input_data), execution_id=execution_id)
+
+
+class Submitter:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        result = self.results.pop(0)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+def test_request_hash_ignores_key_order():
+    assert request_hash({"a": 1, "b": [1, 2]}) == request_hash({"b": [1, 2], "a": 1})
+    assert request_hash({"a": 1}) != request_hash({"a": 2})
+
+
+class TestRunOnce:
+    async def test_first_submission_runs_and_replays_hit_the_cache(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        submit = Submitter(41)
+
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (41, False)
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (41, True)
+        assert submit.calls == 1
+        assert guard.stats()["hits"] == 1
+        assert guard.stats()["misses"] == 1
+
+    async def test_different_input_is_rejected(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        await guard.run_once(None, 1, "k", {"a": 1}, Submitter(41))
+
+        with pytest.raises(IdempotencyKeyReused):
+            await guard.run_once(None, 1, "k", {"a": 2}, Submitter(42))
+
+    async def test_keys_are_scoped_by_configuration(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        await guard.run_once(None, 1, "k", {"a": 1}, Submitter(41))
+
+        assert await guard.run_once(None, 2, "k", {"a": 2}, Submitter(42)) == (42, False)
+
+    async def test_key_stored_by_another_process_is_replayed(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        stored_keys[(1, "k")] = stored({"a": 1}, 41)
+        submit = Submitter(42)
+
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (41, True)
+        assert submit.calls == 0
+        with pytest.raises(IdempotencyKeyReused):
+            await IdempotencyGuard(10, 60).run_once(None, 1, "k", {"a": 2}, submit)
+
+    async def test_concurrent_duplicates_wait_for_the_submission_in_flight(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        submit = Submitter(41)
+        submit.release.clear()
+
+        first = asyncio.create_task(guard.run_once(None, 1, "k", {"a": 1}, submit))
+        await asyncio.sleep(0)
+        assert guard.stats()["in_flight"] == 1
+        second = asyncio.create_task(guard.run_once(None, 1, "k", {"a": 1}, submit))
+        await asyncio.sleep(0)
+        submit.release.set()
+
+        assert await asyncio.wait_for(first, 1) == (41, False)
+        assert await asyncio.wait_for(second, 1) == (41, True)
+        assert submit.calls == 1
+
+    async def test_failed_submission_is_not_cached(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        submit = Submitter(RuntimeError("db down"), 41)
+
+        with pytest.raises(RuntimeError):
+            await guard.run_once(None, 1, "k", {"a": 1}, submit)
+        assert guard.stats()["size"] == 0
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (41, False)
+
+    async def test_duplicate_of_a_failed_submission_retries(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        submit = Submitter(RuntimeError("db down"), 41)
+        submit.release.clear()
+
+        first = asyncio.create_task(guard.run_once(None, 1, "k", {"a": 1}, submit))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(guard.run_once(None, 1, "k", {"a": 1}, submit))
+        await asyncio.sleep(0)
+        submit.release.set()
+
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(first, 1)
+        assert await asyncio.wait_for(second, 1) == (41, False)
+        assert submit.calls == 2
+
+    async def test_lost_claim_falls_back_to_the_stored_key(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+
+        async def submit():
+            stored_keys[(1, "k")] = stored({"a": 1}, 41)
+            raise IdempotencyKeyTaken()
+
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (41, True)
+
+    async def test_lost_claim_without_a_stored_key_is_raised(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+
+        with pytest.raises(IdempotencyKeyTaken):
+            await guard.run_once(None, 1, "k", {"a": 1}, Submitter(IdempotencyKeyTaken()))
+        assert guard.stats()["size"] == 0
+
+
+class TestCache:
+    async def test_entries_expire_after_the_ttl(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        submit = Submitter(41, 42)
+        await guard.run_once(None, 1, "k", {"a": 1}, submit)
+
+        clock.now += 60
+        assert await guard.run_once(None, 1, "k", {"a": 1}, submit) == (42, False)
+        assert submit.calls == 2
+
+    async def test_least_recently_used_entries_are_evicted(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=2, ttl=60)
+        await guard.run_once(None, 1, "a", {}, Submitter(1))
+        await guard.run_once(None, 1, "b", {}, Submitter(2))
+        await guard.run_once(None, 1, "a", {}, Submitter())
+        await guard.run_once(None, 1, "c", {}, Submitter(3))
+
+        assert list(guard._entries) == [(1, "a"), (1, "c")]
+        assert guard.stats()["evictions"] == 1
+
+    async def test_forget_drops_the_keys_of_an_execution(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        await guard.run_once(None, 1, "a", {}, Submitter(1))
+        await guard.run_once(None, 1, "b", {}, Submitter(2))
+
+        guard.forget(1)
+
+        assert list(guard._entries) == [(1, "b")]
+
+    async def test_stats(self, clock, stored_keys):
+        guard = IdempotencyGuard(maxsize=10, ttl=60)
+        assert guard.stats()["hit_ratio"] == 0.0
+
+        await guard.run_once(None, 1, "a", {}, Submitter(1))
+        await guard.run_once(None, 1, "a", {}, Submitter())
+
+        assert guard.stats() == {
+            "size": 1,
+            "maxsize": 10,
+            "in_flight": 0,
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "hit_ratio": 0.5,
+        }
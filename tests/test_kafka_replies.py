@@ -0,0 +1,120 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+
+from app.models import SagaExecution, SagaExecutionStepStatus
+from app.services import saga_executor
+from app.services.kafka_replies import KafkaReplyConsumer, ReplyConflictError
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import compile_plan
+from app.services.step_journal import StepJournal
+
+Record = namedtuple("Record", "topic partition offset headers value")
+Metadata = namedtuple("Metadata", "topic partition offset")
+
+PARALLEL_REPLIES = """
+executions:
+  - name: reserve
+    type: kafka-request-reply
+    endpoint: {topic: stock, reply_topic: replies}
+    body: {order: "${webhook.order_id}"}
+  - name: charge
+    type: kafka-request-reply
+    endpoint: {topic: payments, reply_topic: replies}
+    body: {order: "${webhook.order_id}"}
+saga_config: {execution_mode: dag}
+"""
+
+
+@pytest.fixture
+def replies(monkeypatch):
+    consumer = KafkaReplyConsumer()
+
+    async def subscribe(topic):
+        pass
+
+    monkeypatch.setattr(consumer, "_subscribe", subscribe)
+    return consumer
+
+
+def reply(correlation_id, value=b'{"ok": true}', offset=0):
+    return Record("replies", 0, offset, [("correlation_id", correlation_id.encode())], value)
+
+
+async def send():
+    return "sent"
+
+
+async def test_parallel_steps_of_a_saga_await_distinct_replies(replies):
+    requests = [
+        asyncio.create_task(replies.request(send, "replies", f"c1:{step}", "correlation_id", 1))
+        for step in ("reserve", "charge")
+    ]
+    await asyncio.sleep(0)
+
+    replies._dispatch(reply("c1:charge", b'{"step": "charge"}', offset=1))
+    replies._dispatch(reply("c1:reserve", b'{"step": "reserve"}', offset=2))
+
+    reserve, charge = await asyncio.gather(*requests)
+    assert reserve["reply"]["body"] == {"step": "reserve"}
+    assert charge["reply"]["body"] == {"step": "charge"}
+    assert replies.stats()["waiting"] == 0
+
+
+async def test_unmatched_replies_are_counted(replies):
+    replies._dispatch(reply("someone-else"))
+
+    assert replies.stats()["unmatched"] == 1
+
+
+async def test_the_same_correlation_id_cannot_be_awaited_twice(replies):
+    first = asyncio.create_task(replies.request(send, "replies", "c1:a", "correlation_id", 1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ReplyConflictError):
+        await replies.request(send, "replies", "c1:a", "correlation_id", 1)
+
+    replies._dispatch(reply("c1:a"))
+    await first
+
+
+async def test_missing_reply_times_out(replies):
+    with pytest.raises(TimeoutError):
+        await replies.request(send, "replies", "c1:a", "correlation_id", 0.01)
+    assert replies.stats()["waiting"] == 0
+
+
+async def test_parallel_request_reply_steps_use_per_step_correlation_ids(replies, monkeypatch):
+    sent = []
+
+    class FakeProducer:
+        async def send(self, topic, value, key=None, headers=None, timeout=None):
+            sent.append(headers["correlation_id"])
+            return Metadata(topic, 0, len(sent))
+
+    monkeypatch.setattr(saga_executor, "kafka_replies", replies)
+    monkeypatch.setattr(saga_executor, "kafka_producer", FakeProducer())
+
+    plan = compile_plan(PARALLEL_REPLIES)
+    executor = SagaExecutor(None)
+    executor.journal = StepJournal(None, flush_mode="saga")
+    execution = SagaExecution(id=1)
+    context = {"webhook": {"correlation_id": "c1", "order_id": 7}}
+    steps = [
+        asyncio.create_task(executor._execute_kafka_request_reply_step(
+            step_plan, executor.journal.begin_step(execution, step_plan.name, step_plan.type), context
+        ))
+        for step_plan in plan.steps
+    ]
+    for _ in range(100):
+        if len(sent) == 2 or any(step.done() for step in steps):
+            break
+        await asyncio.sleep(0.01)
+
+    for offset, correlation_id in enumerate(sent):
+        replies._dispatch(reply(correlation_id, offset=offset))
+    done = await asyncio.wait_for(asyncio.gather(*steps), timeout=1)
+
+    assert sorted(sent) == ["c1:charge", "c1:reserve"]
+    assert [step.status for step in done] == [SagaExecutionStepStatus.COMPLETED] * 2
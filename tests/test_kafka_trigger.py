@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+from kafka import TopicPartition
+
+from app.models import SagaConfiguration
+from app.services.kafka_trigger import TriggerConsumer, _PauseAssigned
+from app.services.saga_plan import TriggerPlan
+
+Record = namedtuple("Record", "topic partition offset value")
+
+
+class FakeConsumer:
+    def __init__(self, assigned, records=()):
+        self.assigned = set(assigned)
+        self.paused_partitions = set()
+        self.records = list(records)
+        self.positions = {}
+
+    def poll(self, timeout_ms, max_records):
+        batches = {}
+        for record in self.records:
+            partition = TopicPartition(record.topic, record.partition)
+            batches.setdefault(partition, []).append(record)
+            self.positions[partition] = record.offset + 1
+        self.records = []
+        return batches
+
+    def assignment(self):
+        return set(self.assigned)
+
+    def paused(self):
+        return set(self.paused_partitions)
+
+    def pause(self, *partitions):
+        self.paused_partitions.update(partitions)
+
+    def seek(self, partition, offset):
+        self.positions[partition] = offset
+
+
+def make_trigger(consumer):
+    trigger = TriggerConsumer(
+        SagaConfiguration(id=1, name="orders"),
+        TriggerPlan(type="kafka", topic="orders", group=None),
+        max_in_flight=1,
+        batch_size=10
+    )
+    trigger._consumer = consumer
+    return trigger
+
+
+def test_records_polled_while_paused_are_rewound():
+    p0, p1 = TopicPartition("orders", 0), TopicPartition("orders", 1)
+    consumer = FakeConsumer([p0, p1], [
+        Record("orders", 1, 7, b"{}"),
+        Record("orders", 1, 8, b"{}"),
+    ])
+    trigger = make_trigger(consumer)
+
+    trigger._poll_paused()
+
+    assert consumer.positions[p1] == 7
+    assert p0 not in consumer.positions
+    assert consumer.paused_partitions == {p0, p1}
+
+
+def test_partitions_assigned_while_at_capacity_are_paused():
+    p0, p1 = TopicPartition("orders", 0), TopicPartition("orders", 1)
+    consumer = FakeConsumer([p0])
+    trigger = make_trigger(consumer)
+    listener = _PauseAssigned(trigger)
+
+    listener.on_partitions_assigned({p0})
+    assert consumer.paused_partitions == set()
+
+    trigger._paused = True
+    listener.on_partitions_assigned({p1})
+    assert consumer.paused_partitions == {p1}
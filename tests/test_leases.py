@@ -0,0 +1,80 @@
+import asyncio
+
+from app.models import SagaExecutionStatus
+from app.services import saga_executor
+from app.services.leases import LeaseKeeper
+from app.services.saga_plan import compile_plan
+
+PLAN = """
+executions:
+  - name: reserve
+    type: api
+    endpoint: {url: http://svc/reserve}
+"""
+
+
+async def test_lost_lease_cancels_the_watched_execution(monkeypatch):
+    keeper = LeaseKeeper(owner="me", duration=0.03)
+    keeper.track([1, 2])
+
+    async def renew(db, execution_ids):
+        # Execution 1 was taken over by another process
+        return {2}
+
+    monkeypatch.setattr(keeper, "renew", renew)
+
+    async def run():
+        keeper.watch(1)
+        await asyncio.sleep(60)
+
+    running = asyncio.create_task(run())
+    await keeper.start()
+    try:
+        await asyncio.wait_for(asyncio.gather(running, return_exceptions=True), timeout=1)
+    finally:
+        await keeper.stop()
+
+    assert running.cancelled()
+    assert keeper.lost(1)
+    assert not keeper.holds(1)
+    assert keeper.holds(2)
+
+    keeper.untrack(1)
+    assert not keeper.lost(1)
+
+
+async def test_untracked_executions_are_not_renewed():
+    keeper = LeaseKeeper(owner="me", duration=30)
+    keeper.track([1])
+    keeper.untrack(1)
+
+    assert not keeper.holds(1)
+
+
+async def test_finished_execution_is_not_taken_for_lost_once_its_lease_is_released(
+    monkeypatch, db, run_saga
+):
+    keeper = LeaseKeeper(owner="me", duration=0.03)
+    keeper.track([1])
+    monkeypatch.setattr(saga_executor, "lease_keeper", keeper)
+
+    async def renew(session, execution_ids):
+        # The final flush (the only commit) released the lease of the finished execution
+        return set() if db.commits else set(execution_ids)
+
+    async def refresh(instance):
+        # Heartbeats run while the finished execution is refreshed
+        await asyncio.sleep(0.1)
+
+    monkeypatch.setattr(keeper, "renew", renew)
+    monkeypatch.setattr(db, "refresh", refresh)
+
+    await keeper.start()
+    try:
+        run = await asyncio.wait_for(run_saga(compile_plan(PLAN)), timeout=5)
+    finally:
+        await keeper.stop()
+
+    assert run.execution.status == SagaExecutionStatus.COMPLETED
+    assert not keeper.holds(1)
+    assert not keeper.lost(1)
@@ -0,0 +1,188 @@
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.services import partitions
+from app.services.partitions import (
+    PARTITIONS_QUERY,
+    create_partition,
+    ensure_partitions,
+    month_start,
+    run_retention,
+)
+
+NOW = datetime(2024, 11, 20, 8, 30, tzinfo=timezone.utc)
+
+
+def utc(year, month):
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+class FakeResult:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def all(self):
+        return self._rows
+
+    def scalar(self):
+        return self._rows[0] if self._rows else None
+
+    def scalars(self):
+        return self._rows
+
+
+class FakeConnection:
+    """Connection answering the partition catalog query from `bounds` and recording the rest"""
+
+    def __init__(self, bounds, stray=False):
+        # Upper bounds of the monthly partitions of every table, plus its default partition
+        self.bounds = bounds
+        self.stray = stray
+        self.statements = []
+
+    def execute(self, statement, parameters=None, execution_options=None):
+        if statement is PARTITIONS_QUERY:
+            table = parameters["table"]
+            rows = [(f"{table}_p{month_start(bound, -1):%Y_%m}", bound) for bound in self.bounds]
+            return FakeResult(rows + [(f"{table}_default", None)])
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        if sql.startswith("SELECT EXISTS"):
+            return FakeResult([self.stray])
+        if sql.startswith("SELECT attname"):
+            return FakeResult(["id", "started_at"])
+        return FakeResult(rowcount=2)
+
+
+class FakeEngine:
+    def __init__(self, connection):
+        self.connection = connection
+
+    @contextmanager
+    def connect(self):
+        yield self.connection
+
+    begin = connect
+
+
+@pytest.fixture(autouse=True)
+def frozen_now(monkeypatch):
+    monkeypatch.setattr(partitions, "datetime", FrozenDatetime)
+
+
+def use(monkeypatch, connection):
+    monkeypatch.setattr(partitions, "engine", FakeEngine(connection))
+    return connection
+
+
+@pytest.mark.parametrize("value, months, expected", [
+    (datetime(2024, 11, 20, 8, 30), 0, utc(2024, 11)),
+    (datetime(2024, 12, 31, 23, 59), 1, utc(2025, 1)),
+    (datetime(2024, 1, 15), -1, utc(2023, 12)),
+    (datetime(2024, 3, 1), -15, utc(2022, 12)),
+    (datetime(2024, 11, 1), 14, utc(2026, 1)),
+])
+def test_month_start(value, months, expected):
+    assert month_start(value, months) == expected
+
+
+def test_ensure_partitions_continues_after_the_last_one_across_the_year():
+    connection = FakeConnection([utc(2024, 11), utc(2024, 12)])
+
+    created = ensure_partitions(connection, "saga_executions", months_ahead=2)
+
+    assert created == [
+        "saga_executions_p2024_12",
+        "saga_executions_p2025_01",
+    ]
+    assert connection.statements[1] == (
+        "CREATE TABLE saga_executions_p2024_12 PARTITION OF saga_executions "
+        "FOR VALUES FROM ('2024-12-01T00:00:00+00:00') TO ('2025-01-01T00:00:00+00:00')"
+    )
+
+
+def test_ensure_partitions_starts_at_the_current_month_without_partitions():
+    created = ensure_partitions(FakeConnection([]), "saga_executions", months_ahead=0)
+
+    assert created == ["saga_executions_p2024_11"]
+
+
+def test_create_partition_moves_rows_out_of_the_default_partition():
+    connection = FakeConnection([], stray=True)
+
+    create_partition(connection, "saga_execution_steps", utc(2024, 12), utc(2025, 1))
+
+    assert [sql.split(" (")[0] for sql in connection.statements[2:]] == [
+        "ALTER TABLE saga_execution_steps DETACH PARTITION saga_execution_steps_default",
+        "CREATE TABLE saga_execution_steps_p2024_12 PARTITION OF saga_execution_steps FOR VALUES FROM",
+        "WITH moved AS",
+        "ALTER TABLE saga_execution_steps ATTACH PARTITION saga_execution_steps_default DEFAULT",
+    ]
+    assert "DELETE FROM saga_execution_steps_default WHERE execution_started_at >= :start" in (
+        connection.statements[4]
+    )
+
+
+def test_retention_purges_partitions_entirely_before_the_cutoff(monkeypatch):
+    use(monkeypatch, FakeConnection([utc(2024, 9), utc(2024, 10), utc(2024, 11), utc(2024, 12)]))
+
+    # Cutoff 2024-10-21: August and September end before it; October still has recent rows
+    report = run_retention(retention_days=30, action="drop", dry_run=True)
+
+    assert report["cutoff"] == "2024-10-21T08:30:00+00:00"
+    assert [entry["partition"] for entry in report["purged"]] == [
+        "saga_step_payloads_p2024_08",
+        "saga_step_payloads_p2024_09",
+        "saga_execution_steps_p2024_08",
+        "saga_execution_steps_p2024_09",
+        "saga_executions_p2024_08",
+        "saga_executions_p2024_09",
+    ]
+    assert report["created"] == []
+
+
+def test_retention_drops_partitions_and_the_keys_of_their_executions(monkeypatch):
+    connection = use(monkeypatch, FakeConnection([utc(2024, 10), utc(2024, 12)]))
+
+    report = run_retention(retention_days=30, action="drop", months_ahead=0)
+
+    assert "DROP TABLE saga_executions_p2024_09" in connection.statements
+    assert [sql for sql in connection.statements if sql.startswith("DELETE")] == [
+        "DELETE FROM saga_idempotency_keys WHERE execution_started_at < :bound",
+        "DELETE FROM saga_correlation_ids WHERE execution_started_at < :bound",
+    ]
+    assert report["purged"][-1] == {
+        "partition": "saga_executions_p2024_09",
+        "action": "drop",
+        "idempotency_keys": 2,
+        "correlation_ids": 2,
+    }
+
+
+def test_retention_purges_even_when_partitions_cannot_be_created(monkeypatch):
+    use(monkeypatch, FakeConnection([utc(2024, 10)]))
+
+    def fail(connection, table, months_ahead):
+        raise OperationalError("CREATE TABLE", {}, Exception("lock timeout"))
+
+    monkeypatch.setattr(partitions, "ensure_partitions", fail)
+
+    report = run_retention(retention_days=30, action="detach")
+
+    assert [error["error"] for error in report["errors"]] == ["lock timeout"] * 3
+    assert len(report["purged"]) == 3
+
+
+def test_unknown_retention_action():
+    with pytest.raises(ValueError, match="Unknown retention action"):
+        run_retention(action="archive")
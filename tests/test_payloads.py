@@ -0,0 +1,120 @@
+import pytest
+
+from app.core.config import settings
+from app.services import payloads
+from app.services.payloads import (
+    FULL_PAYLOADS,
+    PayloadEncodingError,
+    PayloadPolicy,
+    compress,
+    decompress,
+    dumps,
+    store,
+)
+from app.services.saga_plan import SagaPlanError, compile_plan
+
+BODY = {"order": {"id": 7, "items": [1, 2, 3]}, "customer": {"name": "Ana", "card": "4111"}}
+
+
+class TestPayloadPolicy:
+    def test_full_keeps_everything(self):
+        assert FULL_PAYLOADS.apply(BODY) is BODY
+
+    def test_truncate_keeps_small_payloads(self):
+        assert PayloadPolicy(mode="truncate", max_bytes=1000).apply(BODY) is BODY
+
+    def test_truncate_replaces_large_payloads_by_a_preview(self):
+        kept = PayloadPolicy(mode="truncate", max_bytes=10).apply(BODY)
+
+        assert kept == {"truncated": True, "size": len(dumps(BODY)), "preview": dumps(BODY)[:10].decode()}
+
+    def test_allowlist_keeps_only_the_listed_paths(self):
+        policy = PayloadPolicy(mode="allowlist", fields=("order.id", "customer.name", "missing.path"))
+
+        assert policy.apply(BODY) == {"order": {"id": 7}, "customer": {"name": "Ana"}}
+
+    def test_none_is_kept_as_none(self):
+        assert PayloadPolicy(mode="allowlist", fields=("a",)).apply(None) is None
+
+
+class TestStore:
+    def test_small_payloads_stay_inline(self):
+        assert store(PayloadPolicy(compress_above=1000), BODY) == (BODY, None)
+
+    def test_large_payloads_are_compressed_aside(self):
+        inline, compressed = store(PayloadPolicy(compress_above=10), BODY)
+
+        assert inline is None
+        encoding, size, data = compressed
+        assert size == len(dumps(BODY))
+        assert decompress(encoding, data) == BODY
+
+    def test_global_threshold_applies_without_a_policy_threshold(self, monkeypatch):
+        monkeypatch.setattr(settings, "PAYLOAD_COMPRESS_ABOVE", 10)
+
+        assert store(FULL_PAYLOADS, BODY)[0] is None
+
+    def test_none_is_not_stored(self):
+        assert store(FULL_PAYLOADS, None) == (None, None)
+
+
+class TestCompression:
+    def test_gzip_round_trip(self, monkeypatch):
+        monkeypatch.setattr(settings, "PAYLOAD_COMPRESSION", "gzip")
+
+        encoding, data = compress(dumps(BODY))
+        assert encoding == "gzip"
+        assert decompress(encoding, data) == BODY
+
+    def test_falls_back_to_gzip_without_zstandard(self, monkeypatch):
+        monkeypatch.setattr(settings, "PAYLOAD_COMPRESSION", "zstd")
+        monkeypatch.setattr(payloads, "zstandard", None)
+
+        assert compress(dumps(BODY))[0] == "gzip"
+        with pytest.raises(PayloadEncodingError, match="zstandard is not installed"):
+            decompress("zstd", b"")
+
+    def test_unknown_encoding(self):
+        with pytest.raises(PayloadEncodingError, match="Unknown payload encoding"):
+            decompress("brotli", b"")
+
+
+class TestCompilePayloads:
+    def compile(self, step_block="", saga_block=""):
+        return compile_plan(
+            "executions:\n"
+            "  - name: a\n"
+            "    type: api\n"
+            "    endpoint: {url: x}\n"
+            f"{step_block}"
+            f"saga_config: {{{saga_block}}}\n"
+        )
+
+    def test_saga_policy_applies_to_steps_without_their_own(self):
+        plan = self.compile(saga_block="payload_storage: {mode: truncate, max_bytes: 64}")
+
+        assert plan.steps[0].payloads == PayloadPolicy(mode="truncate", max_bytes=64)
+        assert plan.payload_policies == {"a": plan.steps[0].payloads}
+
+    def test_step_policy_wins(self):
+        plan = self.compile(
+            step_block="    payload_storage: {mode: allowlist, fields: [id], compress_above: 512}\n",
+            saga_block="payload_storage: {mode: truncate}",
+        )
+
+        assert plan.steps[0].payloads == PayloadPolicy(
+            mode="allowlist", fields=("id",), compress_above=512
+        )
+
+    def test_defaults_to_full_payloads(self):
+        assert self.compile().steps[0].payloads == FULL_PAYLOADS
+
+    @pytest.mark.parametrize("saga_block, message", [
+        ("payload_storage: {mode: hash}", "unknown payload_storage mode"),
+        ("payload_storage: {mode: allowlist}", "fields must be a list"),
+        ("payload_storage: {mode: truncate, max_bytes: 0}", "max_bytes must be a positive integer"),
+        ("payload_storage: []", "payload_storage must be a mapping"),
+    ])
+    def test_rejects_invalid_policies(self, saga_block, message):
+        with pytest.raises(SagaPlanError, match=message):
+            self.compile(saga_block=saga_block)
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import SagaConfiguration
+from app.services.plan_cache import PlanCache
+from app.services.saga_plan import SagaPlanError, compile_plan
+
+
+SAGA_YAML = """
+executions:
+  - name: create-order
+    type: api
+    endpoint:
+      url: "http://orders/orders"
+      method: POST
+    body:
+      order_id: "${webhook.order_id}"
+    timeout: 5s
+  - name: notify
+    type: kafka
+    endpoint:
+      topic: notifications
+    body:
+      order_id: "${create-order.response.body.id}"
+saga_config:
+  global_timeout: 2m
+"""
+
+
+def make_config(config_id=1, yaml_content=SAGA_YAML, updated_at=None):
+    return SagaConfiguration(id=config_id, yaml_content=yaml_content, updated_at=updated_at)
+
+
+class TestCompilePlan:
+    def test_normalizes_steps_and_durations(self):
+        plan = compile_plan(SAGA_YAML)
+
+        assert [step.name for step in plan.steps] == ["create-order", "notify"]
+        assert plan.steps[0].method == "POST"
+        assert plan.steps[0].timeout == 5
+        assert plan.global_timeout == 120
+        assert plan.execution_mode == "sequential"
+        assert plan.max_concurrency == 1
+
+    def test_rollback_under_error_is_compiled(self):
+        plan = compile_plan("""
+executions:
+  - name: reserve
+    type: api
+    endpoint: {url: "http://stock/reserve"}
+    error:
+      rollback:
+        endpoint: {url: "http://stock/release", method: DELETE}
+""")
+
+        rollback = plan.steps[0].rollback
+        assert rollback is not None
+        assert rollback.method == "DELETE"
+
+    @pytest.mark.parametrize("yaml_content, message", [
+        ("- not a mapping", "must be a YAML mapping"),
+        ("executions:\n  - name: a\n    type: ftp\n    endpoint: {url: x}", "Unknown step type"),
+        ("executions:\n  - name: a\n    type: api\n    endpoint: {}", "endpoint url is required"),
+        ("executions:\n  - name: a\n    type: kafka\n    endpoint: {topic: t}", "body is required"),
+        (
+            "executions:\n"
+            "  - {name: a, type: api, endpoint: {url: x}}\n"
+            "  - {name: a, type: api, endpoint: {url: y}}",
+            "Duplicate step names",
+        ),
+        ("saga_config: {global_timeout: soon}", "global_timeout"),
+    ])
+    def test_rejects_invalid_configurations(self, yaml_content, message):
+        with pytest.raises(SagaPlanError, match=message):
+            compile_plan(yaml_content)
+
+
+class TestPlanCache:
+    def test_compiles_once_per_revision(self):
+        cache = PlanCache(maxsize=10)
+        config = make_config()
+
+        first = cache.get_plan(config)
+        second = cache.get_plan(config)
+
+        assert first is second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_new_revision_replaces_the_stale_plan(self):
+        cache = PlanCache(maxsize=10)
+        old = cache.get_plan(make_config(updated_at=datetime(2024, 1, 1)))
+        new = cache.get_plan(make_config(updated_at=datetime(2024, 1, 2)))
+
+        assert old is not new
+        assert cache.stats()["size"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = PlanCache(maxsize=2)
+        cache.get_plan(make_config(1))
+        cache.get_plan(make_config(2))
+        cache.get_plan(make_config(1))
+        cache.get_plan(make_config(3))
+
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+        cache.get_plan(make_config(1))
+        assert cache.stats()["hits"] == 2
+
+    def test_invalidate_drops_every_revision_of_a_configuration(self):
+        cache = PlanCache(maxsize=10)
+        cache.get_plan(make_config(1))
+        cache.get_plan(make_config(2))
+
+        cache.invalidate(1)
+
+        assert cache.stats()["size"] == 1
+
+    def test_invalid_yaml_is_not_cached(self):
+        cache = PlanCache(maxsize=10)
+        config = make_config(yaml_content="executions: [{name: a}]")
+
+        with pytest.raises(SagaPlanError):
+            cache.get_plan(config)
+
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,115 @@
+import types
+from datetime import datetime
+
+import pytest
+
+from app.models import (
+    SagaExecution,
+    SagaExecutionStatus,
+    SagaExecutionStep,
+    SagaExecutionStepStatus,
+)
+from app.services import saga_executor
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import compile_plan
+
+
+def saga(recovery):
+    return compile_plan(
+        "executions:\n"
+        "  - name: reserve\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/reserve}\n"
+        "    rollback: {endpoint: {url: http://svc/release}}\n"
+        "  - name: charge\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/charge}\n"
+        "    body: {stock: \"${reserve.response.body}\"}\n"
+        "    rollback: {endpoint: {url: http://svc/refund}}\n"
+        "  - name: notify\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/notify}\n"
+        f"saga_config: {{recovery: {recovery}}}\n"
+    )
+
+
+def orphan(db, snapshot, **statuses):
+    """Execution orphaned with the given step statuses, and its context snapshot"""
+    db.rows = [
+        SagaExecutionStep(
+            id=number,
+            saga_execution_id=1,
+            execution_started_at=datetime(2024, 1, 1),
+            step_name=name,
+            step_type="api",
+            status=status,
+            started_at=datetime(2024, 1, 1)
+        )
+        for number, (name, status) in enumerate(statuses.items(), start=1)
+    ]
+    return SagaExecution(
+        id=1,
+        started_at=datetime(2024, 1, 1),
+        correlation_id="c1",
+        status=SagaExecutionStatus.RUNNING,
+        input_data={},
+        context_snapshot=snapshot
+    )
+
+
+async def resume(monkeypatch, db, plan, execution):
+    monkeypatch.setattr(saga_executor, "plan_cache", types.SimpleNamespace(get_plan=lambda config: plan))
+    await SagaExecutor(db).resume_execution(None, execution)
+    return {step.step_name: step for step in db.rows}
+
+
+COMPLETED = SagaExecutionStepStatus.COMPLETED
+RUNNING = SagaExecutionStepStatus.RUNNING
+
+
+async def test_completed_steps_are_not_run_again(monkeypatch, http, db):
+    execution = orphan(db, {"reserve": {"response": {"body": {}}}}, reserve=COMPLETED, charge=RUNNING)
+
+    steps = await resume(monkeypatch, db, saga("resume"), execution)
+
+    assert http.requests == [("POST", "http://svc/charge"), ("POST", "http://svc/notify")]
+    assert steps["reserve"].status == COMPLETED
+    assert steps["charge"].error_message == "Interrupted: the process running the saga stopped"
+    assert execution.status == SagaExecutionStatus.COMPLETED
+
+
+@pytest.mark.parametrize("snapshot", [{"reserve": {"response": {"body": {}}}}, {}])
+async def test_compensate_rolls_back_completed_steps_with_or_without_their_output(
+    monkeypatch, http, db, snapshot
+):
+    execution = orphan(db, snapshot, reserve=COMPLETED, charge=COMPLETED, notify=RUNNING)
+
+    steps = await resume(monkeypatch, db, saga("compensate"), execution)
+
+    assert http.requests == [("POST", "http://svc/refund"), ("POST", "http://svc/release")]
+    assert steps["reserve"].status == SagaExecutionStepStatus.ROLLED_BACK
+    assert steps["charge"].status == SagaExecutionStepStatus.ROLLED_BACK
+    assert steps["notify"].status == SagaExecutionStepStatus.FAILED
+    assert execution.status == SagaExecutionStatus.ROLLED_BACK
+
+
+async def test_missing_output_read_by_a_remaining_step_compensates(monkeypatch, http, db):
+    execution = orphan(db, {}, reserve=COMPLETED)
+
+    steps = await resume(monkeypatch, db, saga("resume"), execution)
+
+    assert http.requests == [("POST", "http://svc/release")]
+    assert steps["reserve"].status == SagaExecutionStepStatus.ROLLED_BACK
+    assert execution.status == SagaExecutionStatus.ROLLED_BACK
+    assert execution.error_message == (
+        "Interrupted: compensated after recovery (outputs of reserve were not checkpointed)"
+    )
+
+
+async def test_missing_output_nobody_reads_is_resumed(monkeypatch, http, db):
+    execution = orphan(db, {"reserve": {"response": {"body": {}}}}, reserve=COMPLETED, charge=COMPLETED)
+
+    await resume(monkeypatch, db, saga("resume"), execution)
+
+    assert http.requests == [("POST", "http://svc/notify")]
+    assert execution.status == SagaExecutionStatus.COMPLETED
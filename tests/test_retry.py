@@ -0,0 +1,116 @@
+import httpx
+import pytest
+
+from app.services.retry import NO_RETRY, RetryBudget, RetryBudgets, RetryPolicy
+from app.services.saga_plan import SagaPlanError, compile_plan
+
+
+class TestRetryPolicy:
+    def test_backoff_is_exponential_and_capped_without_jitter(self):
+        policy = RetryPolicy(max_attempts=6, backoff_base=0.5, backoff_cap=3, jitter=False)
+
+        assert [policy.backoff(attempt) for attempt in range(1, 6)] == [0.5, 1, 2, 3, 3]
+
+    def test_jitter_stays_below_the_delay(self):
+        policy = RetryPolicy(max_attempts=3, backoff_base=1, backoff_cap=10)
+
+        for _ in range(100):
+            assert 0 <= policy.backoff(3) <= 4
+
+    def test_matches_statuses_and_exception_base_classes(self):
+        policy = RetryPolicy(max_attempts=2)
+
+        assert policy.retries_status(503)
+        assert not policy.retries_status(500)
+        # ConnectTimeout is a TransportError
+        assert policy.retries_exception(httpx.ConnectTimeout("timed out"))
+        assert not policy.retries_exception(ValueError("bad"))
+
+    def test_no_retry_is_a_single_attempt(self):
+        assert NO_RETRY.max_attempts == 1
+
+
+class TestCompileRetry:
+    def compile(self, retry_block):
+        plan = compile_plan(
+            "executions:\n"
+            "  - name: a\n"
+            "    type: api\n"
+            "    endpoint: {url: x}\n"
+            f"    retry: {retry_block}\n"
+        )
+        return plan.steps[0].retry
+
+    def test_defaults(self):
+        policy = self.compile("{}")
+
+        assert policy.max_attempts == 3
+        assert policy.retry_on_status == NO_RETRY.retry_on_status
+        assert policy.retry_on == NO_RETRY.retry_on
+
+    def test_custom_policy(self):
+        policy = self.compile(
+            "{max_attempts: 5, backoff: {base: 200ms, cap: 1s, jitter: false},"
+            " retry_on_status: [429], retry_on: [ConnectError]}"
+        )
+
+        assert policy == RetryPolicy(
+            max_attempts=5,
+            backoff_base=0.2,
+            backoff_cap=1,
+            jitter=False,
+            retry_on_status=frozenset({429}),
+            retry_on=frozenset({"ConnectError"}),
+        )
+
+    def test_cap_is_never_below_base(self):
+        assert self.compile("{backoff: {base: 2s, cap: 1s}}").backoff_cap == 2
+
+    @pytest.mark.parametrize("retry_block, message", [
+        ("[]", "retry must be a mapping"),
+        ("{max_attempts: 0}", "max_attempts must be a positive integer"),
+        ("{retry_on_status: [99]}", "retry_on_status"),
+        ("{retry_on: [1]}", "retry_on must be a list"),
+        ("{backoff: {jitter: maybe}}", "jitter must be true or false"),
+    ])
+    def test_rejects_invalid_policies(self, retry_block, message):
+        with pytest.raises(SagaPlanError, match=message):
+            self.compile(retry_block)
+
+
+class TestRetryBudget:
+    def test_retries_are_limited_to_a_ratio_of_requests(self, clock):
+        budget = RetryBudget(ratio=0.2, min_per_second=0, window=10)
+        for _ in range(10):
+            budget.deposit()
+
+        assert [budget.try_withdraw() for _ in range(3)] == [True, True, False]
+        assert budget.stats() == {"requests": 10, "retries": 2, "rejected": 1}
+
+    def test_floor_allows_retries_without_traffic(self, clock):
+        budget = RetryBudget(ratio=0.2, min_per_second=0.5, window=4)
+
+        assert [budget.try_withdraw() for _ in range(3)] == [True, True, False]
+
+    def test_events_leave_the_window(self, clock):
+        budget = RetryBudget(ratio=1, min_per_second=0, window=10)
+        budget.deposit()
+        assert budget.try_withdraw()
+        assert not budget.try_withdraw()
+
+        clock.now += 11
+        assert not budget.try_withdraw()
+        budget.deposit()
+        assert budget.try_withdraw()
+        assert budget.stats()["requests"] == 1
+
+
+class TestRetryBudgets:
+    def test_one_budget_per_host(self):
+        budgets = RetryBudgets(ratio=0.1, min_per_second=1, window=5)
+
+        assert budgets.get("orders") is budgets.get("orders")
+        assert budgets.get("orders") is not budgets.get("stock")
+        stats = budgets.stats()
+        assert stats["ratio"] == 0.1
+        assert set(stats["hosts"]) == {"orders", "stock"}
@@ -0,0 +1,90 @@
+import pytest
+
+from app.services.saga_plan import SagaPlanError, compile_plan
+
+
+def dag(*steps, mode="dag"):
+    lines = ["executions:"]
+    for step in steps:
+        lines.append(f"  - {step}")
+    lines.append(f"saga_config: {{execution_mode: {mode}, max_concurrency: 4}}")
+    return "\n".join(lines)
+
+
+def dependencies(plan):
+    return {step.name: set(step.dependencies) for step in plan.steps}
+
+
+class TestResolveDependencies:
+    def test_sequential_mode_chains_steps_in_yaml_order(self):
+        plan = compile_plan(dag(
+            "{name: a, type: api, endpoint: {url: x}}",
+            "{name: b, type: api, endpoint: {url: x}}",
+            "{name: c, type: api, endpoint: {url: x}}",
+            mode="sequential",
+        ))
+
+        assert dependencies(plan) == {"a": set(), "b": {"a"}, "c": {"b"}}
+        assert plan.max_concurrency == 1
+
+    def test_independent_steps_have_no_dependencies(self):
+        plan = compile_plan(dag(
+            "{name: a, type: api, endpoint: {url: x}}",
+            "{name: b, type: api, endpoint: {url: x}}",
+        ))
+
+        assert dependencies(plan) == {"a": set(), "b": set()}
+        assert plan.max_concurrency == 4
+
+    def test_explicit_depends_on(self):
+        plan = compile_plan(dag(
+            "{name: a, type: api, endpoint: {url: x}}",
+            "{name: b, type: api, endpoint: {url: x}, depends_on: [a]}",
+        ))
+
+        assert dependencies(plan)["b"] == {"a"}
+
+    def test_references_infer_dependencies(self):
+        plan = compile_plan(dag(
+            "{name: a, type: api, endpoint: {url: x}}",
+            "{name: b, type: api, endpoint: {url: 'http://b/${a.response.body.id}'}}",
+            "{name: c, type: api, endpoint: {url: x}, body: {b: '${b.response.body}'}}",
+        ))
+
+        assert dependencies(plan) == {"a": set(), "b": {"a"}, "c": {"b"}}
+
+    def test_steps_are_ordered_topologically_keeping_yaml_order(self):
+        plan = compile_plan(dag(
+            "{name: late, type: api, endpoint: {url: x}, depends_on: [first]}",
+            "{name: first, type: api, endpoint: {url: x}}",
+            "{name: other, type: api, endpoint: {url: x}}",
+        ))
+
+        assert [step.name for step in plan.steps] == ["first", "other", "late"]
+        assert [step.order for step in plan.steps] == [0, 1, 2]
+
+    def test_self_reference_is_not_a_dependency(self):
+        plan = compile_plan(dag(
+            "{name: a, type: api, endpoint: {url: x}, depends_on: [a]}",
+        ))
+
+        assert dependencies(plan) == {"a": set()}
+
+    def test_unknown_depends_on_is_rejected(self):
+        with pytest.raises(SagaPlanError, match="unknown depends_on: missing"):
+            compile_plan(dag("{name: a, type: api, endpoint: {url: x}, depends_on: [missing]}"))
+
+    def test_cycles_are_rejected(self):
+        with pytest.raises(SagaPlanError, match="Dependency cycle between steps: a, b"):
+            compile_plan(dag(
+                "{name: a, type: api, endpoint: {url: x}, depends_on: [b]}",
+                "{name: b, type: api, endpoint: {url: x}, depends_on: [a]}",
+                "{name: c, type: api, endpoint: {url: x}}",
+            ))
+
+    def test_inferred_cycles_are_rejected(self):
+        with pytest.raises(SagaPlanError, match="Dependency cycle"):
+            compile_plan(dag(
+                "{name: a, type: api, endpoint: {url: 'http://a/${b.response.body.id}'}}",
+                "{name: b, type: api, endpoint: {url: 'http://b/${a.response.body.id}'}}",
+            ))
@@ -0,0 +1,88 @@
+import httpx
+
+from app.models import SagaExecutionStatus
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import compile_plan
+
+SAGA = """
+executions:
+  - name: reserve
+    type: api
+    endpoint: {url: http://svc/reserve}
+    body: {order: "${webhook.order_id}"}
+    success:
+      condition: "response.status == 200"
+      extract: {reservation_id: "response.body.id"}
+  - name: charge
+    type: api
+    endpoint: {url: http://svc/charge}
+    body: {reservation: "${reserve.response.body}"}
+  - name: audit
+    type: api
+    endpoint: {url: http://svc/audit}
+    body: {reservation: "${reserve.response.body.id}"}
+    depends_on: [reserve]
+saga_config: {execution_mode: dag}
+"""
+
+OUTPUT = """
+output:
+  reservation: "${reserve.reservation_id}"
+  charged: "${charge.response.status}"
+"""
+
+
+def reservation(http, charged):
+    async def reserve(body):
+        return httpx.Response(200, json={"id": 7, "items": ["A", "B"]})
+
+    async def charge(body):
+        charged.append(body)
+        return httpx.Response(200, json={"paid": True})
+
+    http.on("POST", "http://svc/reserve", reserve)
+    http.on("POST", "http://svc/charge", charge)
+
+
+async def test_output_data_is_the_rendered_projection(http, run_saga):
+    reservation(http, [])
+
+    run = await run_saga(compile_plan(SAGA + OUTPUT), {"order_id": 1})
+
+    assert run.execution.status == SagaExecutionStatus.COMPLETED
+    assert run.execution.output_data == {"reservation": 7, "charged": 200}
+
+
+async def test_output_data_is_the_whole_context_without_a_projection(http, run_saga):
+    reservation(http, [])
+
+    run = await run_saga(compile_plan(SAGA), {"order_id": 1})
+
+    assert run.execution.output_data is run.context
+    assert run.context["reserve"]["response"]["body"] == {"id": 7, "items": ["A", "B"]}
+
+
+async def test_consumed_outputs_keep_only_their_extracted_values(http, run_saga):
+    charged = []
+    reservation(http, charged)
+
+    run = await run_saga(compile_plan(SAGA + OUTPUT), {"order_id": 1})
+
+    # Still in the context while its consumers ran
+    assert charged == [{"reservation": {"id": 7, "items": ["A", "B"]}}]
+    assert run.context["reserve"] == {"reservation_id": 7}
+    # Read by the output projection beyond its extracted values
+    assert run.context["charge"]["response"]["status"] == 200
+
+
+def test_output_is_kept_until_every_consumer_completed():
+    plan = compile_plan(SAGA + OUTPUT)
+    steps = {step_plan.name: (step_plan, None) for step_plan in plan.steps}
+    raw = {"response": {"status": 200}, "reservation_id": 7}
+    context = {"reserve": dict(raw)}
+
+    SagaExecutor(None)._release_outputs(context, {name: steps[name] for name in ("reserve", "charge")})
+    assert context["reserve"] == raw
+
+    SagaExecutor(None)._release_outputs(context, steps)
+    assert context["reserve"] == {"reservation_id": 7}
@@ -0,0 +1,145 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.models import SagaExecution, SagaExecutionStepStatus
+from app.services.saga_executor import SagaExecutor
+from app.services.saga_plan import compile_plan
+from app.services.step_journal import StepJournal
+
+
+def saga(strategy, concurrency=None, groups=None):
+    """Four chained steps, each with a rollback in the given group"""
+    groups = groups or {}
+    steps = "".join(
+        f"  - name: {name}\n"
+        f"    type: api\n"
+        f"    endpoint: {{url: http://svc/{name}}}\n"
+        f"    rollback: {{endpoint: {{url: http://svc/undo/{name}}}, group: {groups.get(name, 0)}}}\n"
+        for name in ("a", "b", "c", "d")
+    )
+    saga_config = f"rollback_strategy: {strategy}"
+    if concurrency is not None:
+        saga_config += f", rollback_concurrency: {concurrency}"
+    return compile_plan(f"executions:\n{steps}saga_config: {{{saga_config}}}\n")
+
+
+@pytest.fixture
+def executor():
+    executor = SagaExecutor(None)
+    executor.journal = StepJournal(None, flush_mode="saga")
+    return executor
+
+
+def complete_all(executor, plan):
+    execution = SagaExecution(id=1)
+    completed = {}
+    for step_plan in plan.steps:
+        step = executor.journal.begin_step(execution, step_plan.name, step_plan.type)
+        step.status = SagaExecutionStepStatus.COMPLETED
+        completed[step_plan.name] = (step_plan, step)
+    return completed
+
+
+def undone(http):
+    return [url.rsplit("/", 1)[1] for method, url in http.requests]
+
+
+async def test_sequential_rollback_runs_in_reverse_order(executor, http):
+    plan = saga("sequential")
+    completed = complete_all(executor, plan)
+
+    await executor._compensate(plan, completed, {})
+
+    assert undone(http) == ["d", "c", "b", "a"]
+    assert all(step.status == SagaExecutionStepStatus.ROLLED_BACK for _, step in completed.values())
+
+
+async def test_parallel_rollback_runs_groups_in_ascending_order(executor, http):
+    plan = saga("parallel", groups={"a": 2, "b": 1, "c": 0, "d": 0})
+    started = []
+
+    def record(name):
+        async def handler(body):
+            started.append(name)
+            await asyncio.sleep(0.01)
+            started.append(f"/{name}")
+            return httpx.Response(200)
+        return handler
+
+    for name in "abcd":
+        http.on("POST", f"http://svc/undo/{name}", record(name))
+
+    await executor._compensate(plan, complete_all(executor, plan), {})
+
+    # c and d overlap; b only starts once both ended, and a after b
+    assert started[:2] == ["d", "c"]
+    assert sorted(started[2:4]) == ["/c", "/d"]
+    assert started[4:] == ["b", "/b", "a", "/a"]
+
+
+async def test_parallel_rollback_is_bounded_by_rollback_concurrency(executor, http):
+    plan = saga("parallel", concurrency=2)
+    active = peak = 0
+
+    async def handler(body):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    for name in "abcd":
+        http.on("POST", f"http://svc/undo/{name}", handler)
+
+    await executor._compensate(plan, complete_all(executor, plan), {})
+
+    assert len(http.requests) == 4
+    assert peak == 2
+
+
+@pytest.mark.parametrize("strategy", ["sequential", "parallel"])
+async def test_failed_compensations_are_recorded_and_the_rest_still_run(executor, http, strategy):
+    plan = saga(strategy, groups={"a": 1})
+
+    async def server_error(body):
+        return httpx.Response(500)
+
+    async def unreachable(body):
+        raise httpx.ConnectError("connection refused")
+
+    http.on("POST", "http://svc/undo/b", server_error)
+    http.on("POST", "http://svc/undo/c", unreachable)
+    completed = complete_all(executor, plan)
+
+    await executor._compensate(plan, completed, {})
+
+    assert sorted(undone(http)) == ["a", "b", "c", "d"]
+    errors = {name: step.rollback_error for name, (_, step) in completed.items()}
+    assert errors == {
+        "a": None,
+        "b": "Rollback returned status 500",
+        "c": "connection refused",
+        "d": None,
+    }
+    assert all(step.status == SagaExecutionStepStatus.ROLLED_BACK for _, step in completed.values())
+    assert all(step.rollback_completed_at is not None for _, step in completed.values())
+
+
+async def test_steps_without_rollback_are_marked_rolled_back(executor, http):
+    plan = compile_plan(
+        "executions:\n"
+        "  - name: a\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/a}\n"
+    )
+    completed = complete_all(executor, plan)
+
+    await executor._compensate(plan, completed, {})
+
+    step = completed["a"][1]
+    assert http.requests == []
+    assert step.status == SagaExecutionStepStatus.ROLLED_BACK
+    assert step.rollback_started_at is None
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+from app.models import SagaExecutionStatus, SagaExecutionStepStatus
+from app.services.saga_plan import compile_plan
+
+
+async def hang(body):
+    await asyncio.sleep(60)
+    return httpx.Response(200)
+
+
+async def test_slow_step_fails_with_a_timeout(http, run_saga):
+    http.on("POST", "http://svc/slow", hang)
+    plan = compile_plan(
+        "executions:\n"
+        "  - name: slow\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/slow}\n"
+        "    timeout: 50ms\n"
+    )
+
+    run = await asyncio.wait_for(run_saga(plan), timeout=5)
+
+    step = run.steps["slow"]
+    assert step.status == SagaExecutionStepStatus.FAILED
+    assert step.error_message == "Timed out after 0.05s"
+    assert step.attempts[0]["error"] == "Timed out after 0.05s"
+    assert run.execution.status == SagaExecutionStatus.ROLLED_BACK
+    assert run.execution.error_message == "Step 'slow' failed: Timed out after 0.05s"
+
+
+async def test_global_timeout_cancels_running_steps_and_compensates(http, run_saga):
+    http.on("POST", "http://svc/ship", hang)
+    http.on("POST", "http://svc/notify", hang)
+    plan = compile_plan(
+        "executions:\n"
+        "  - name: reserve\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/reserve}\n"
+        "    rollback: {endpoint: {url: http://svc/release}}\n"
+        "  - name: ship\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/ship}\n"
+        "    depends_on: [reserve]\n"
+        "    rollback: {endpoint: {url: http://svc/unship}}\n"
+        "  - name: notify\n"
+        "    type: api\n"
+        "    endpoint: {url: http://svc/notify}\n"
+        "    depends_on: [reserve]\n"
+        "saga_config: {execution_mode: dag, global_timeout: 100ms}\n"
+    )
+
+    run = await asyncio.wait_for(run_saga(plan), timeout=5)
+
+    assert run.execution.status == SagaExecutionStatus.ROLLED_BACK
+    assert run.execution.error_message == "Saga exceeded global_timeout of 0.1s"
+    # Only the completed step is compensated; the cancelled ones never took effect
+    assert ("POST", "http://svc/release") in http.requests
+    assert ("POST", "http://svc/unship") not in http.requests
+    assert run.steps["reserve"].status == SagaExecutionStepStatus.ROLLED_BACK
+    for name in ("ship", "notify"):
+        assert run.steps[name].status == SagaExecutionStepStatus.FAILED
+        assert run.steps[name].error_message == "Cancelled: saga deadline exceeded"
+        assert run.steps[name].completed_at is not None
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import SagaExecution
+from app.services.leases import LeaseLostError
+from app.services.step_journal import StepJournal
+
+
+class FakeResult:
+    def __init__(self, ids):
+        self._ids = ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._ids
+
+    def scalar_one_or_none(self):
+        return self._ids[0] if self._ids else None
+
+
+class FakeSession:
+    """Session double that fails on concurrent use, like AsyncSession"""
+
+    def __init__(self, delay=0.05, owned=True):
+        self.delay = delay
+        self.owned = owned
+        self.busy = False
+        self.statements = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def _use(self):
+        if self.busy:
+            raise RuntimeError("concurrent operations are not permitted")
+        self.busy = True
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.busy = False
+
+    async def execute(self, statement, parameters=None):
+        await self._use()
+        self.statements += 1
+        if parameters is None:
+            # UPDATE of the execution's context_snapshot, fenced on its lease
+            return FakeResult([1] if self.owned else [])
+        return FakeResult(list(range(1, len(parameters) + 1)))
+
+    async def commit(self):
+        await self._use()
+        self.commits += 1
+
+    async def rollback(self):
+        await self._use()
+        self.rollbacks += 1
+
+
+def make_execution():
+    return SagaExecution(id=1, started_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+
+async def test_flush_inserts_new_steps_in_one_statement():
+    db = FakeSession(delay=0)
+    journal = StepJournal(db, flush_mode="saga")
+    execution = make_execution()
+    steps = [journal.begin_step(execution, name, "api") for name in ("a", "b", "c")]
+
+    await journal.flush()
+
+    assert [step.id for step in steps] == [1, 2, 3]
+    assert db.statements == 1
+    assert db.commits == 1
+
+
+async def test_flush_fails_when_inserted_ids_do_not_match_the_steps():
+    class ShortSession(FakeSession):
+        async def execute(self, statement, parameters=None):
+            result = await super().execute(statement, parameters)
+            return FakeResult(result.all()[:-1])
+
+    db = ShortSession(delay=0)
+    journal = StepJournal(db, flush_mode="saga")
+    for name in ("a", "b"):
+        journal.begin_step(make_execution(), name, "api")
+
+    with pytest.raises(ValueError):
+        await journal.flush()
+    assert db.commits == 0
+
+
+async def test_checkpoint_only_flushes_in_step_mode():
+    db = FakeSession(delay=0)
+    journal = StepJournal(db, flush_mode="saga")
+    journal.begin_step(make_execution(), "a", "api")
+
+    await journal.checkpoint()
+    assert db.commits == 0
+
+    journal.flush_mode = "step"
+    await journal.checkpoint()
+    assert db.commits == 1
+
+
+async def test_cancelled_flush_finishes_before_the_session_is_reused():
+    db = FakeSession()
+    journal = StepJournal(db, flush_mode="step")
+    journal.begin_step(make_execution(), "a", "api")
+
+    task = asyncio.create_task(journal.flush())
+    await asyncio.sleep(db.delay / 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The commit completed before the cancellation reached the caller
+    assert db.commits == 1
+    assert not db.busy
+    await db.commit()
+
+
+async def test_fenced_flush_fails_once_the_lease_is_taken_over():
+    db = FakeSession(delay=0, owned=False)
+    execution = make_execution()
+    journal = StepJournal(db, flush_mode="step", execution=execution, context={}, lease_owner="me")
+    journal.begin_step(execution, "a", "api")
+
+    with pytest.raises(LeaseLostError):
+        await journal.flush()
+    assert (db.commits, db.rollbacks) == (0, 1)
+
+    # Nothing more is written with the rolled back session
+    statements = db.statements
+    with pytest.raises(LeaseLostError):
+        await journal.flush()
+    assert db.statements == statements
+
+
+async def test_fenced_flush_commits_while_the_lease_is_held():
+    db = FakeSession(delay=0)
+    execution = make_execution()
+    journal = StepJournal(db, flush_mode="step", execution=execution, context={}, lease_owner="me")
+
+    await journal.flush()
+    assert (db.commits, db.rollbacks) == (1, 0)
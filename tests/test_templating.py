@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.templating import Constant, Template, compile_path, compile_template
+
+
+CONTEXT = {
+    "webhook": {"order_id": "O-1", "amount": 10, "items": [{"sku": "A"}]},
+    "create-order": {"response": {"status": 201, "body": {"id": 7}}, "order_id": 7},
+}
+
+
+class TestCompileTemplate:
+    def test_single_reference_keeps_the_value_type(self):
+        assert compile_template("${webhook.amount}").render(CONTEXT) == 10
+        assert compile_template("${webhook.items}").render(CONTEXT) == [{"sku": "A"}]
+
+    def test_interpolation_renders_a_string(self):
+        template = compile_template("order ${webhook.order_id} costs ${webhook.amount}")
+
+        assert template.render(CONTEXT) == "order O-1 costs 10"
+
+    def test_unresolved_references_are_kept_verbatim(self):
+        assert compile_template("${webhook.missing}").render(CONTEXT) == "${webhook.missing}"
+        assert compile_template("id=${nope.id}").render(CONTEXT) == "id=${nope.id}"
+
+    def test_nested_structures_render_recursively(self):
+        template = compile_template({
+            "order": "${create-order.order_id}",
+            "lines": ["${webhook.items}", "fixed"],
+            "meta": {"source": "api"},
+        })
+
+        assert template.render(CONTEXT) == {
+            "order": 7,
+            "lines": [[{"sku": "A"}], "fixed"],
+            "meta": {"source": "api"},
+        }
+
+    def test_constant_subtrees_are_shared(self):
+        value = {"source": "api", "tags": ["a", "b"]}
+        template = compile_template(value)
+
+        assert isinstance(template, Constant)
+        assert template.render(CONTEXT) is value
+
+    def test_references_and_paths(self):
+        template = compile_template({
+            "a": "${webhook.order_id}",
+            "b": "id=${create-order.response.body.id}",
+        })
+
+        assert template.references == {"webhook", "create-order"}
+        assert template.paths == {
+            ("webhook", "order_id"),
+            ("create-order", "response", "body", "id"),
+        }
+
+    def test_current_timestamp(self):
+        assert isinstance(compile_template("${current_timestamp}").render({}), str)
+
+
+def test_compile_path_accepts_bare_paths():
+    step_output = CONTEXT["create-order"]
+
+    assert compile_path("response.body.id").render(step_output) == 7
+    assert compile_path("${response.status}").render(step_output) == 201
+
+
+def test_templates_must_implement_render():
+    class Incomplete(Template):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,26 @@
+import asyncio
+
+from app.services.work_queue import SagaWorker
+
+
+async def test_full_worker_wakes_up_when_stopped():
+    worker = SagaWorker(concurrency=1)
+    running = asyncio.create_task(asyncio.sleep(60))
+    worker._running[1] = running
+
+    waiting = asyncio.create_task(worker._wait_for_slot())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    worker.stop()
+    await asyncio.wait_for(waiting, timeout=1)
+    assert not running.done()
+    running.cancel()
+
+
+async def test_full_worker_wakes_up_when_an_execution_finishes():
+    worker = SagaWorker(concurrency=1)
+    worker._running[1] = asyncio.create_task(asyncio.sleep(0.01))
+
+    await asyncio.wait_for(worker._wait_for_slot(), timeout=1)
+    assert not worker._stopping.is_set()